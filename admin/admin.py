@@ -1,11 +1,17 @@
 import json
+import time
+import uuid
 from json import dumps, loads
 from typing import Any, List
 from dataclasses import dataclass
 
-from sqlalchemy import select
-from sqlalchemy.orm import sessionmaker
+import anyio
+from sqlalchemy import any_, bindparam, event, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.orm import defaultload, joinedload, selectinload, sessionmaker
+from sqlalchemy.sql import Select
 
+from starlette.applications import Starlette
 from starlette.requests import Request
 from starlette.responses import Response, RedirectResponse
 from starlette.datastructures import FormData
@@ -22,6 +28,7 @@ from starlette_admin.exceptions import FormValidationError, LoginFailed
 import secrets
 
 from app.core.services.image_service import ImageService
+from app.infrastructure.cache import invalidate_catalog
 from app.infrastructure.config.config import APP_CONFIG
 from app.infrastructure.database.models.category import Category
 from app.infrastructure.database.models.contact_form import ContactForm
@@ -37,6 +44,7 @@ from app.infrastructure.database.models.review import Review
 from app.infrastructure.database.models.settings import Settings
 from app.infrastructure.database.adapters.sync_connection import sync_engine
 from app.infrastructure.logging.logger import get_logger
+from app.infrastructure.middleware import IsolatedASGIApp
 
 from app.utils.enums import CharacteristicTypeEnum
 from app.utils.enums import OrderStatusEnum
@@ -47,6 +55,90 @@ logger = get_logger(__name__)
 
 imgservice = ImageService()
 
+IMAGES_TO_DELETE_KEY = "admin_images_to_delete"
+IMAGES_UPLOADED_KEY = "admin_images_uploaded"
+
+
+def ids_condition(column, pks: List[Any]):
+    """`column = ANY(:pks)` — один параметр-массив вместо IN (...) с параметром на каждый id."""
+    ids = [uuid.UUID(str(pk)) for pk in pks]
+    return column == any_(bindparam("pks", ids, type_=ARRAY(UUID(as_uuid=True))))
+
+
+def bulk_update_products(condition, values: dict[str, Any], reason: str) -> int:
+    """
+    Обновить товары одним UPDATE ... WHERE без загрузки строк в сессию.
+
+    Возвращает число затронутых строк и один раз инвалидирует кэш каталога.
+    """
+    with Session() as session:
+        try:
+            result = session.execute(
+                update(Product)
+                .where(condition)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+    updated = result.rowcount
+    logger.info("bulk_update_products", reason=reason, values=values, updated=updated)
+    invalidate_catalog(reason, affected=updated)
+    return updated
+
+
+def _load_product_images(db_session, product_id: Any) -> list[ProductImage]:
+    product = db_session.get(Product, uuid.UUID(str(product_id)))
+    return list(product.images) if product else []
+
+
+def _detach_product_images(db_session, product_id: Any) -> list[str]:
+    """Удалить строки изображений товара в текущей транзакции, вернуть пути файлов."""
+    images = _load_product_images(db_session, product_id)
+    if images:
+        images[0].product.images.clear()  # delete-orphan удалит строки при flush
+        db_session.flush()
+    return [img.image_path for img in images if img.image_path]
+
+
+def defer_image_deletes(db_session, image_paths: list[str]) -> None:
+    """Удалить файлы изображений после коммита сессии (при откате — оставить)."""
+    _listen_image_cleanup(db_session)
+    db_session.info.setdefault(IMAGES_TO_DELETE_KEY, []).extend(image_paths)
+
+
+def track_image_uploads(db_session, image_paths: list[str]) -> None:
+    """Запомнить новые файлы, чтобы удалить их, если сессия откатится."""
+    _listen_image_cleanup(db_session)
+    db_session.info.setdefault(IMAGES_UPLOADED_KEY, []).extend(image_paths)
+
+
+def _listen_image_cleanup(db_session) -> None:
+    # Слушатели вешаются на конкретную сессию, а не на класс Session:
+    # сессии API и остальных запросов админки за них не платят
+    if not event.contains(db_session, "after_commit", _delete_images_after_commit):
+        event.listen(db_session, "after_commit", _delete_images_after_commit)
+        event.listen(db_session, "after_soft_rollback", _delete_uploads_after_rollback)
+
+
+def _delete_images_after_commit(session) -> None:
+    session.info.pop(IMAGES_UPLOADED_KEY, None)
+    image_paths = session.info.pop(IMAGES_TO_DELETE_KEY, None)
+    if image_paths:
+        imgservice.schedule_delete(image_paths)
+
+
+def _delete_uploads_after_rollback(session, previous_transaction) -> None:
+    if previous_transaction.parent is not None:
+        return
+    session.info.pop(IMAGES_TO_DELETE_KEY, None)
+    image_paths = session.info.pop(IMAGES_UPLOADED_KEY, None)
+    if image_paths:
+        imgservice.schedule_delete(image_paths)
+
 
 def get_product_form():
     return f"""
@@ -122,93 +214,68 @@ class ProductImagesListField(BaseImageField):
         self, request: Request, form_data: FormData, action: RequestAction
     ) -> tuple[Any, bool]:
         """Получаем существующие изображения, обрабатываем удаление и добавляем новые"""
-        from app.infrastructure.database.models.product import ProductImage, Product
-        
-        # Проверяем, нажата ли кнопка удаления всех изображений
-        should_delete_all = form_data.get(f"_{self.name}-delete") == "on"
-        if should_delete_all:
-            print("✓ Запрошено удаление всех изображений")
-            product_id = request.path_params.get('pk')
-            db_session = getattr(request.state, 'session', None)
-            
-            if product_id and action == RequestAction.EDIT and db_session:
-                try:
-                    product = db_session.get(Product, product_id)
-                    if product and product.images:
-                        # Удаляем физические файлы и записи из БД
-                        images_to_delete = list(product.images)
-                        for img in images_to_delete:
-                            if img.image_path:
-                                try:
-                                    await imgservice.delete_image(img.image_path)
-                                    print(f"✓ Удален файл: {img.image_path}")
-                                except Exception as e:
-                                    print(f"✗ Ошибка удаления файла {img.image_path}: {e}")
-                            
-                            # Удаляем запись из БД вручную
-                            db_session.delete(img)
-                        
-                        # Очищаем коллекцию, чтобы SQLAlchemy не ругался
-                        product.images.clear()
-                        
-                        db_session.flush()  # Применяем изменения в рамках транзакции
-                        print(f"✓ Удалено {len(images_to_delete)} изображений из БД")
-                except Exception as e:
-                    print(f"✗ Ошибка при удалении изображений: {e}")
-            
-            # Возвращаем пустой список
-            return ([], False)
-        
-        # Получаем product_id из URL
         product_id = request.path_params.get('pk')
-        
-        # Получаем сессию starlette-admin из request.state
+        # Сессия starlette-admin, в которой будет сохранён товар
         db_session = getattr(request.state, 'session', None)
-        
-        existing_images = []
-        max_order = -1
-        
-        # Загружаем существующие изображения из ТЕКУЩЕЙ сессии starlette-admin
-        if product_id and action == RequestAction.EDIT and db_session:
-            try:
-                # Используем ту же сессию, что и starlette-admin
-                product = db_session.get(Product, product_id)
-                if product and product.images:
-                    # Получаем существующие изображения из ЭТОЙ же сессии
-                    existing_images = list(product.images)
-                    max_order = max([img.order for img in existing_images], default=-1)
-                    print(f"✓ Найдено существующих изображений: {len(existing_images)}, max_order: {max_order}")
-            except Exception as e:
-                print(f"✗ Ошибка получения существующих изображений: {e}")
-        
-        # Получаем загруженные файлы
-        files = form_data.getlist(self.name)
-        
-        # Если нет новых файлов, возвращаем существующие (или пустой список)
-        if not files or not any(hasattr(f, 'filename') and f.filename for f in files):
-            return (existing_images if existing_images else [], False)
-        
-        # Создаём новые ProductImage объекты и добавляем к существующим
-        order = max_order + 1
-        
-        for file in files:
-            if hasattr(file, 'filename') and file.filename:
+
+        is_edit = bool(product_id and action == RequestAction.EDIT and db_session)
+
+        # Кнопка удаления всех изображений: строки удаляются в транзакции сохранения,
+        # файлы — только после её успешного коммита
+        if form_data.get(f"_{self.name}-delete") == "on":
+            if is_edit:
                 try:
-                    image_path = await imgservice.upload_and_convert(file, subfolder="products")
-                    
-                    product_image = ProductImage(
-                        image_path=image_path,
-                        order=order
+                    image_paths = await anyio.to_thread.run_sync(
+                        _detach_product_images, db_session, product_id
                     )
-                    existing_images.append(product_image)
-                    order += 1
-                    
-                    print(f"✓ Изображение загружено: {image_path}, order: {product_image.order}")
-                except Exception as e:
-                    print(f"✗ Ошибка загрузки изображения: {e}")
-        
-        # Возвращаем ВСЕ изображения: старые + новые
-        print(f"✓ Возвращаем всего изображений: {len(existing_images)}")
+                    defer_image_deletes(db_session, image_paths)
+                    logger.info("product_images_delete_scheduled", product_id=product_id, count=len(image_paths))
+                except Exception:
+                    logger.warning("product_images_delete_failed", product_id=product_id, exc_info=True)
+            return ([], False)
+
+        existing_images = []
+        if is_edit:
+            try:
+                existing_images = await anyio.to_thread.run_sync(
+                    _load_product_images, db_session, product_id
+                )
+            except Exception:
+                logger.warning("product_images_load_failed", product_id=product_id, exc_info=True)
+
+        files = [f for f in form_data.getlist(self.name) if getattr(f, 'filename', None)]
+        if not files:
+            return (existing_images, False)
+
+        started = time.perf_counter()
+        results = await imgservice.upload_multiple(files, subfolder="products", return_exceptions=True)
+
+        order = max((img.order for img in existing_images), default=-1) + 1
+        uploaded = []
+        for file, result in zip(files, results):
+            if isinstance(result, BaseException):
+                logger.warning(
+                    "product_image_upload_failed",
+                    product_id=product_id,
+                    filename=file.filename,
+                    exc_info=(type(result), result, result.__traceback__),
+                )
+                continue
+            uploaded.append(result)
+            existing_images.append(ProductImage(image_path=result, order=order))
+            order += 1
+
+        if db_session:
+            track_image_uploads(db_session, uploaded)
+
+        logger.info(
+            "product_images_uploaded",
+            product_id=product_id,
+            uploaded=len(uploaded),
+            failed=len(files) - len(uploaded),
+            total=len(existing_images),
+            seconds=round(time.perf_counter() - started, 3),
+        )
         return (existing_images, False)
 
 
@@ -260,8 +327,8 @@ class CategoryAdmin(ModelView):
     label = "Категория"
     label_plural = "Категории"
 
-    exclude_fields_from_create = ["products_count", "image"]
-    exclude_fields_from_edit = ["products_count", "image"]
+    exclude_fields_from_create = ["products_count", "active_products_count", "image"]
+    exclude_fields_from_edit = ["products_count", "active_products_count", "image"]
 
     fields = [
         StringField("name", label="Название", required=True),
@@ -269,11 +336,17 @@ class CategoryAdmin(ModelView):
         TextAreaField("description", label="Описание"),
         StaticImageField("image", label="Изображение"),
         NumberField("products_count", label="Количество товаров"),
+        NumberField("active_products_count", label="Активных товаров"),
         HasMany("products", identity="products", label="Товары")
     ]
     
     actions = ["discount_category", "remove_discount_categories", "upload_category_image"]
 
+    def get_details_query(self, request: Request) -> Select:
+        return super().get_details_query(request).options(
+            defaultload(Category.products).selectinload(Product.images),
+        )
+
     @action(
         name="discount_category",
         text="Сделать скидку на выбранные категории",
@@ -306,22 +379,15 @@ class CategoryAdmin(ModelView):
             raise ActionFailed("Процент должен быть от 1 до 99.")
 
         try:
-            session = Session()
+            updated = bulk_update_products(
+                ids_condition(Product.category_id, pks),
+                {"discount_percent": discount},
+                reason="admin_discount_category",
+            )
         except Exception as e:
             raise ActionFailed(str(e))
 
-        try:
-            result = session.query(Product).filter(Product.category_id.in_(pks)).all()
-            logger.info(f"Result: {result}")
-            logger.info(f"Selected pks: {pks}")
-            for product in result:
-                product.discount_percent = discount
-                logger.info(f"Discount add: {product.discount_percent}")
-            session.commit()
-            return f"Скидка {discount}% применена у выбранных категорий"
-        except Exception as e:
-            session.rollback()
-            raise ActionFailed(str(e))
+        return f"Скидка {discount}% применена у выбранных категорий (товаров: {updated})"
 
     @action(
         name="remove_discount_categories",
@@ -329,23 +395,15 @@ class CategoryAdmin(ModelView):
     )
     async def remove_discount_categories(self, request: Request, pks: List[Any]) -> str:
         try:
-            session = Session()
+            updated = bulk_update_products(
+                ids_condition(Product.category_id, pks),
+                {"discount_percent": None},
+                reason="admin_remove_discount_category",
+            )
         except Exception as e:
             raise ActionFailed(str(e))
 
-        try:
-            result = session.query(Product).filter(Product.category_id.in_(pks)).all()
-            logger.info(f"Result: {result}")
-            logger.info(f"Selected pks: {pks}")
-            for product in result:
-                old_discount = product.discount_percent
-                product.discount_percent = None
-                logger.info(f"Removed discount: {old_discount}")
-            session.commit()
-            return f"Скидка у выбранных категорий удалена"
-        except Exception as e:
-            session.rollback()
-            raise ActionFailed(str(e))
+        return f"Скидка у выбранных категорий удалена (товаров: {updated})"
 
     @action(
         name="upload_category_image",
@@ -431,6 +489,18 @@ class ProductAdmin(ModelView):
     actions = ["discount_products", "remove_discount_products", "move_to_category", "activate_products",
                "deactivate_products"]
 
+    def get_list_query(self, request: Request) -> Select:
+        return super().get_list_query(request).options(
+            joinedload(Product.category),
+        )
+
+    def get_details_query(self, request: Request) -> Select:
+        return super().get_details_query(request).options(
+            joinedload(Product.category),
+            selectinload(Product.images),
+            defaultload(Product.characteristics).joinedload(ProductCharacteristic.characteristic_type),
+        )
+
     @action(
         name="discount_products",
         text="Сделать скидку на выбранные товары",
@@ -463,22 +533,15 @@ class ProductAdmin(ModelView):
             raise ActionFailed("Процент должен быть от 1 до 99.")
 
         try:
-            session = Session()
+            updated = bulk_update_products(
+                ids_condition(Product.id, pks),
+                {"discount_percent": discount},
+                reason="admin_discount_products",
+            )
         except Exception as e:
             raise ActionFailed(str(e))
 
-        try:
-            result = session.query(Product).filter(Product.id.in_(pks)).all()
-            logger.info(f"Result: {result}")
-            logger.info(f"Selected pks: {pks}")
-            for product in result:
-                product.discount_percent = discount
-                logger.info(f"Discount add: {product.discount_percent}")
-            session.commit()
-            return f"Скидка {discount}% применена у выбранных товаров"
-        except Exception as e:
-            session.rollback()
-            raise ActionFailed(str(e))
+        return f"Скидка {discount}% применена у выбранных товаров ({updated})"
 
     @action(
         name="remove_discount_products",
@@ -486,19 +549,16 @@ class ProductAdmin(ModelView):
     )
     async def remove_discount_products(self, request: Request, pks: List[Any]) -> str:
         try:
-            session = Session()
-            result = session.query(Product).filter(Product.id.in_(pks)).all()
-            logger.info(f"Result: {result}")
-            logger.info(f"Selected pks: {pks}")
-            for product in result:
-                old_discount = product.discount_percent
-                product.discount_percent = None
-                logger.info(f"Removed discount: {old_discount}")
-            session.commit()
-            return f"Скидка у выбранных товаров удалена"
+            updated = bulk_update_products(
+                ids_condition(Product.id, pks),
+                {"discount_percent": None},
+                reason="admin_remove_discount_products",
+            )
         except Exception as e:
             raise ActionFailed(str(e))
 
+        return f"Скидка у выбранных товаров удалена ({updated})"
+
     @action(
         name="move_to_category",
         text="Перенести в категорию",
@@ -517,23 +577,23 @@ class ProductAdmin(ModelView):
         logger.info(f"Категория: {category_id}")
 
         try:
-            session = Session()
-        except Exception as e:
-            raise ActionFailed(str(e))
-
-        try:
-            products = session.query(Product).filter(Product.id.in_(pks)).all()
-            for product in products:
-                product.category_id = category_id
-            category_name = session.query(Category).where(Category.id == category_id).first()
-            session.commit()
-
-            return f"Товары перенесены в категорию {category_name.name}"
+            with Session() as session:
+                category_name = session.scalar(select(Category.name).where(Category.id == category_id))
+            if category_name is None:
+                raise ActionFailed("Категория не найдена.")
 
+            updated = bulk_update_products(
+                ids_condition(Product.id, pks),
+                {"category_id": uuid.UUID(str(category_id))},
+                reason="admin_move_to_category",
+            )
+        except ActionFailed:
+            raise
         except Exception as e:
-            session.rollback()
             raise ActionFailed(str(e))
 
+        return f"Товары перенесены в категорию {category_name} ({updated})"
+
     @action(
         name="activate_products",
         text="Активировать товары",
@@ -543,20 +603,15 @@ class ProductAdmin(ModelView):
     )
     async def activate_products(self, request: Request, pks: list[int]) -> str:
         try:
-            session = Session()
+            updated = bulk_update_products(
+                ids_condition(Product.id, pks),
+                {"is_active": True},
+                reason="admin_activate_products",
+            )
         except Exception as e:
             raise ActionFailed(str(e))
 
-        try:
-            products = session.query(Product).filter(Product.id.in_(pks)).all()
-            for product in products:
-                product.is_active = True
-            session.commit()
-
-            return "Выбранные товары успешно активированы."
-        except Exception as e:
-            session.rollback()
-            raise ActionFailed(str(e))
+        return f"Выбранные товары успешно активированы ({updated})."
 
     @action(
         name="deactivate_products",
@@ -567,21 +622,15 @@ class ProductAdmin(ModelView):
     )
     async def deactivate_products(self, request: Request, pks: list[int]) -> str:
         try:
-            session = Session()
+            updated = bulk_update_products(
+                ids_condition(Product.id, pks),
+                {"is_active": False},
+                reason="admin_deactivate_products",
+            )
         except Exception as e:
             raise ActionFailed(str(e))
 
-        try:
-            products = session.query(Product).filter(Product.id.in_(pks)).all()
-            for product in products:
-                product.is_active = False
-                logger.info(f"Активность: {product.is_active}")
-            session.commit()
-
-            return "Выбранные товары успешно деактивированы."
-        except Exception as e:
-            session.rollback()
-            raise ActionFailed(str(e))
+        return f"Выбранные товары успешно деактивированы ({updated})."
 
 
 # -----------------------------------------------------------
@@ -607,7 +656,8 @@ class OrderAdmin(ModelView):
     label = "Заказ"
     label_plural = "Заказы"
 
-    can_create = False
+    def can_create(self, request: Request) -> bool:
+        return False
 
     fields = [
         StringField("id", label="ID"),
@@ -626,9 +676,14 @@ class OrderItemAdmin(ModelView):
     label = "Позиция заказа"
     label_plural = "Позиции заказа"
 
-    can_create = False
-    can_delete = False
-    can_edit = False
+    def can_create(self, request: Request) -> bool:
+        return False
+
+    def can_delete(self, request: Request) -> bool:
+        return False
+
+    def can_edit(self, request: Request) -> bool:
+        return False
 
     fields = [
         StringField("id", label="ID"),
@@ -856,3 +911,28 @@ def create_admin(engine):
     admin.add_view(SettingsAdmin(Settings))
 
     return admin
+
+
+def isolated_admin_app(admin: Admin) -> IsolatedASGIApp:
+    """
+    ASGI-приложение админки, работающее в отдельном event loop.
+
+    Админка работает на синхронном движке, поэтому её запросы обслуживаются
+    в своём потоке со своим loop и пулом потоков, не блокируя API витрины.
+    """
+    holder = Starlette()
+    admin.mount_to(holder)
+    admin_mount = holder.routes[0]
+    return IsolatedASGIApp(admin_mount.app, name="admin-loop")
+
+
+def mount_admin(app: Starlette, admin: Admin) -> IsolatedASGIApp:
+    """Смонтировать админ-панель в отдельном event loop."""
+    isolated = isolated_admin_app(admin)
+    app.mount(admin.base_url, app=isolated, name=admin.route_name)
+    return isolated
+
+
+def load_admin_app() -> IsolatedASGIApp:
+    """Фабрика для ленивого монтирования: собрать админку на sync_engine."""
+    return isolated_admin_app(create_admin(engine=sync_engine))
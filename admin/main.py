@@ -0,0 +1,26 @@
+"""
+Отдельное приложение только с админ-панелью.
+
+Развёртывание по умолчанию (docker-compose, nginx_4roads.su.conf): реплики API
+запускаются с ADMIN_MOUNT=disabled, а админка — отдельным процессом:
+
+    uvicorn admin.main:app --port 8001
+"""
+from starlette.applications import Starlette
+from starlette.middleware.sessions import SessionMiddleware
+
+from admin.admin import create_admin, sync_engine
+from app.infrastructure.config.config import APP_CONFIG
+from app.infrastructure.logging.logger import configure_logging
+
+configure_logging()
+
+app = Starlette(debug=APP_CONFIG.DEBUG)
+app.add_middleware(
+    SessionMiddleware,
+    secret_key=APP_CONFIG.ADMIN_PASSWORD,
+    max_age=3600 * 24 * 7,
+)
+
+admin = create_admin(engine=sync_engine)
+admin.mount_to(app)
@@ -0,0 +1,40 @@
+from dataclasses import asdict
+
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import HTMLResponse, PlainTextResponse
+
+from app.infrastructure.errors.base import NotFoundError
+
+
+router = APIRouter(prefix="/debug/profiles", tags=["debug"], include_in_schema=False)
+
+
+def _get_profile(request: Request, request_id: str):
+    profile = request.app.state.profile_store.get(request_id)
+    if profile is None:
+        raise NotFoundError()
+    return profile
+
+
+@router.get("/", summary="Последние профили запросов")
+async def list_profiles(request: Request, limit: int = Query(50, ge=1, le=500)) -> list[dict]:
+    return [profile.summary() for profile in request.app.state.profile_store.recent(limit)]
+
+
+@router.get("/{request_id}", summary="SQL-выражения запроса")
+async def get_profile(request: Request, request_id: str) -> dict:
+    profile = _get_profile(request, request_id)
+    return {
+        **profile.summary(),
+        "statements": [asdict(statement) for statement in profile.statements],
+    }
+
+
+@router.get("/{request_id}/cpu", summary="CPU-профиль запроса")
+async def get_cpu_profile(request: Request, request_id: str):
+    profile = _get_profile(request, request_id)
+    if profile.cpu_profile is None:
+        raise NotFoundError()
+    if profile.cpu_profile_type == "pyinstrument":
+        return HTMLResponse(profile.cpu_profile)
+    return PlainTextResponse(profile.cpu_profile)
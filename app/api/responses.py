@@ -0,0 +1,38 @@
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+
+from app.infrastructure.cache import get_catalog_version, response_cache
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON-ответ по умолчанию: кодирование orjson вместо json.dumps."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+async def cached_json_response(
+    key: str,
+    build: Callable[[], Awaitable[Any]],
+    adapter: TypeAdapter,
+) -> Response:
+    """
+    Готовый JSON из кэша ответов или результат build(), закодированный adapter.
+
+    Для эндпоинтов, ответ которых зависит только от каталога и параметров
+    из key: повторные запросы обходятся без БД, моделей и кодирования.
+    """
+    if response_cache is not None:
+        body = response_cache.get(key)
+        if body is not None:
+            return Response(body, media_type="application/json")
+
+    version = get_catalog_version()
+    body = adapter.dump_json(await build())
+    if response_cache is not None:
+        response_cache.set(key, body, version)
+    return Response(body, media_type="application/json")
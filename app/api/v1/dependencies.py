@@ -22,6 +22,11 @@ async def get_db_session(
         await session.close()
 
 
+def get_home_rails(request: Request):
+    """Кэш подборок главной (None, если HOME_RAILS_CACHE_ENABLED=false)."""
+    return getattr(request.app.state, "home_rails", None)
+
+
 async def get_settings_service(session=Depends(get_db_session)) -> services.SettingsService:
     return services.SettingsService(
         repository=repositories.SettingsRepository(session=session)
@@ -55,8 +60,7 @@ async def get_review_service(session=Depends(get_db_session)) -> services.Review
 
 async def get_filter_service(session=Depends(get_db_session)) -> services.FilterService:
     return services.FilterService(
-        product_repository=repositories.ProductRepository(session=session),
-        characteristic_repository=repositories.CharacteristicTypeRepository(session=session)
+        product_repository=repositories.ProductRepository(session=session)
     )
 
 
@@ -1,18 +1,22 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends
+from fastapi.responses import Response
 
+from app.api.responses import cached_json_response
 from app.core.services.category_service import CategoryService
 from app.api.v1.dependencies import get_category_service
-from app.core.dto.category import CategoryModel
+from app.core.dto.category import CATEGORY_LIST_ADAPTER, CategoryModel
 
 router = APIRouter()
 
 
-@router.get("/all")
+@router.get("/all", response_model=list[CategoryModel])
 async def get_all_categories(
     category_service: Annotated[CategoryService, Depends(get_category_service)]
-) -> list[CategoryModel]:
-    return await category_service.get_all_categories()
+) -> Response:
+    return await cached_json_response(
+        "category:all", category_service.get_all_categories, CATEGORY_LIST_ADAPTER
+    )
 
     
\ No newline at end of file
@@ -1,9 +1,11 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends
+from fastapi.responses import Response
 
+from app.api.responses import cached_json_response
 from app.api.v1.dependencies import get_faq_service
-from app.core.dto.faq import FAQModel
+from app.core.dto.faq import FAQ_LIST_ADAPTER, FAQModel
 from app.core.services.faq_service import FAQService
 
 
@@ -18,6 +20,6 @@ router = APIRouter()
 )
 async def get_faqs(
     service: Annotated[FAQService, Depends(get_faq_service)]
-) -> list[FAQModel]:
-    return await service.get_faqs()
+) -> Response:
+    return await cached_json_response("faq", service.get_faqs, FAQ_LIST_ADAPTER)
 
@@ -1,9 +1,11 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import Response
 
+from app.api.responses import cached_json_response
 from app.api.v1.dependencies import get_filter_service
-from app.core.dto.filters import AvailableFiltersModel
+from app.core.dto.filters import AVAILABLE_FILTERS_ADAPTER, AvailableFiltersModel
 from app.core.services.filter_service import FilterService
 
 
@@ -14,10 +16,18 @@ router = APIRouter()
     "/",
     response_model=AvailableFiltersModel,
     summary="Получить все доступные фильтры",
-    description="Возвращает категории, материалы, размеры и цвета для фильтрации товаров"
+    description=(
+        "Возвращает категории, материалы, размеры и цвета для фильтрации товаров, "
+        "а также границы цен и гистограмму для слайдера"
+    )
 )
 async def get_available_filters(
-    service: Annotated[FilterService, Depends(get_filter_service)]
-) -> AvailableFiltersModel:
-    return await service.get_available_filters()
+    service: Annotated[FilterService, Depends(get_filter_service)],
+    category: str | None = Query(None, description="slug категории: цены только её товаров"),
+) -> Response:
+    return await cached_json_response(
+        f"filters:{category or ''}",
+        lambda: service.get_available_filters(category),
+        AVAILABLE_FILTERS_ADAPTER,
+    )
 
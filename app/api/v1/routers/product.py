@@ -1,17 +1,97 @@
-from typing import Annotated
+from typing import Annotated, Literal, NamedTuple
 from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import Response
 
-from app.api.v1.dependencies import get_product_service
-from app.core.dto.product import ProductModel, ProductFilterModel, BaseProductModel
+from app.api.v1.dependencies import get_home_rails, get_product_service
+from app.core.dto.product import (
+    PRODUCT_ADAPTER,
+    PRODUCT_CARD_LIST_ADAPTER,
+    PRODUCT_LIST_ADAPTER,
+    ProductCardDict,
+    ProductCardModel,
+    ProductDict,
+    ProductModel,
+    ProductView,
+    ProductFilterModel,
+    BaseProductModel,
+)
+from app.core.repositories.product_repository import ProductRepository
 from app.core.services.product_service import ProductService
+from app.infrastructure.cache import RefreshingCache
+from app.infrastructure.database.adapters.pg_connection import DatabaseConnection
 
 
 router = APIRouter()
 
 
+# Эндпоинты каталога отдают готовый JSON: сервис собирает словари без
+# валидации, и повторная проверка по response_model в FastAPI не нужна.
+# response_model остаётся для схемы OpenAPI.
+def list_adapter(view: ProductView):
+    return PRODUCT_CARD_LIST_ADAPTER if view == "card" else PRODUCT_LIST_ADAPTER
+
+
+def products_response(products: list[ProductDict] | list[ProductCardDict], view: ProductView = "full") -> Response:
+    return Response(list_adapter(view).dump_json(products), media_type="application/json")
+
+
+class HomeRail(NamedTuple):
+    """Ключ подборки главной: флаги is_new/is_featured/is_sales сводятся к одной."""
+    rail: Literal["new", "featured", "sales", "all"]
+    view: ProductView
+    limit: int
+
+    @classmethod
+    def from_flags(cls, is_new: bool, is_featured: bool, is_sales: bool, limit: int, view: ProductView) -> "HomeRail":
+        # Тот же приоритет, что в ProductRepository._home_query
+        rail = "new" if is_new else "featured" if is_featured else "sales" if is_sales else "all"
+        return cls(rail, view, limit)
+
+
+# Подборки, которые собираются при старте: то, что запрашивает главная.
+# Кэшируются только они — иначе каждый limit из запроса (1..50) становился
+# бы вечным ключом, пересобираемым каждые HOME_RAILS_REFRESH_INTERVAL
+HOME_RAILS_WARMUP = [
+    HomeRail(rail, view, 9)
+    for rail in ("new", "featured", "sales", "all")
+    for view in ("full", "card")
+]
+HOME_RAILS_CACHED = frozenset(HOME_RAILS_WARMUP)
+
+
+async def build_home_rail(service: ProductService, key: HomeRail) -> bytes:
+    products = await service.get_for_home(
+        is_new=key.rail == "new",
+        is_featured=key.rail == "featured",
+        is_sales=key.rail == "sales",
+        limit=key.limit,
+        view=key.view,
+    )
+    return list_adapter(key.view).dump_json(products)
+
+
+def create_home_rails(db_connection: DatabaseConnection, interval: float) -> RefreshingCache:
+    """Кэш подборок главной; каждая пересборка — в своей сессии БД."""
+    async def build(key: HomeRail) -> bytes:
+        session = await db_connection.get_session()
+        try:
+            return await build_home_rail(ProductService(ProductRepository(session)), key)
+        finally:
+            await session.close()
+
+    return RefreshingCache(build, interval=interval, name="home_rails")
+
+
+ViewQuery = Query("full", description="full — полные товары, card — облегчённые карточки для списков")
+
+
+def product_response(product: ProductDict) -> Response:
+    return Response(PRODUCT_ADAPTER.dump_json(product), media_type="application/json")
+
+
 @router.get(
     "/search",
-    response_model=list[ProductModel],
+    response_model=list[ProductModel] | list[ProductCardModel],
     summary="Поиск товаров по названию",
     description="Возвращает список товаров, название которых содержит поисковый запрос"
 )
@@ -19,37 +99,53 @@ async def search_products(
     service: Annotated[ProductService, Depends(get_product_service)],
     q: str = Query(..., min_length=1, description="Поисковый запрос"),
     limit: int = Query(20, ge=1, le=100, description="Количество товаров"),
-    offset: int = Query(0, ge=0, description="Смещение для пагинации")
-) -> list[ProductModel]:
-    return await service.search_by_name(q, limit, offset)
+    offset: int = Query(0, ge=0, description="Смещение для пагинации"),
+    view: ProductView = ViewQuery,
+) -> Response:
+    return products_response(await service.search_by_name(q, limit, offset, view), view)
 
 
 @router.get(
     "/home",
-    response_model=list[ProductModel],
+    response_model=list[ProductModel] | list[ProductCardModel],
     summary="Получить товары для главной страницы",
     description="Возвращает товары: новинки, рекомендуемые или скидки. Без флагов - просто первые товары"
 )
 async def get_home_products(
     service: Annotated[ProductService, Depends(get_product_service)],
+    home_rails: Annotated[RefreshingCache | None, Depends(get_home_rails)],
     is_new: bool = Query(False, description="Новинки (последние добавленные)"),
     is_featured: bool = Query(False, description="Рекомендуемые (хиты продаж)"),
     is_sales: bool = Query(False, description="Скидки (товары с discount_percent)"),
-    limit: int = Query(9, ge=1, le=50, description="Количество товаров")
-) -> list[ProductModel]:
-    return await service.get_for_home(is_new, is_featured, is_sales, limit)
+    limit: int = Query(9, ge=1, le=50, description="Количество товаров"),
+    view: ProductView = ViewQuery,
+) -> Response:
+    key = HomeRail.from_flags(is_new, is_featured, is_sales, limit, view)
+    if home_rails is not None and key in HOME_RAILS_CACHED:
+        body = await home_rails.get(key)
+    else:
+        body = await build_home_rail(service, key)
+    return Response(body, media_type="application/json")
 
 
 @router.post(
     "/all",
+    response_model=list[ProductModel] | list[ProductCardModel],
     summary="Получить список продуктов с фильтрацией",
-    description="Возвращает список продуктов с возможностью фильтрации по slug и характеристикам"
+    description=(
+        "Возвращает список продуктов с возможностью фильтрации по slug и характеристикам. "
+        "Если страница полная, заголовок X-Next-Cursor содержит курсор следующей"
+    )
 )
 async def get_products_filtered(
     filters: ProductFilterModel,
     service: Annotated[ProductService, Depends(get_product_service)]
-) -> list[ProductModel]:
-    return await service.get_filtered_products(filters)
+) -> Response:
+    page = await service.get_filtered_products(filters)
+    response = products_response(page.items, filters.view)
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return response
 
 
 @router.get(
@@ -66,12 +162,13 @@ async def get_all_products_for_sitemap(
 
 @router.get(
     "/{slug}",
+    response_model=ProductModel,
     summary="Получить продукт по slug",
     description="Возвращает полную информацию о продукте"
 )
 async def get_product_by_slug(
     slug: str,
     service: Annotated[ProductService, Depends(get_product_service)]
-) -> ProductModel:
-    return await service.get_by_slug(slug)
+) -> Response:
+    return product_response(await service.get_by_slug(slug))
 
@@ -1,9 +1,11 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends
+from fastapi.responses import Response
 
+from app.api.responses import cached_json_response
 from app.api.v1.dependencies import get_settings_service
-from app.core.dto.settings import SettingsModel
+from app.core.dto.settings import SETTINGS_ADAPTER, SettingsModel
 from app.core.services.settings_service import SettingsService
 from app.infrastructure.errors.base import NotFoundError
 from app.utils.error_extra import error_response
@@ -21,5 +23,5 @@ router = APIRouter()
 )
 async def get_settings(
     settings_service: Annotated[SettingsService, Depends(get_settings_service)]
-) -> SettingsModel:
-    return await settings_service.get_settings()
\ No newline at end of file
+) -> Response:
+    return await cached_json_response("settings", settings_service.get_settings, SETTINGS_ADAPTER)
\ No newline at end of file
@@ -1,7 +1,7 @@
 from datetime import datetime   
 from uuid import UUID
 
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, TypeAdapter, field_validator
 
 from app.utils.url_helper import get_absolute_url
 
@@ -12,6 +12,7 @@ class CategoryModel(BaseModel):
     slug: str
     description: str | None
     image: str | None
+    active_products_count: int
     created_at: datetime
     updated_at: datetime
 
@@ -19,3 +20,6 @@ class CategoryModel(BaseModel):
     @classmethod
     def validate_image(cls, value: str | None) -> str | None:
         return get_absolute_url(value)
+
+
+CATEGORY_LIST_ADAPTER = TypeAdapter(list[CategoryModel])
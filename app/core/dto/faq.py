@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 from uuid import UUID
 
 
@@ -9,3 +9,5 @@ class FAQModel(BaseModel):
     question: str
     answer: str
 
+
+FAQ_LIST_ADAPTER = TypeAdapter(list[FAQModel])
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from uuid import UUID
 
 from app.utils.enums import CharacteristicTypeEnum
@@ -17,7 +17,23 @@ class CharacteristicFilterModel(BaseModel):
     values: list[str]
 
 
+class PriceBucketModel(BaseModel):
+    min: int
+    max: int
+    count: int
+
+
+class PriceRangeModel(BaseModel):
+    """Границы цен активных товаров и гистограмма для слайдера (None — товаров нет)."""
+    min: int | None
+    max: int | None
+    histogram: list[PriceBucketModel]
+
+
 class AvailableFiltersModel(BaseModel):
     categories: list[CategoryFilterModel]
     characteristics: list[CharacteristicFilterModel]
+    price: PriceRangeModel
+
 
+AVAILABLE_FILTERS_ADAPTER = TypeAdapter(AvailableFiltersModel)
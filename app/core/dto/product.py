@@ -1,10 +1,22 @@
-from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator, model_validator
+from typing import Literal, NamedTuple, TypedDict
 from uuid import UUID
 from datetime import datetime
 
 from app.utils.url_helper import get_absolute_url
 
 
+def calculate_old_price(price: int, discount_percent: int | None) -> int | None:
+    """
+    Цена до скидки по текущей цене и проценту скидки.
+
+    Та же формула, что у вычисляемой колонки Product.old_price.
+    """
+    if discount_percent and 0 < discount_percent < 100:
+        return price * 100 // (100 - discount_percent)
+    return None
+
+
 class ProductImageModel(BaseModel):
     id: UUID
     image_path: str
@@ -37,10 +49,83 @@ class ProductModel(BaseModel):
     
     @model_validator(mode='after')
     def compute_old_price(self) -> 'ProductModel':
-        if self.discount_percent and self.discount_percent > 0:
-            self.old_price = int(self.price / (1 - self.discount_percent / 100))
+        old_price = calculate_old_price(self.price, self.discount_percent)
+        if old_price is not None:
+            self.old_price = old_price
         return self
 
+
+class ProductImageDict(TypedDict):
+    id: UUID
+    image_path: str
+    order: int
+
+
+class ProductCharacteristicDict(TypedDict):
+    name: str
+    value: str
+
+
+class ProductDict(TypedDict):
+    """
+    Товар для эндпоинтов каталога: те же поля, что у ProductModel, но без валидации.
+
+    Сервис собирает словари из ORM-объектов уже в итоговом виде (абсолютные
+    URL; old_price читается из колонки БД), а адаптеры ниже сериализуют их в JSON целиком
+    в pydantic-core. ProductModel остаётся схемой ответа в OpenAPI.
+    """
+    id: UUID
+    name: str
+    slug: str
+    description: str | None
+    price: int
+    discount_percent: int | None
+    old_price: int | None
+    is_active: bool
+    is_featured: bool
+    category_id: UUID
+    images: list[ProductImageDict]
+    characteristics: list[ProductCharacteristicDict]
+
+
+PRODUCT_ADAPTER = TypeAdapter(ProductDict)
+PRODUCT_LIST_ADAPTER = TypeAdapter(list[ProductDict])
+
+
+# Вид списка товаров: полный товар или облегчённая карточка
+ProductView = Literal["full", "card"]
+
+ProductSort = Literal["newest", "price_asc", "price_desc", "discount"]
+
+
+class ProductCardModel(BaseModel):
+    """Карточка товара в списках: без описания, характеристик и галереи."""
+    id: UUID
+    name: str
+    slug: str
+    price: int
+    discount_percent: int | None
+    old_price: int | None = None
+    is_featured: bool
+    category_id: UUID
+    image: str | None = Field(None, description="Абсолютный URL первого изображения")
+
+
+class ProductCardDict(TypedDict):
+    id: UUID
+    name: str
+    slug: str
+    price: int
+    discount_percent: int | None
+    old_price: int | None
+    is_featured: bool
+    category_id: UUID
+    image: str | None
+
+
+PRODUCT_CARD_LIST_ADAPTER = TypeAdapter(list[ProductCardDict])
+
+
 class BaseProductModel(BaseModel):
     id: UUID
     name: str
@@ -74,4 +159,22 @@ class ProductFilterModel(BaseModel):
     limit: int = 20
     offset: int = 0
     category_ids: list[UUID] | None = Field(None, description="Фильтр по id категорий")
+    view: ProductView = Field(
+        "full",
+        description="full — полные товары, card — карточки (без описания и характеристик, одно изображение)"
+    )
+    sort: ProductSort = Field(
+        "newest",
+        description="newest — сначала новые, price_asc/price_desc — по цене, discount — по размеру скидки"
+    )
+    cursor: str | None = Field(
+        None,
+        description="Курсор следующей страницы из заголовка X-Next-Cursor предыдущего ответа (вместо offset)"
+    )
+
+
+class ProductPage(NamedTuple):
+    """Страница списка товаров и курсор следующей (None — страница последняя)."""
+    items: list[ProductDict] | list[ProductCardDict]
+    next_cursor: str | None
     
\ No newline at end of file
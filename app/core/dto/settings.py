@@ -1,6 +1,6 @@
 import json
 
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import BaseModel, ConfigDict, TypeAdapter, field_validator
 
 
 class TimeRange(BaseModel):
@@ -40,3 +40,6 @@ class SettingsModel(BaseModel):
             except Exception:
                 return None
         return value
+
+
+SETTINGS_ADAPTER = TypeAdapter(SettingsModel)
@@ -1,20 +1,39 @@
+from typing import Any
 from uuid import UUID
-from sqlalchemy import and_, func, or_, select, distinct
+from sqlalchemy import JSON, RowMapping, Select, and_, any_, func, or_, select, distinct, null, text, true, tuple_, type_coerce
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.core.repositories.base import SqlAlchemyRepository
-from app.infrastructure.database.models.product import Product, ProductCharacteristic, CharacteristicType
+from app.infrastructure.database.models.product import (
+    CharacteristicType,
+    Product,
+    ProductCharacteristic,
+    ProductImage,
+)
 from app.infrastructure.database.models.category import Category
 
 
+# Сортировки списка: (ключ, по убыванию). Второй ключ — Product.id в том же
+# направлении, чтобы порядок был полным и работала keyset-пагинация.
+# Под каждую есть индекс (ключ, id), в том числе с category_id впереди
+PRODUCT_SORT_KEYS = {
+    "price_asc": (Product.price, False),
+    "price_desc": (Product.price, True),
+    "newest": (Product.created_at, True),
+    "discount": (func.coalesce(Product.discount_percent, 0), True),
+}
+
+
 class ProductRepository(SqlAlchemyRepository[Product]):
     
     def __init__(self, session: AsyncSession):
         super().__init__(session, Product)
     
-    async def get_filtered_products(
+    def _filtered_query(
         self,
+        query: Select,
         price_min: int | None = None,
         price_max: int | None = None,
         category_ids: list[UUID] | None = None,
@@ -22,16 +41,15 @@ class ProductRepository(SqlAlchemyRepository[Product]):
         limit: int | None = None,
         offset: int | None = None,
         slug: str | None = None,
-    ) -> list[Product]:
-        
-        query = (
-            select(Product)
-            .options(
-                selectinload(Product.images),
-                selectinload(Product.characteristics).selectinload(ProductCharacteristic.characteristic_type)
-            )
-        )
-        
+        sort: str = "newest",
+        after: tuple[Any, UUID] | None = None,
+    ) -> Select:
+        """
+        Условия фильтра каталога поверх query (select(Product) или карточки).
+
+        after — значения (ключ сортировки, id) последнего товара предыдущей
+        страницы: следующая страница начинается строго после него.
+        """
         if category_ids:
             query = query.where(Product.category_id.in_(category_ids))
         
@@ -45,49 +63,208 @@ class ProductRepository(SqlAlchemyRepository[Product]):
             query = query.join(Category, Product.category_id == Category.id).where(Category.slug == slug)
         
         if characteristics:
-            query = (
-                query
-                .join(ProductCharacteristic, Product.id == ProductCharacteristic.product_id)
-                .join(CharacteristicType, ProductCharacteristic.characteristic_type_id == CharacteristicType.id)
-            )
-            
+            # Тип — скалярным подзапросом, а не JOIN: тогда каждая ветка OR
+            # ссылается только на product_characteristics и идёт по индексу
+            # (characteristic_type_id, value), а не по всей таблице
             conditions = []
             for char_slug, char_value in characteristics.items():
+                type_id = select(CharacteristicType.id).where(CharacteristicType.slug == char_slug).scalar_subquery()
                 conditions.append(
                     and_(
-                        CharacteristicType.slug == char_slug,
+                        ProductCharacteristic.characteristic_type_id == type_id,
                         ProductCharacteristic.value == char_value
                     )
                 )
             
-            query = query.where(or_(*conditions))
-            
-            query = (
-                query
-                .group_by(Product.id)
-                .having(func.count(Product.id) >= len(characteristics))
+            # Товары, у которых совпали все пары характеристик. Подзапросом,
+            # а не GROUP BY по внешнему запросу: так он не мешает проекциям.
+            # = ANY(ARRAY(...)), а не IN: IN планировщик превращает в hash join
+            # с чтением всей таблицы products, а массив id всегда идёт по pkey
+            matching = (
+                select(ProductCharacteristic.product_id)
+                .where(or_(*conditions))
+                .group_by(ProductCharacteristic.product_id)
+                .having(func.count() >= len(characteristics))
             )
+            query = query.where(Product.id == any_(func.array(matching.scalar_subquery())))
+
+        key, descending = PRODUCT_SORT_KEYS[sort]
+        if after is not None:
+            position = tuple_(key, Product.id)
+            query = query.where(position < tuple_(*after) if descending else position > tuple_(*after))
+        if descending:
+            query = query.order_by(key.desc(), Product.id.desc())
+        else:
+            query = query.order_by(key.asc(), Product.id.asc())
         
         if limit:
             query = query.limit(limit)
         if offset:
             query = query.offset(offset)
+        return query
+
+    def _home_query(
+        self,
+        query: Select,
+        is_new: bool = False,
+        is_featured: bool = False,
+        is_sales: bool = False,
+        limit: int = 9
+    ) -> Select:
+        query = query.where(Product.is_active == True)
         
-        result = await self.session.execute(query)
-        return list(result.scalars().unique().all())
+        if is_new:
+            query = query.order_by(Product.created_at.desc())
+        elif is_featured:
+            query = query.where(Product.is_featured == True).order_by(Product.created_at.desc())
+        elif is_sales:
+            query = query.where(Product.discount_percent != None).order_by(Product.created_at.desc())
+        else:
+            query = query.order_by(Product.created_at.desc())
+        
+        return query.limit(limit)
 
-    async def get_by_slug(self, slug: str) -> Product | None:
-        query = (
+    def _search_query(self, query: Select, search_query: str, limit: int = 20, offset: int = 0) -> Select:
+        return (
+            query
+            .where(
+                and_(
+                    Product.is_active == True,
+                    Product.name.ilike(f"%{search_query}%")
+                )
+            )
+            .order_by(Product.created_at.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+
+    @staticmethod
+    def _full_query() -> Select:
+        return (
             select(Product)
             .options(
                 selectinload(Product.images),
                 selectinload(Product.characteristics).selectinload(ProductCharacteristic.characteristic_type)
             )
-            .where(Product.slug == slug)
         )
+
+    @staticmethod
+    def _card_query() -> Select:
+        """
+        Карточки списка: только нужные колонки товара и путь первого изображения.
+
+        Описание, характеристики и остальные изображения не читаются. Первое
+        изображение — коррелированный подзапрос по индексу product_id в списке
+        колонок: PostgreSQL вычисляет его уже после сортировки и LIMIT, только
+        для строк страницы.
+        """
+        first_image = (
+            select(ProductImage.image_path)
+            .where(ProductImage.product_id == Product.id)
+            .order_by(ProductImage.order, ProductImage.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+        return select(
+            Product.id,
+            Product.name,
+            Product.slug,
+            Product.price,
+            Product.discount_percent,
+            Product.old_price,
+            Product.is_featured,
+            Product.category_id,
+            Product.created_at,
+            first_image.label("image"),
+        )
+
+    async def get_filtered_products(self, **filters) -> list[Product]:
+        """Товары по фильтру каталога (аргументы — как у _filtered_query)."""
+        query = self._filtered_query(self._full_query(), **filters)
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def get_filtered_cards(self, **filters) -> list[RowMapping]:
+        """Карточки товаров по фильтру каталога."""
+        query = self._filtered_query(self._card_query(), **filters)
+        result = await self.session.execute(query)
+        return list(result.mappings().all())
+
+    async def get_by_slug(self, slug: str) -> Product | None:
+        query = self._full_query().where(Product.slug == slug)
         result = await self.session.execute(query)
         return result.scalars().one_or_none()
 
+    @property
+    def supports_json_detail(self) -> bool:
+        """Доступна ли загрузка товара одним запросом (get_detail_by_slug)."""
+        return self.session.get_bind().dialect.name == "postgresql"
+
+    async def get_detail_by_slug(self, slug: str) -> RowMapping | None:
+        """
+        Товар с изображениями и характеристиками одним запросом (только PostgreSQL).
+
+        Вместо трёх обращений get_by_slug (товар + два selectinload) связи
+        собираются коррелированными подзапросами json_agg: images и
+        characteristics приходят уже разобранными списками словарей.
+        """
+        images = (
+            select(
+                func.coalesce(
+                    func.json_agg(
+                        aggregate_order_by(
+                            func.json_build_object(
+                                "id", ProductImage.id,
+                                "image_path", ProductImage.image_path,
+                                "order", ProductImage.order,
+                            ),
+                            ProductImage.order,
+                            ProductImage.id,
+                        )
+                    ),
+                    text("'[]'::json"),
+                )
+            )
+            .where(ProductImage.product_id == Product.id)
+            .scalar_subquery()
+        )
+        characteristics = (
+            select(
+                func.coalesce(
+                    func.json_agg(
+                        func.json_build_object(
+                            "name", CharacteristicType.name,
+                            "value", ProductCharacteristic.value,
+                        )
+                    ),
+                    text("'[]'::json"),
+                )
+            )
+            .select_from(ProductCharacteristic)
+            .join(CharacteristicType, ProductCharacteristic.characteristic_type_id == CharacteristicType.id)
+            .where(ProductCharacteristic.product_id == Product.id)
+            .scalar_subquery()
+        )
+        query = (
+            select(
+                Product.id,
+                Product.name,
+                Product.slug,
+                Product.description,
+                Product.price,
+                Product.discount_percent,
+                Product.old_price,
+                Product.is_active,
+                Product.is_featured,
+                Product.category_id,
+                type_coerce(images, JSON).label("images"),
+                type_coerce(characteristics, JSON).label("characteristics"),
+            )
+            .where(Product.slug == slug)
+        )
+        result = await self.session.execute(query)
+        return result.mappings().one_or_none()
+
     async def get_by_ids(
         self,
         ids: list[UUID],
@@ -110,28 +287,20 @@ class ProductRepository(SqlAlchemyRepository[Product]):
         is_sales: bool = False,
         limit: int = 9
     ) -> list[Product]:
-        query = (
-            select(Product)
-            .where(Product.is_active == True)
-            .options(
-                selectinload(Product.images),
-                selectinload(Product.characteristics).selectinload(ProductCharacteristic.characteristic_type)
-            )
-            .limit(limit)
-        )
-        
-        if is_new:
-            query = query.order_by(Product.created_at.desc())
-        elif is_featured:
-            query = query.where(Product.is_featured == True).order_by(Product.created_at.desc())
-        elif is_sales:
-            query = query.where(Product.discount_percent != None).order_by(Product.created_at.desc())
-        else:
-            query = query.order_by(Product.created_at.desc())
-        
-        query = query.limit(limit)
+        query = self._home_query(self._full_query(), is_new, is_featured, is_sales, limit)
         result = await self.session.execute(query)
         return list(result.scalars().all())
+
+    async def get_home_cards(
+        self,
+        is_new: bool = False,
+        is_featured: bool = False,
+        is_sales: bool = False,
+        limit: int = 9
+    ) -> list[RowMapping]:
+        query = self._home_query(self._card_query(), is_new, is_featured, is_sales, limit)
+        result = await self.session.execute(query)
+        return list(result.mappings().all())
     
     async def search_by_name(
         self,
@@ -139,36 +308,137 @@ class ProductRepository(SqlAlchemyRepository[Product]):
         limit: int = 20,
         offset: int = 0
     ) -> list[Product]:
-        query = (
-            select(Product)
-            .where(
-                and_(
-                    Product.is_active == True,
-                    Product.name.ilike(f"%{search_query}%")
-                )
-            )
-            .options(
-                selectinload(Product.images),
-                selectinload(Product.characteristics).selectinload(ProductCharacteristic.characteristic_type)
-            )
-            .order_by(Product.created_at.desc())
-            .limit(limit)
-            .offset(offset)
-        )
-        
+        query = self._search_query(self._full_query(), search_query, limit, offset)
         result = await self.session.execute(query)
-        return list(result.scalars().unique().all())
+        return list(result.scalars().all())
+
+    async def search_cards(
+        self,
+        search_query: str,
+        limit: int = 20,
+        offset: int = 0
+    ) -> list[RowMapping]:
+        query = self._search_query(self._card_query(), search_query, limit, offset)
+        result = await self.session.execute(query)
+        return list(result.mappings().all())
     
-    async def get_categories_with_count(self) -> list[tuple[Category, int]]:
-        query = (
-            select(Category, func.count(Product.id).label("product_count"))
-            .join(Product, Category.id == Product.category_id)
+    @staticmethod
+    def _price_histogram_query(buckets: int, category_id=None) -> Select:
+        """
+        (min, max, номер корзины, товаров) по ценам активных товаров.
+
+        Диапазон [min, max] делится на корзины равной целой ширины
+        (max - min + buckets) // buckets; пустые корзины строк не дают.
+        category_id — UUID или SQL-выражение.
+        """
+        conditions = [Product.is_active == True]
+        if category_id is not None:
+            conditions.append(Product.category_id == category_id)
+
+        bounds = (
+            select(func.min(Product.price).label("lo"), func.max(Product.price).label("hi"))
+            .where(*conditions)
+            .cte("bounds")
+        )
+        width = (bounds.c.hi - bounds.c.lo + buckets) // buckets
+        bucket = ((Product.price - bounds.c.lo) // width).label("bucket")
+        return (
+            select(bounds.c.lo, bounds.c.hi, bucket, func.count().label("count"))
+            .select_from(Product)
+            .join(bounds, true())
+            .where(*conditions)
+            .group_by(bounds.c.lo, bounds.c.hi, bucket)
+        )
+
+    async def get_filter_facets(self, buckets: int, category_slug: str | None = None) -> RowMapping:
+        """
+        Всё для боковой панели фильтров одним запросом (только PostgreSQL).
+
+        Колонки — JSON-списки, собранные json_agg:
+        categories — [{id, name, slug, count}] категорий с активными товарами;
+        characteristics — [{name, slug, values}] с уникальными значениями
+        у активных товаров; price — строки гистограммы [{lo, hi, bucket, count}]
+        (см. _price_histogram_query), по категории category_slug, если задана.
+        category_id — id этой категории (None, если её нет).
+        """
+        category_id = None
+        if category_slug:
+            category_id = select(Category.id).where(Category.slug == category_slug).scalar_subquery()
+
+        counts = (
+            select(
+                Category.id,
+                Category.name,
+                Category.slug,
+                Category.order,
+                Category.active_products_count.label("count"),
+            )
+            .where(Category.active_products_count > 0)
+            .subquery("category_counts")
+        )
+        categories = select(
+            func.coalesce(
+                func.json_agg(
+                    aggregate_order_by(
+                        func.json_build_object(
+                            "id", counts.c.id, "name", counts.c.name, "slug", counts.c.slug, "count", counts.c.count,
+                        ),
+                        counts.c.order,
+                        counts.c.name,
+                    )
+                ),
+                text("'[]'::json"),
+            )
+        ).scalar_subquery()
+
+        values = (
+            select(
+                CharacteristicType.name,
+                CharacteristicType.slug,
+                func.array_agg(
+                    aggregate_order_by(distinct(ProductCharacteristic.value), ProductCharacteristic.value)
+                ).label("values"),
+            )
+            .join(ProductCharacteristic, ProductCharacteristic.characteristic_type_id == CharacteristicType.id)
+            .join(Product, ProductCharacteristic.product_id == Product.id)
             .where(Product.is_active == True)
-            .group_by(Category.id)
+            .group_by(CharacteristicType.id)
+            .subquery("characteristic_values")
+        )
+        characteristics = select(
+            func.coalesce(
+                func.json_agg(
+                    aggregate_order_by(
+                        func.json_build_object("name", values.c.name, "slug", values.c.slug, "values", values.c["values"]),
+                        values.c.slug,
+                    )
+                ),
+                text("'[]'::json"),
+            )
+        ).scalar_subquery()
+
+        histogram = self._price_histogram_query(buckets, category_id).subquery("price_histogram")
+        price = select(
+            func.coalesce(
+                func.json_agg(
+                    func.json_build_object(
+                        "lo", histogram.c.lo, "hi", histogram.c.hi,
+                        "bucket", histogram.c.bucket, "count", histogram.c.count,
+                    )
+                ),
+                text("'[]'::json"),
+            )
+        ).scalar_subquery()
+
+        query = select(
+            type_coerce(categories, JSON).label("categories"),
+            type_coerce(characteristics, JSON).label("characteristics"),
+            type_coerce(price, JSON).label("price"),
+            (category_id if category_id is not None else null()).label("category_id"),
         )
         result = await self.session.execute(query)
-        return list(result.all())
-    
+        return result.mappings().one()
+
     async def get_unique_characteristic_values(self, characteristic_type_slug: str) -> list[str]:
         query = (
             select(distinct(ProductCharacteristic.value))
@@ -184,26 +454,3 @@ class ProductRepository(SqlAlchemyRepository[Product]):
         )
         result = await self.session.execute(query)
         return [row[0] for row in result.all()]
-    
-    async def get_all_characteristic_values_grouped(self) -> dict[str, list[str]]:
-        query = (
-            select(
-                CharacteristicType.slug,
-                ProductCharacteristic.value
-            )
-            .join(ProductCharacteristic, CharacteristicType.id == ProductCharacteristic.characteristic_type_id)
-            .join(Product, ProductCharacteristic.product_id == Product.id)
-            .where(Product.is_active == True)
-            .distinct()
-            .order_by(CharacteristicType.slug, ProductCharacteristic.value)
-        )
-        
-        result = await self.session.execute(query)
-        
-        grouped = {}
-        for slug, value in result.all():
-            if slug not in grouped:
-                grouped[slug] = []
-            grouped[slug].append(value)
-        
-        return grouped
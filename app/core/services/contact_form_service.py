@@ -1,11 +1,10 @@
-import asyncio
 from fastapi import BackgroundTasks
 
 from app.core.dto.contact_form import ContactFormCreateModel, ContactFormModel
 from app.core.dto.settings import SettingsModel
 from app.core.repositories.contact_form_repository import ContactFormRepository
 from app.core.repositories.settings_repository import SettingsRepository
-from app.infrastructure.email.sender import send_contact_form_notification
+from app.infrastructure.email.sender import schedule_notification, send_contact_form_notification
 from app.infrastructure.logging import get_logger
 
 logger = get_logger(__name__)
@@ -27,10 +26,9 @@ class ContactFormService:
 
         settings = await self._get_settings_safe()
         if settings:
-            if background_tasks:
-                background_tasks.add_task(send_contact_form_notification, settings, contact)
-            else:
-                asyncio.create_task(send_contact_form_notification(settings, contact))
+            schedule_notification(
+                "contact_form", send_contact_form_notification, settings, contact, background_tasks=background_tasks
+            )
 
         return contact
 
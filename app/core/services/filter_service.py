@@ -1,47 +1,62 @@
-from app.core.dto.filters import AvailableFiltersModel, CategoryFilterModel, CharacteristicFilterModel
+from app.core.dto.filters import (
+    AvailableFiltersModel,
+    CategoryFilterModel,
+    CharacteristicFilterModel,
+    PriceBucketModel,
+    PriceRangeModel,
+)
 from app.core.repositories.product_repository import ProductRepository
-from app.core.repositories.characteristic_repository import CharacteristicTypeRepository
+from app.infrastructure.errors.base import NotFoundError
+from app.utils.enums import CharacteristicTypeEnum
+
+PRICE_HISTOGRAM_BUCKETS = 20
 
 
 class FilterService:
-    def __init__(
-        self, 
-        product_repository: ProductRepository,
-        characteristic_repository: CharacteristicTypeRepository
-    ):
+    def __init__(self, product_repository: ProductRepository):
         self.product_repository = product_repository
-        self.characteristic_repository = characteristic_repository
-    
-    async def get_available_filters(self) -> AvailableFiltersModel:
-        categories_data = await self.product_repository.get_categories_with_count()
-        categories = [
-            CategoryFilterModel(
-                id=category.id,
-                name=category.name,
-                slug=category.slug,
-                count=count
+
+    @staticmethod
+    def _price_range(rows: list[dict]) -> PriceRangeModel:
+        """Гистограмма из строк _price_histogram_query; пустые корзины добавляются с нулём."""
+        if not rows:
+            return PriceRangeModel(min=None, max=None, histogram=[])
+
+        low, high = rows[0]["lo"], rows[0]["hi"]
+        counts = {row["bucket"]: row["count"] for row in rows}
+        # Та же ширина корзины, что в ProductRepository._price_histogram_query
+        width = (high - low + PRICE_HISTOGRAM_BUCKETS) // PRICE_HISTOGRAM_BUCKETS
+        histogram = [
+            PriceBucketModel(
+                min=low + index * width,
+                max=min(low + (index + 1) * width - 1, high),
+                count=counts.get(index, 0),
             )
-            for category, count in categories_data
+            for index in range((high - low) // width + 1)
         ]
-        
-        characteristic_types = await self.characteristic_repository.get_all_items()
-        
-        values_grouped = await self.product_repository.get_all_characteristic_values_grouped()
-        
-        characteristics = []
-        for char_type in characteristic_types:
-            values = values_grouped.get(char_type.slug, [])
-            if values:
-                characteristics.append(
-                    CharacteristicFilterModel(
-                        name=char_type.name.value,
-                        slug=char_type.slug,
-                        values=values
-                    )
-                )
-        
+        return PriceRangeModel(min=low, max=high, histogram=histogram)
+
+    async def get_available_filters(self, category_slug: str | None = None) -> AvailableFiltersModel:
+        """
+        Фильтры одним запросом к БД (ProductRepository.get_filter_facets).
+
+        Ответ кэшируется роутером до изменения каталога, поэтому запрос
+        выполняется только после изменений.
+        """
+        facets = await self.product_repository.get_filter_facets(PRICE_HISTOGRAM_BUCKETS, category_slug)
+        if category_slug and facets["category_id"] is None:
+            raise NotFoundError(f"Категория с slug '{category_slug}' не найдена")
+
         return AvailableFiltersModel(
-            categories=categories,
-            characteristics=characteristics
+            categories=[CategoryFilterModel(**category) for category in facets["categories"]],
+            characteristics=[
+                CharacteristicFilterModel(
+                    # В БД хранится имя члена перечисления (SIZE)
+                    name=CharacteristicTypeEnum[char["name"]],
+                    slug=char["slug"],
+                    values=char["values"],
+                )
+                for char in facets["characteristics"]
+            ],
+            price=self._price_range(facets["price"]),
         )
-
@@ -1,5 +1,6 @@
 import io
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import asyncio
 
@@ -14,6 +15,11 @@ from app.infrastructure.errors.image_errors import (
     EmptyImageFile,
     ImageProcessingError
 )
+from app.infrastructure.metrics import IMAGE_ENCODE_DURATION
+
+
+# Фоновое удаление файлов, не привязанное к запросу
+_delete_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="image-delete")
 
 
 class ImageService:
@@ -48,17 +54,18 @@ class ImageService:
     
     def _convert_and_save(self, contents: bytes, filepath: Path) -> None:
         try:
-            image = Image.open(io.BytesIO(contents))
-            
-            image = self._convert_to_rgb(image)
-            
-            image.save(
-                filepath,
-                "WEBP",
-                quality=APP_CONFIG.WEBP_QUALITY,
-                method=6,
-                optimize=True
-            )
+            with IMAGE_ENCODE_DURATION.time():
+                image = Image.open(io.BytesIO(contents))
+
+                image = self._convert_to_rgb(image)
+
+                image.save(
+                    filepath,
+                    "WEBP",
+                    quality=APP_CONFIG.WEBP_QUALITY,
+                    method=6,
+                    optimize=True
+                )
             
         except Exception as e:
             raise ImageProcessingError(str(e))
@@ -123,10 +130,23 @@ class ImageService:
     async def upload_multiple(
         self, 
         files: list[UploadFile], 
-        subfolder: str
-    ) -> list[str]:
-        tasks = [
-            self.upload_and_convert(file, subfolder)
-            for file in files
-        ]
-        return await asyncio.gather(*tasks)
+        subfolder: str,
+        max_concurrency: int | None = None,
+        return_exceptions: bool = False,
+    ) -> list[str | BaseException]:
+        semaphore = asyncio.Semaphore(max_concurrency or APP_CONFIG.IMAGE_UPLOAD_CONCURRENCY)
+
+        async def upload(file: UploadFile) -> str:
+            async with semaphore:
+                return await self.upload_and_convert(file, subfolder)
+
+        return await asyncio.gather(
+            *(upload(file) for file in files),
+            return_exceptions=return_exceptions,
+        )
+
+    def schedule_delete(self, image_paths: list[str]) -> None:
+        """Удалить файлы в фоновом потоке, не дожидаясь результата."""
+        images_dir = Path(APP_CONFIG.IMAGES_DIR)
+        for image_path in image_paths:
+            _delete_executor.submit(self._delete_file, images_dir / image_path)
@@ -1,4 +1,3 @@
-import asyncio
 from fastapi import BackgroundTasks
 
 from app.core.dto.order import OrderCreateModel, OrderModel
@@ -7,7 +6,7 @@ from app.core.repositories.order_repository import OrderRepository
 from app.core.repositories.product_repository import ProductRepository
 from app.core.repositories.settings_repository import SettingsRepository
 from app.infrastructure.database.models.order import Order, OrderItem
-from app.infrastructure.email.sender import send_order_notification
+from app.infrastructure.email.sender import schedule_notification, send_order_notification
 from app.infrastructure.errors.base import NotFoundError
 from app.infrastructure.logging import get_logger
 
@@ -74,10 +73,9 @@ class OrderService:
 
         settings = await self._get_settings_safe()
         if settings:
-            if background_tasks:
-                background_tasks.add_task(send_order_notification, settings, order_model)
-            else:
-                asyncio.create_task(send_order_notification(settings, order_model))
+            schedule_notification(
+                "order", send_order_notification, settings, order_model, background_tasks=background_tasks
+            )
 
         return order_model
 
@@ -1,8 +1,62 @@
-from app.core.dto.product import ProductFilterModel, ProductModel, BaseProductModel, ProductCharacteristicModel, ProductImageModel
+import base64
+import binascii
+import json
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from app.core.dto.product import (
+    ProductFilterModel,
+    ProductPage,
+    ProductSort,
+    ProductCardDict,
+    ProductDict,
+    ProductView,
+    BaseProductModel,
+)
 from app.core.repositories.product_repository import ProductRepository
 from app.infrastructure.errors.base import NotFoundError
+from app.infrastructure.errors.product_errors import InvalidProductCursor
 from app.infrastructure.errors.sitemap_errors import InvalidSitemapPassword
 from app.infrastructure.config.config import APP_CONFIG
+from app.utils.enums import CharacteristicTypeEnum
+from app.utils.url_helper import get_absolute_url
+
+
+def encode_cursor(sort: ProductSort, product) -> str:
+    """
+    Курсор после товара product (ORM-объект или строка карточки).
+
+    Содержит сортировку, значение её ключа и id: base64 от JSON, для клиента
+    непрозрачен.
+    """
+    get = product.__getitem__ if isinstance(product, Mapping) else lambda name: getattr(product, name)
+    if sort == "newest":
+        value = get("created_at").isoformat()
+    elif sort == "discount":
+        value = get("discount_percent") or 0
+    else:
+        value = get("price")
+    payload = json.dumps([sort, value, str(get("id"))], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(sort: ProductSort, cursor: str) -> tuple[Any, UUID]:
+    """(значение ключа сортировки, id) из курсора; курсор другой сортировки — ошибка."""
+    try:
+        cursor_sort, value, product_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if cursor_sort != sort:
+            raise ValueError(cursor_sort)
+        if sort == "newest":
+            value = datetime.fromisoformat(value)
+        elif not isinstance(value, int) or isinstance(value, bool):
+            raise ValueError(value)
+        if not isinstance(product_id, str):
+            raise ValueError(product_id)
+        return value, UUID(product_id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise InvalidProductCursor()
 
 
 class ProductService:
@@ -10,32 +64,83 @@ class ProductService:
     def __init__(self, repository: ProductRepository):
         self.repository = repository
     
-    def _convert_to_dto(self, product) -> ProductModel:
-        """Преобразовать Product в ProductModel с правильными характеристиками"""
-        return ProductModel(
-            id=product.id,
-            name=product.name,
-            slug=product.slug,
-            description=product.description,
-            price=product.price,
-            discount_percent=product.discount_percent,
-            is_active=product.is_active,
-            is_featured=product.is_featured,
-            category_id=product.category_id,
-            images=[
-                ProductImageModel.model_validate(img, from_attributes=True)
-                for img in sorted(product.images, key=lambda x: x.order)
+    def _convert_to_dto(self, product) -> ProductDict:
+        """
+        Преобразовать Product в ProductDict (поля ProductModel).
+
+        Без pydantic-валидации: данные уже типизированы ORM, old_price
+        хранится в БД, абсолютные URL изображений собираются здесь. Изображения приходят
+        отсортированными по order (order_by связи).
+        """
+        return {
+            "id": product.id,
+            "name": product.name,
+            "slug": product.slug,
+            "description": product.description,
+            "price": product.price,
+            "discount_percent": product.discount_percent,
+            "old_price": product.old_price,
+            "is_active": product.is_active,
+            "is_featured": product.is_featured,
+            "category_id": product.category_id,
+            "images": [
+                {"id": img.id, "image_path": get_absolute_url(img.image_path), "order": img.order}
+                for img in product.images
             ],
-            characteristics=[
-                ProductCharacteristicModel(
-                    name=char.characteristic_type.name,
-                    value=char.value
-                )
+            "characteristics": [
+                {"name": char.characteristic_type.name, "value": char.value}
                 for char in product.characteristics
-            ]
-        )
+            ],
+        }
     
-    async def get_by_slug(self, slug: str) -> ProductModel:
+    @staticmethod
+    def _convert_card(row) -> ProductCardDict:
+        """Строка проекции ProductRepository._card_query в ProductCardDict."""
+        image = row["image"]
+        return {
+            "id": row["id"],
+            "name": row["name"],
+            "slug": row["slug"],
+            "price": row["price"],
+            "discount_percent": row["discount_percent"],
+            "old_price": row["old_price"],
+            "is_featured": row["is_featured"],
+            "category_id": row["category_id"],
+            "image": get_absolute_url(image) if image else None,
+        }
+    
+    @staticmethod
+    def _convert_detail(row) -> ProductDict:
+        """Строка ProductRepository.get_detail_by_slug (связи в JSON) в ProductDict."""
+        return {
+            "id": row["id"],
+            "name": row["name"],
+            "slug": row["slug"],
+            "description": row["description"],
+            "price": row["price"],
+            "discount_percent": row["discount_percent"],
+            "old_price": row["old_price"],
+            "is_active": row["is_active"],
+            "is_featured": row["is_featured"],
+            "category_id": row["category_id"],
+            "images": [
+                {"id": UUID(img["id"]), "image_path": get_absolute_url(img["image_path"]), "order": img["order"]}
+                for img in row["images"]
+            ],
+            "characteristics": [
+                # В БД хранится имя члена перечисления (SIZE), в ответе — его значение
+                {"name": CharacteristicTypeEnum[char["name"]].value, "value": char["value"]}
+                for char in row["characteristics"]
+            ],
+        }
+    
+    async def get_by_slug(self, slug: str) -> ProductDict:
+        if self.repository.supports_json_detail:
+            row = await self.repository.get_detail_by_slug(slug)
+            if not row:
+                raise NotFoundError(f"Продукт с slug '{slug}' не найден")
+            return self._convert_detail(row)
+
         product = await self.repository.get_by_slug(slug)
         if not product:
             raise NotFoundError(f"Продукт с slug '{slug}' не найден")
@@ -54,19 +159,37 @@ class ProductService:
     async def get_filtered_products(
         self,
         filters: ProductFilterModel
-    ) -> list[ProductModel]:
-        products = await self.repository.get_filtered_products(
-            **filters.model_dump()
-        )
-        return [self._convert_to_dto(product) for product in products]
+    ) -> ProductPage:
+        params = filters.model_dump(exclude={"view", "cursor"})
+        if filters.cursor:
+            # Позицию задаёт курсор; offset вместе с ним молча пропускал бы товары
+            if filters.offset:
+                raise InvalidProductCursor("Курсор нельзя сочетать с offset")
+            params["after"] = decode_cursor(filters.sort, filters.cursor)
+
+        if filters.view == "card":
+            found = await self.repository.get_filtered_cards(**params)
+            items = [self._convert_card(row) for row in found]
+        else:
+            found = await self.repository.get_filtered_products(**params)
+            items = [self._convert_to_dto(product) for product in found]
+
+        next_cursor = None
+        if filters.limit and len(found) == filters.limit:
+            next_cursor = encode_cursor(filters.sort, found[-1])
+        return ProductPage(items, next_cursor)
     
     async def get_for_home(
         self,
         is_new: bool = False,
         is_featured: bool = False,
         is_sales: bool = False,
-        limit: int = 9
-    ) -> list[ProductModel]:
+        limit: int = 9,
+        view: ProductView = "full",
+    ) -> list[ProductDict] | list[ProductCardDict]:
+        if view == "card":
+            rows = await self.repository.get_home_cards(is_new, is_featured, is_sales, limit)
+            return [self._convert_card(row) for row in rows]
         products = await self.repository.get_for_home(is_new, is_featured, is_sales, limit)
         return [self._convert_to_dto(product) for product in products]
     
@@ -74,7 +197,11 @@ class ProductService:
         self,
         search_query: str,
         limit: int = 20,
-        offset: int = 0
-    ) -> list[ProductModel]:
+        offset: int = 0,
+        view: ProductView = "full",
+    ) -> list[ProductDict] | list[ProductCardDict]:
+        if view == "card":
+            rows = await self.repository.search_cards(search_query, limit, offset)
+            return [self._convert_card(row) for row in rows]
         products = await self.repository.search_by_name(search_query, limit, offset)
         return [self._convert_to_dto(product) for product in products]
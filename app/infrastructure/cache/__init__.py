@@ -0,0 +1,16 @@
+from app.infrastructure.cache.catalog import (
+    get_catalog_version,
+    invalidate_catalog,
+    on_catalog_invalidated,
+)
+from app.infrastructure.cache.refreshing import RefreshingCache
+from app.infrastructure.cache.responses import ResponseCache, response_cache
+
+__all__ = [
+    "RefreshingCache",
+    "ResponseCache",
+    "get_catalog_version",
+    "invalidate_catalog",
+    "on_catalog_invalidated",
+    "response_cache",
+]
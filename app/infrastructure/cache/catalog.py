@@ -0,0 +1,47 @@
+"""
+Версия каталога и событие его инвалидации.
+
+Любое изменение товаров или категорий в обход API (массовые действия
+админки, импорт) вызывает `invalidate_catalog` ровно один раз на операцию.
+Кэши подписываются через `on_catalog_invalidated` и сбрасывают данные,
+привязанные к предыдущей версии.
+"""
+from collections.abc import Callable
+from threading import Lock
+
+from app.infrastructure.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+CatalogListener = Callable[[int], None]
+
+_version = 0
+_lock = Lock()
+_listeners: list[CatalogListener] = []
+
+
+def get_catalog_version() -> int:
+    """Текущая версия каталога."""
+    return _version
+
+
+def on_catalog_invalidated(listener: CatalogListener) -> CatalogListener:
+    """Подписать обработчик на инвалидацию каталога (можно как декоратор)."""
+    _listeners.append(listener)
+    return listener
+
+
+def invalidate_catalog(reason: str, affected: int | None = None) -> int:
+    """Увеличить версию каталога и уведомить подписчиков."""
+    global _version
+    with _lock:
+        _version += 1
+        version = _version
+
+    logger.info("catalog_invalidated", reason=reason, affected=affected, version=version)
+    for listener in list(_listeners):
+        try:
+            listener(version)
+        except Exception:
+            logger.exception("catalog_listener_failed", reason=reason)
+    return version
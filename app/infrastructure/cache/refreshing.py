@@ -0,0 +1,124 @@
+"""
+Кэш готовых ответов с фоновым обновлением (stale-while-revalidate).
+
+Запрос получает тело из памяти, даже если оно устарело: устаревшая запись
+отдаётся сразу, а пересборка идёт в фоне. Ждать сборку приходится только
+при самом первом обращении к ключу, поэтому известные ключи стоит прогреть
+при старте: `warm` ждёт сборки, `prefetch` только запускает их (запрос,
+пришедший раньше, дождётся той же задачи).
+
+Запись устаревает, когда меняется версия каталога или проходит
+`interval` секунд. Фоновая задача (`start`) пересобирает все известные
+ключи раз в `interval` секунд и сразу после `invalidate_catalog`. Так
+подхватываются и изменения из других процессов, которые версию в этом
+процессе не меняют.
+"""
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from typing import NamedTuple
+
+from app.infrastructure.cache.catalog import get_catalog_version, on_catalog_invalidated
+from app.infrastructure.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class _Entry(NamedTuple):
+    body: bytes
+    version: int
+    built_at: float
+
+
+class RefreshingCache:
+    def __init__(self, build: Callable[[Hashable], Awaitable[bytes]], interval: float, name: str):
+        self.build = build
+        self.interval = interval
+        self.name = name
+        self._entries: dict[Hashable, _Entry] = {}
+        self._pending: dict[Hashable, asyncio.Task] = {}
+        self._wake: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+        on_catalog_invalidated(self._on_catalog_invalidated)
+
+    async def get(self, key: Hashable) -> bytes:
+        entry = self._entries.get(key)
+        if entry is None:
+            return await asyncio.shield(self._refresh(key))
+        if self._is_stale(entry):
+            self._refresh(key)
+        return entry.body
+
+    async def warm(self, keys: Iterable[Hashable]) -> None:
+        """Собрать ключи заранее; ошибки логируются и не мешают старту."""
+        await asyncio.gather(*(self._refresh(key) for key in keys), return_exceptions=True)
+
+    def prefetch(self, keys: Iterable[Hashable]) -> None:
+        """Начать сборку ключей в фоне, не дожидаясь её."""
+        for key in keys:
+            self._refresh(key)
+
+    def start(self) -> None:
+        """Запустить фоновое обновление в текущем цикле событий."""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name=f"{self.name}_refresh")
+
+    async def stop(self) -> None:
+        self._loop = None
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        # Идущие пересборки дожидаемся: отмена посреди запроса рвёт соединение с БД
+        await asyncio.gather(*self._pending.values(), return_exceptions=True)
+
+    def _is_stale(self, entry: _Entry) -> bool:
+        return entry.version != get_catalog_version() or time.monotonic() - entry.built_at > self.interval
+
+    def _refresh(self, key: Hashable) -> asyncio.Task:
+        """Задача пересборки ключа; одновременно для ключа идёт не больше одной."""
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.create_task(self._build(key))
+            self._pending[key] = task
+            task.add_done_callback(lambda done: self._on_done(key, done))
+        return task
+
+    def _on_done(self, key: Hashable, task: asyncio.Task) -> None:
+        self._pending.pop(key, None)
+        if not task.cancelled():
+            # Ошибка уже залогирована в _build; фоновые задачи никто не ждёт
+            task.exception()
+
+    async def _build(self, key: Hashable) -> bytes:
+        version = get_catalog_version()
+        started = time.perf_counter()
+        try:
+            body = await self.build(key)
+        except Exception:
+            logger.exception("refreshing_cache_build_failed", cache=self.name, key=str(key))
+            raise
+        self._entries[key] = _Entry(body, version, time.monotonic())
+        logger.debug(
+            "refreshing_cache_built",
+            cache=self.name,
+            key=str(key),
+            duration_ms=round((time.perf_counter() - started) * 1000, 1),
+        )
+        return body
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except TimeoutError:
+                pass
+            self._wake.clear()
+            await asyncio.gather(*(self._refresh(key) for key in list(self._entries)), return_exceptions=True)
+
+    def _on_catalog_invalidated(self, version: int) -> None:
+        # Инвалидация может прийти из потока админки: будим цикл потокобезопасно
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wake.set)
@@ -0,0 +1,49 @@
+"""
+Кэш готовых JSON-ответов для эндпоинтов, которые меняются только вместе с каталогом.
+
+Запись хранит версию каталога, при которой была собрана: после
+`invalidate_catalog` (массовые действия и любые коммиты ORM с товарами,
+категориями, FAQ и настройками в этом процессе) запись устаревает сразу.
+Изменения из других процессов (соседние воркеры uvicorn, импорт) этот
+процесс не видит, поэтому у записей есть ещё и TTL.
+"""
+import time
+from threading import Lock
+
+from app.infrastructure.cache.catalog import get_catalog_version, on_catalog_invalidated
+from app.infrastructure.config.config import APP_CONFIG
+
+
+class ResponseCache:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: dict[str, tuple[int, float, bytes]] = {}
+        self._lock = Lock()
+
+    def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        version, expires_at, body = entry
+        if version != get_catalog_version() or expires_at < time.monotonic():
+            return None
+        return body
+
+    def set(self, key: str, body: bytes, version: int) -> None:
+        """Сохранить ответ, собранный при версии каталога version."""
+        if version != get_catalog_version():
+            # Каталог поменялся, пока ответ собирался
+            return
+        with self._lock:
+            self._entries[key] = (version, time.monotonic() + self.ttl, body)
+
+    def clear(self, version: int | None = None) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# None, если кэш выключен (RESPONSE_CACHE_ENABLED=false)
+response_cache: ResponseCache | None = None
+if APP_CONFIG.RESPONSE_CACHE_ENABLED:
+    response_cache = ResponseCache(ttl=APP_CONFIG.RESPONSE_CACHE_TTL)
+    on_catalog_invalidated(response_cache.clear)
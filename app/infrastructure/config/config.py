@@ -1,5 +1,7 @@
 from functools import lru_cache
 from pathlib import Path
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -51,7 +53,39 @@ class AppConfig(Config):
     
     MAX_IMAGE_SIZE_MB: int = Field(default=10)
     WEBP_QUALITY: int = Field(default=85)
+    IMAGE_UPLOAD_CONCURRENCY: int = Field(default=4, description="Сколько изображений конвертируется одновременно")
     
+    DB_SCHEMA_CHECK: Literal["revision", "skip", "create_all"] = Field(
+        default="revision",
+        description="Что делать со схемой БД при старте: сверить ревизию alembic, пропустить или create_all (разработка)",
+    )
+
+    METRICS_ENABLED: bool = Field(default=False, description="Метрики Prometheus и эндпоинт /metrics")
+    METRICS_TOKEN: str = Field(
+        default="",
+        description="Если задан, /metrics отдаётся только с заголовком Authorization: Bearer <токен>",
+    )
+
+    # Кэш готовых JSON-ответов (фильтры, категории, FAQ, настройки)
+    RESPONSE_CACHE_ENABLED: bool = Field(default=True)
+    RESPONSE_CACHE_TTL: float = Field(
+        default=30.0,
+        description="Секунды: предел устаревания при изменениях из других процессов",
+    )
+
+    # Подборки главной (/product/home): отдаются из памяти, обновляются в фоне
+    HOME_RAILS_CACHE_ENABLED: bool = Field(default=True)
+    HOME_RAILS_REFRESH_INTERVAL: float = Field(
+        default=60.0,
+        description="Секунды между фоновыми пересборками подборок (и после изменений каталога — сразу)",
+    )
+
+    # Профилирование запросов (только для отладки: в ответах видны SQL и параметры)
+    PROFILING_ENABLED: bool = Field(default=False, description="Профиль SQL каждого запроса и /debug/profiles")
+    PROFILING_HISTORY: int = Field(default=200, description="Сколько последних профилей хранить в памяти")
+    PROFILING_CPU: bool = Field(default=False, description="Снимать CPU-профиль (pyinstrument или cProfile)")
+    PROFILING_CPU_THRESHOLD_MS: float = Field(default=200.0, description="CPU-профиль сохраняется для запросов дольше порога")
+
     SLOW_REQUEST_THRESHOLD: float = Field(default=1.0, description="Порог медленных запросов в секундах")
 
     CORS_ALLOWED_ORIGINS: str = Field(default="http://localhost:3000,http://localhost:5173")
@@ -59,6 +93,10 @@ class AppConfig(Config):
     SITEMAP_PASSWORD: str = Field(default="change-me-sitemap-secret")
     
     # Админ-панель
+    ADMIN_MOUNT: Literal["lazy", "eager", "disabled"] = Field(
+        default="lazy",
+        description="lazy — собрать при первом запросе, eager — при старте, disabled — не монтировать",
+    )
     ADMIN_USERNAME: str = Field(default="admin")
     ADMIN_PASSWORD: str = Field(default="admin123")
 
@@ -1,17 +1,74 @@
+import ast
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 
-from app.infrastructure.config.config import DB_CONFIG
+from app.infrastructure.config.config import APP_CONFIG, BASE_DIR, DB_CONFIG
 from app.infrastructure.database.models.base import Base
 from app.utils.test_db import test_db
 
 import app.infrastructure.database.events  # noqa: F401  
 
 
+class SchemaRevisionMismatch(RuntimeError):
+    """Ревизия БД не совпадает с head миграций: нужно выполнить alembic upgrade head."""
+
+
+MIGRATIONS_DIR = BASE_DIR / "migrations" / "versions"
+
+
+def read_migration_revisions(path: Path) -> tuple[str | None, tuple[str, ...]]:
+    """revision и down_revision файла миграции — литералы уровня модуля."""
+    revision, down_revisions = None, ()
+    for node in ast.parse(path.read_text(encoding="utf-8")).body:
+        if isinstance(node, ast.AnnAssign):
+            target, value = node.target, node.value
+        elif isinstance(node, ast.Assign) and len(node.targets) == 1:
+            target, value = node.targets[0], node.value
+        else:
+            continue
+        if not isinstance(target, ast.Name) or value is None:
+            continue
+        if target.id == "revision":
+            revision = ast.literal_eval(value)
+        elif target.id == "down_revision":
+            down = ast.literal_eval(value)
+            down_revisions = tuple(down) if isinstance(down, (list, tuple)) else ((down,) if down else ())
+    return revision, down_revisions
+
+
+def get_migration_heads() -> set[str]:
+    """
+    Head-ревизии из migrations/versions (без подключения к БД).
+
+    Файлы разбираются через ast, а не через alembic.script: импорт alembic
+    стоит ~200 мс старта каждого воркера.
+    """
+    revisions: set[str] = set()
+    parents: set[str] = set()
+    for path in MIGRATIONS_DIR.glob("*.py"):
+        revision, down_revisions = read_migration_revisions(path)
+        if revision:
+            revisions.add(revision)
+            parents.update(down_revisions)
+    return revisions - parents
+
+
 class DatabaseConnection:
     def __init__(self):
         self._engine = create_async_engine(
             url=DB_CONFIG.get_url(is_async=True),
         )
+        if APP_CONFIG.METRICS_ENABLED:
+            from app.infrastructure.metrics import instrument_engine
+
+            instrument_engine(self._engine.sync_engine, "async")
+        if APP_CONFIG.PROFILING_ENABLED:
+            from app.infrastructure.profiling import instrument_engine_profiling
+
+            instrument_engine_profiling(self._engine.sync_engine)
 
     async def get_session(self) -> AsyncSession:
         return AsyncSession(bind=self._engine)
@@ -21,5 +78,28 @@ class DatabaseConnection:
             await conn.run_sync(Base.metadata.create_all)
         # async with await self.get_session() as session:
         #     await test_db(session)
-        
-    
\ No newline at end of file
+
+    async def check_schema_revision(self) -> str:
+        """
+        Сверить alembic_version с head миграций.
+
+        Один SELECT вместо create_all: не берёт блокировок каталога, поэтому
+        одновременный старт многих воркеров не выстраивается в очередь.
+        """
+        expected = get_migration_heads()
+        try:
+            async with self._engine.connect() as conn:
+                result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+                current = set(result.scalars())
+        except ProgrammingError:
+            current = set()
+
+        if current != expected:
+            raise SchemaRevisionMismatch(
+                f"database revision {sorted(current) or 'none'} != migrations head {sorted(expected)}; "
+                "run `alembic upgrade head`"
+            )
+        return ", ".join(sorted(current))
+
+    async def close(self) -> None:
+        await self._engine.dispose()
@@ -1,6 +1,14 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from app.infrastructure.config.config import DB_CONFIG
+from app.infrastructure.config.config import APP_CONFIG, DB_CONFIG
 
 sync_engine = create_engine(DB_CONFIG.get_url(is_async=False))
+if APP_CONFIG.METRICS_ENABLED:
+    from app.infrastructure.metrics import instrument_engine
+
+    instrument_engine(sync_engine, "sync")
+if APP_CONFIG.PROFILING_ENABLED:
+    from app.infrastructure.profiling import instrument_engine_profiling
+
+    instrument_engine_profiling(sync_engine)
 sync_session_maker = sessionmaker(bind=sync_engine, expire_on_commit=False)
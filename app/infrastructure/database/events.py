@@ -1,9 +1,24 @@
+from itertools import chain
+
 from sqlalchemy import event
 from sqlalchemy.orm import Session, with_loader_criteria
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.infrastructure.cache import invalidate_catalog
 from app.infrastructure.database.models.base import Base
 
+# Таблицы, от которых зависят закэшированные ответы каталога
+CATALOG_TABLES = frozenset({
+    "products",
+    "product_images",
+    "product_characteristics",
+    "characteristic_types",
+    "categories",
+    "faqs",
+    "settings",
+})
+_CATALOG_CHANGED_KEY = "catalog_changed"
+
 
 @event.listens_for(Session, "do_orm_execute")
 def _filter_by_is_active(execute_state):
@@ -27,3 +42,26 @@ def _filter_by_is_active(execute_state):
             )
 
 
+# Изменения объектов через сессию сбрасывают кэш ответов после коммита.
+# Массовые UPDATE/DELETE в обход unit of work (session.execute(update(...)))
+# сюда не попадают — после них нужно вызвать invalidate_catalog явно,
+# как это делает bulk_update_products в админке.
+@event.listens_for(Session, "after_flush")
+def _collect_catalog_changes(session, flush_context):
+    if session.info.get(_CATALOG_CHANGED_KEY):
+        return
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if getattr(obj, "__tablename__", None) in CATALOG_TABLES:
+            session.info[_CATALOG_CHANGED_KEY] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_catalog_after_commit(session):
+    if session.info.pop(_CATALOG_CHANGED_KEY, False):
+        invalidate_catalog("orm_commit")
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_catalog_changes(session):
+    session.info.pop(_CATALOG_CHANGED_KEY, None)
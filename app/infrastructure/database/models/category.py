@@ -1,6 +1,6 @@
 import uuid
-from sqlalchemy import UUID, select, func
-from sqlalchemy.orm import Mapped, mapped_column, relationship, column_property, deferred
+from sqlalchemy import DDL, UUID, event
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import TYPE_CHECKING
 
 from app.infrastructure.database.models.base import Base
@@ -26,15 +26,11 @@ class Category(Base):
         cascade="all, delete-orphan"
     )
 
-    products_count: Mapped[int] = deferred(column_property(
-        select(func.count())
-        .select_from(Product)
-        .where(
-            Product.category_id == id
-        )
-        .correlate_except(Product)
-        .scalar_subquery()
-    ))
+    # Счётчики товаров категории (всех и активных). Ведёт БД: триггеры на
+    # products (PRODUCT_COUNT_TRIGGERS), в том числе при массовых UPDATE
+    # из админки и импорте, поэтому приложение их не пишет
+    products_count: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
+    active_products_count: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
 
     @property
     def image_url(self):
@@ -46,4 +42,74 @@ class Category(Base):
         return self.name
 
     def __repr__(self):
-        return f"<Category(name='{self.name}', slug='{self.slug}')>"
\ No newline at end of file
+        return f"<Category(name='{self.name}', slug='{self.slug}')>"
+
+
+# Пересчёт счётчиков категорий одним UPDATE на выражение по переходным
+# таблицам (new_rows/old_rows), а не по строке: массовые операции не
+# превращаются в тысячи обновлений одной строки categories.
+# Тот же SQL — в миграции e2a9c6d4b8f1.
+PRODUCT_COUNT_TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION products_category_counts() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE categories c
+            SET products_count = c.products_count + d.total,
+                active_products_count = c.active_products_count + d.active
+            FROM (
+                SELECT category_id, count(*) AS total, count(*) FILTER (WHERE is_active) AS active
+                FROM new_rows GROUP BY category_id
+            ) d
+            WHERE c.id = d.category_id;
+        ELSIF TG_OP = 'DELETE' THEN
+            UPDATE categories c
+            SET products_count = c.products_count - d.total,
+                active_products_count = c.active_products_count - d.active
+            FROM (
+                SELECT category_id, count(*) AS total, count(*) FILTER (WHERE is_active) AS active
+                FROM old_rows GROUP BY category_id
+            ) d
+            WHERE c.id = d.category_id;
+        ELSE
+            UPDATE categories c
+            SET products_count = c.products_count + d.total,
+                active_products_count = c.active_products_count + d.active
+            FROM (
+                SELECT category_id, sum(total) AS total, sum(active) AS active
+                FROM (
+                    SELECT category_id, 1 AS total, is_active::int AS active FROM new_rows
+                    UNION ALL
+                    SELECT category_id, -1, -is_active::int FROM old_rows
+                ) changes
+                GROUP BY category_id
+            ) d
+            WHERE c.id = d.category_id AND (d.total <> 0 OR d.active <> 0);
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER products_category_counts_insert AFTER INSERT ON products
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION products_category_counts()
+    """,
+    """
+    CREATE TRIGGER products_category_counts_update AFTER UPDATE ON products
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION products_category_counts()
+    """,
+    """
+    CREATE TRIGGER products_category_counts_delete AFTER DELETE ON products
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION products_category_counts()
+    """,
+]
+
+# Для схемы из create_all (DB_SCHEMA_CHECK=create_all); в остальных БД
+# (SQLite в check_admin_queries) счётчики не ведутся
+for statement in PRODUCT_COUNT_TRIGGERS:
+    event.listen(Product.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
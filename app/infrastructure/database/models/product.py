@@ -1,4 +1,5 @@
-from sqlalchemy import ForeignKey, Enum as SQLEnum
+from datetime import datetime
+from sqlalchemy import Computed, DateTime, ForeignKey, Index, Enum as SQLEnum, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import TYPE_CHECKING
 from uuid import UUID
@@ -15,12 +16,44 @@ if TYPE_CHECKING:
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # Фильтр каталога и сортировки списка (ключ, id) — в обе стороны,
+        # в том числе keyset-пагинация; с категорией и без
+        Index("ix_products_category_id_price_id", "category_id", "price", "id"),
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_category_id_created_at_id", "category_id", "created_at", "id"),
+        Index("ix_products_created_at_id", "created_at", "id"),
+        Index("ix_products_discount_id", text("coalesce(discount_percent, 0)"), "id"),
+        # Подборки главной и поиск (ORDER BY created_at DESC LIMIT): только активные товары
+        Index("ix_products_active_created_at", text("created_at DESC"), postgresql_where=text("is_active")),
+        Index(
+            "ix_products_featured_created_at",
+            text("created_at DESC"),
+            postgresql_where=text("is_active AND is_featured"),
+        ),
+        Index(
+            "ix_products_sale_created_at",
+            text("created_at DESC"),
+            postgresql_where=text("is_active AND discount_percent IS NOT NULL"),
+        ),
+    )
 
+    # Ключ сортировки "newest" и keyset-курсора: NULL выпал бы из сравнения (created_at, id)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     name: Mapped[str]
     slug: Mapped[str] = mapped_column(unique=True)
     description: Mapped[str | None]
     price: Mapped[int]
     discount_percent: Mapped[int | None] = mapped_column(nullable=True)
+    # price — цена, которую платит покупатель; old_price — цена до скидки для
+    # витрины. Вычисляет БД при записи (целочисленно, как calculate_old_price)
+    old_price: Mapped[int | None] = mapped_column(
+        Computed(
+            "CASE WHEN discount_percent > 0 AND discount_percent < 100 "
+            "THEN price * 100 / (100 - discount_percent) END",
+            persisted=True,
+        )
+    )
     is_active: Mapped[bool] = mapped_column(default=True)
     is_featured: Mapped[bool] = mapped_column(default=False)
     
@@ -29,7 +62,8 @@ class Product(Base):
     category: Mapped["Category"] = relationship(back_populates="products")
     images: Mapped[list["ProductImage"]] = relationship(
         back_populates="product",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        order_by="ProductImage.order",
     )
     characteristics: Mapped[list["ProductCharacteristic"]] = relationship(
         back_populates="product",
@@ -53,7 +87,7 @@ class ProductImage(Base):
     image_path: Mapped[str]
     order: Mapped[int] = mapped_column(default=0)
     
-    product_id: Mapped[UUID] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"))
+    product_id: Mapped[UUID] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"), index=True)
 
     product: Mapped["Product"] = relationship(back_populates="images")
 
@@ -81,10 +115,14 @@ class CharacteristicType(Base):
 
 class ProductCharacteristic(Base):
     __tablename__ = "product_characteristics"
+    __table_args__ = (
+        # Фильтр по характеристикам и списки значений для фильтров
+        Index("ix_product_characteristics_type_value", "characteristic_type_id", "value", "product_id"),
+    )
 
     value: Mapped[str]
     
-    product_id: Mapped[UUID] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"))
+    product_id: Mapped[UUID] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"), index=True)
     characteristic_type_id: Mapped[UUID] = mapped_column(ForeignKey("characteristic_types.id", ondelete="CASCADE"))
     
     product: Mapped["Product"] = relationship(back_populates="characteristics")
@@ -98,3 +136,4 @@ class ProductCharacteristic(Base):
         except (AttributeError, RuntimeError):
             pass
         return f"{type_name} - {self.value}"
+
@@ -19,7 +19,7 @@ class Review(Base):
     image: Mapped[str | None]
     is_active: Mapped[bool] = mapped_column(default=True)
     
-    product_id: Mapped[UUID] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"))
+    product_id: Mapped[UUID] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"), index=True)
     
     product: Mapped["Product"] = relationship(back_populates="reviews")
 
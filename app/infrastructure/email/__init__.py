@@ -1,3 +1,7 @@
-from app.infrastructure.email.sender import send_contact_form_notification, send_order_notification
+from app.infrastructure.email.sender import (
+    schedule_notification,
+    send_contact_form_notification,
+    send_order_notification,
+)
 
-__all__ = ["send_contact_form_notification", "send_order_notification"]
+__all__ = ["schedule_notification", "send_contact_form_notification", "send_order_notification"]
@@ -1,14 +1,18 @@
+from collections.abc import Awaitable, Callable
 from email.message import EmailMessage
 from pathlib import Path
+import asyncio
 import html
 
 import aiosmtplib
+from fastapi import BackgroundTasks
 
 from app.core.dto.contact_form import ContactFormModel
 from app.core.dto.order import OrderModel
 from app.core.dto.settings import SettingsModel
 from app.infrastructure.config.config import APP_CONFIG
 from app.infrastructure.logging import get_logger
+from app.infrastructure.metrics import EMAIL_QUEUE_DEPTH, EMAIL_SEND_DURATION
 
 
 logger = get_logger(__name__)
@@ -176,3 +180,29 @@ async def send_order_notification(
         )
     except Exception as exc:
         logger.error("order_email_failed", error=str(exc))
+
+
+async def _send_tracked(kind: str, notify: Callable[..., Awaitable[None]], *args) -> None:
+    try:
+        with EMAIL_SEND_DURATION.labels(kind).time():
+            await notify(*args)
+    finally:
+        EMAIL_QUEUE_DEPTH.labels(kind).dec()
+
+
+def schedule_notification(
+    kind: str,
+    notify: Callable[..., Awaitable[None]],
+    *args,
+    background_tasks: BackgroundTasks | None = None,
+) -> None:
+    """
+    Поставить письмо в очередь: после ответа (BackgroundTasks) или отдельной задачей.
+
+    Пока письмо не отправлено, оно учитывается в метрике email_queue_depth.
+    """
+    EMAIL_QUEUE_DEPTH.labels(kind).inc()
+    if background_tasks:
+        background_tasks.add_task(_send_tracked, kind, notify, *args)
+    else:
+        asyncio.create_task(_send_tracked(kind, notify, *args))
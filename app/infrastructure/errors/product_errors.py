@@ -0,0 +1,12 @@
+from fastapi import HTTPException, status
+
+
+class InvalidProductCursor(HTTPException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    detail = "Некорректный курсор пагинации"
+
+    def __init__(self, detail: str | None = None):
+        super().__init__(
+            status_code=self.status_code,
+            detail=detail or self.detail
+        )
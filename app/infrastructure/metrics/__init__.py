@@ -0,0 +1,28 @@
+from app.infrastructure.metrics.db import RequestDBStats, instrument_engine, request_db_stats
+from app.infrastructure.metrics.registry import (
+    DB_QUERIES_PER_REQUEST,
+    DB_TIME_PER_REQUEST,
+    EMAIL_QUEUE_DEPTH,
+    EMAIL_SEND_DURATION,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_PROGRESS,
+    IMAGE_ENCODE_DURATION,
+    mark_process_dead,
+    render_metrics,
+)
+
+
+__all__ = [
+    "DB_QUERIES_PER_REQUEST",
+    "DB_TIME_PER_REQUEST",
+    "EMAIL_QUEUE_DEPTH",
+    "EMAIL_SEND_DURATION",
+    "HTTP_REQUEST_DURATION",
+    "HTTP_REQUESTS_IN_PROGRESS",
+    "IMAGE_ENCODE_DURATION",
+    "RequestDBStats",
+    "instrument_engine",
+    "mark_process_dead",
+    "render_metrics",
+    "request_db_stats",
+]
@@ -0,0 +1,72 @@
+"""
+Метрики SQL: время каждого выражения, счётчики на HTTP-запрос и пул.
+
+Middleware метрик кладёт в контекст запроса RequestDBStats, а обработчики
+before/after_cursor_execute движка прибавляют к нему число выражений
+и их время.
+"""
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.infrastructure.metrics.registry import DB_POOL_CHECKED_OUT, DB_POOL_CONNECTIONS, DB_QUERY_DURATION
+
+_QUERY_START_KEY = "metrics_query_start"
+
+
+@dataclass(slots=True)
+class RequestDBStats:
+    queries: int = 0
+    seconds: float = 0.0
+
+
+request_db_stats: ContextVar[RequestDBStats | None] = ContextVar("request_db_stats", default=None)
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Подписать синхронный движок (для async — engine.sync_engine) на сбор метрик."""
+    query_duration = DB_QUERY_DURATION.labels(engine=name)
+    pool_connections = DB_POOL_CONNECTIONS.labels(engine=name)
+    pool_checked_out = DB_POOL_CHECKED_OUT.labels(engine=name)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_QUERY_START_KEY, []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get(_QUERY_START_KEY)
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        query_duration.observe(elapsed)
+        stats = request_db_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        # Упавшее выражение не доходит до after_cursor_execute
+        conn = exception_context.connection
+        if conn is not None and conn.info.get(_QUERY_START_KEY):
+            conn.info[_QUERY_START_KEY].pop()
+
+    @event.listens_for(engine.pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        pool_connections.inc()
+
+    @event.listens_for(engine.pool, "close")
+    def on_close(dbapi_connection, connection_record):
+        pool_connections.dec()
+
+    @event.listens_for(engine.pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_checked_out.inc()
+
+    @event.listens_for(engine.pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        pool_checked_out.dec()
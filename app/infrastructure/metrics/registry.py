@@ -0,0 +1,135 @@
+"""
+Метрики приложения в формате Prometheus.
+
+При нескольких воркерах uvicorn задайте PROMETHEUS_MULTIPROC_DIR (пустой
+каталог, очищаемый перед стартом): каждый процесс пишет значения в свои
+mmap-файлы, а /metrics в любом воркере отдаёт сумму по всем процессам.
+Гаужи «сколько сейчас» суммируются только по живым процессам (livesum).
+
+С METRICS_ENABLED=false prometheus_client не импортируется: метрики ниже —
+заглушки, вызовы которых ничего не делают.
+"""
+import os
+from contextlib import nullcontext
+
+from app.infrastructure.config.config import APP_CONFIG
+
+if APP_CONFIG.METRICS_ENABLED:
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Gauge, Histogram, generate_latest
+    from prometheus_client import multiprocess
+
+
+class NoopMetric:
+    """Метрика при выключенном сборе: принимает те же вызовы и ничего не пишет."""
+
+    def labels(self, *args, **kwargs) -> "NoopMetric":
+        return self
+
+    def observe(self, value: float) -> None:
+        pass
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def dec(self, amount: float = 1) -> None:
+        pass
+
+    def set(self, value: float) -> None:
+        pass
+
+    def time(self) -> nullcontext:
+        return nullcontext()
+
+
+def histogram(*args, **kwargs):
+    return Histogram(*args, **kwargs) if APP_CONFIG.METRICS_ENABLED else NoopMetric()
+
+
+def gauge(*args, **kwargs):
+    return Gauge(*args, **kwargs) if APP_CONFIG.METRICS_ENABLED else NoopMetric()
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+HTTP_REQUEST_DURATION = histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса по шаблону маршрута",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_PROGRESS = gauge(
+    "http_requests_in_progress",
+    "HTTP-запросы в обработке",
+    multiprocess_mode="livesum",
+)
+
+DB_QUERY_DURATION = histogram(
+    "db_query_duration_seconds",
+    "Время выполнения SQL-выражения",
+    ["engine"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_QUERIES_PER_REQUEST = histogram(
+    "db_queries_per_request",
+    "Число SQL-выражений за HTTP-запрос",
+    ["route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+DB_TIME_PER_REQUEST = histogram(
+    "db_time_per_request_seconds",
+    "Суммарное время SQL за HTTP-запрос",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CONNECTIONS = gauge(
+    "db_pool_connections",
+    "Открытые соединения пула",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = gauge(
+    "db_pool_checked_out",
+    "Соединения пула, выданные в работу",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+
+IMAGE_ENCODE_DURATION = histogram(
+    "image_encode_duration_seconds",
+    "Конвертация загруженного изображения в WebP",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+EMAIL_QUEUE_DEPTH = gauge(
+    "email_queue_depth",
+    "Письма, поставленные в очередь и ещё не отправленные",
+    ["kind"],
+    multiprocess_mode="livesum",
+)
+EMAIL_SEND_DURATION = histogram(
+    "email_send_duration_seconds",
+    "Отправка письма",
+    ["kind"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+
+def is_multiprocess() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Текст метрик для /metrics и его Content-Type."""
+    if is_multiprocess():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int) -> None:
+    """Убрать livesum-гаужи завершившегося воркера."""
+    if APP_CONFIG.METRICS_ENABLED and is_multiprocess():
+        multiprocess.mark_process_dead(pid)
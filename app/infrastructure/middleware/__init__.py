@@ -1,5 +1,8 @@
+from app.infrastructure.middleware.isolated_app import IsolatedASGIApp
+from app.infrastructure.middleware.lazy_app import LazyASGIApp
 from app.infrastructure.middleware.logging_middleware import LoggingMiddleware
+from app.infrastructure.middleware.metrics_middleware import MetricsMiddleware
+from app.infrastructure.middleware.profiling_middleware import ProfilingMiddleware
 
 
-__all__ = ["LoggingMiddleware"]
-
+__all__ = ["IsolatedASGIApp", "LazyASGIApp", "LoggingMiddleware", "MetricsMiddleware", "ProfilingMiddleware"]
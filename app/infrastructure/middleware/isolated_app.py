@@ -0,0 +1,83 @@
+import asyncio
+import contextvars
+import threading
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.infrastructure.logging.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class IsolatedASGIApp:
+    """
+    Запускает вложенное ASGI-приложение в собственном event loop в отдельном потоке.
+
+    Нужен для админ-панели: starlette-admin работает на синхронном движке,
+    и любой блокирующий вызов БД (ленивая загрузка связей, действия) стопорит
+    loop, на котором он выполняется. Здесь он стопорит только loop админки,
+    а запросы витрины продолжают обслуживаться. У loop админки свой пул
+    потоков anyio, так что и лимит потоков витрины админка не расходует.
+    """
+
+    def __init__(self, app: ASGIApp, name: str = "isolated-app"):
+        self.app = app
+        self.name = name
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def routes(self):
+        """Маршруты вложенного приложения — нужны для url_for через Mount."""
+        return getattr(self.app, "routes", [])
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name=self.name, daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+                logger.info("isolated_loop_started", name=self.name)
+            return self._loop
+
+    def close(self) -> None:
+        """Остановить loop вложенного приложения."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+        logger.info("isolated_loop_stopped", name=self.name)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        caller_loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+
+        async def isolated_receive():
+            return await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(receive(), caller_loop)
+            )
+
+        async def isolated_send(message) -> None:
+            await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(send(message), caller_loop)
+            )
+
+        async def run() -> None:
+            # Переносим контекст запроса (request_id для логов и т.п.)
+            for var, value in context.items():
+                var.set(value)
+            await self.app(scope, isolated_receive, isolated_send)
+
+        future = asyncio.run_coroutine_threadsafe(run(), self._ensure_loop())
+        await asyncio.wrap_future(future)
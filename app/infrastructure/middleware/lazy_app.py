@@ -0,0 +1,57 @@
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.infrastructure.logging.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class LazyASGIApp:
+    """
+    ASGI-приложение, которое собирается при первом запросе.
+
+    Нужен для админ-панели: её импорт тянет starlette-admin, шаблоны, локали
+    и синхронный движок БД. Процессы, которые обслуживают только витрину,
+    этой цены не платят, а первый запрос к админке собирает её один раз.
+    """
+
+    def __init__(self, factory: Callable[[], ASGIApp], name: str = "lazy-app"):
+        self.factory = factory
+        self.name = name
+        self._app: ASGIApp | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def routes(self):
+        """Маршруты собранного приложения — нужны для url_for через Mount."""
+        return getattr(self._app, "routes", [])
+
+    def _build(self) -> ASGIApp:
+        with self._lock:
+            if self._app is None:
+                started = time.perf_counter()
+                self._app = self.factory()
+                logger.info(
+                    "lazy_app_built",
+                    name=self.name,
+                    duration_ms=round((time.perf_counter() - started) * 1000, 1),
+                )
+            return self._app
+
+    def close(self) -> None:
+        """Закрыть собранное приложение, если оно было собрано и умеет закрываться."""
+        close = getattr(self._app, "close", None)
+        if close is not None:
+            close()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        app = self._app
+        if app is None:
+            # Сборка синхронная (импорт модулей) — выполняем вне event loop
+            app = await asyncio.to_thread(self._build)
+        await app(scope, receive, send)
@@ -1,10 +1,9 @@
+import logging
 import time
 import uuid
-from typing import Callable
-from fastapi import Request, Response
+
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import structlog
 
 from app.infrastructure.logging.logger import get_logger
@@ -16,52 +15,76 @@ from app.infrastructure.errors.base import InternalServerError
 logger = get_logger(__name__)
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
+class LoggingMiddleware:
+    """
+    Request ID, время обработки и лог каждого запроса.
+
+    Чистое ASGI-middleware: тело ответа проходит через send как есть, без
+    промежуточной задачи и потока памяти BaseHTTPMiddleware, поэтому
+    стриминговые ответы не буферизуются. Поля лога (путь, строка запроса)
+    собираются только если строка лога действительно будет записана.
+    """
+
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        self.app = app
+        self.slow_threshold_ns = int(APP_CONFIG.SLOW_REQUEST_THRESHOLD * 1_000_000_000)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         request_id = str(uuid.uuid4())
         structlog.contextvars.clear_contextvars()
         structlog.contextvars.bind_contextvars(request_id=request_id)
-        
-        start_time = time.time()
-        
+
+        start_ns = time.perf_counter_ns()
+        status_code = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                process_time = (time.perf_counter_ns() - start_ns) / 1_000_000_000
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                headers.append((b"x-process-time", str(process_time).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
         try:
-            response = await call_next(request)
-            process_time = time.time() - start_time
-            
-            response.headers["X-Request-ID"] = request_id
-            response.headers["X-Process-Time"] = str(process_time)
-            
-            log_data = {
-                "method": request.method,
-                "path": request.url.path,
-                "query_params": str(request.query_params) if request.query_params else None,
-                "status_code": response.status_code,
-                "process_time": round(process_time, 3),
-            }
-            
-            if process_time > APP_CONFIG.SLOW_REQUEST_THRESHOLD:
-                logger.warning("slow_request", **log_data)
-            else:
-                logger.info("request_completed", **log_data)
-            
-            return response
-        
+            await self.app(scope, receive, send_wrapper)
         except Exception as exc:
-            print(f"Error: {exc}")
-            process_time = time.time() - start_time
+            elapsed_ns = time.perf_counter_ns() - start_ns
             logger.error(
                 "request_error",
-                method=request.method,
-                path=request.url.path,
-                query_params=str(request.query_params) if request.query_params else None,
-                process_time=round(process_time, 3),
+                **self._log_fields(scope, elapsed_ns),
                 error=str(exc),
                 exc_info=True,
             )
-            return JSONResponse(
-                status_code=InternalServerError.status_code, 
-                content={"detail": InternalServerError.detail}
+            if status_code is not None:
+                # Заголовки уже отправлены — корректный 500 вернуть нельзя
+                raise
+            response = JSONResponse(
+                status_code=InternalServerError.status_code,
+                content={"detail": InternalServerError.detail},
             )
+            await response(scope, receive, send_wrapper)
+            return
+
+        elapsed_ns = time.perf_counter_ns() - start_ns
+        if elapsed_ns > self.slow_threshold_ns:
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning("slow_request", **self._log_fields(scope, elapsed_ns), status_code=status_code)
+        elif logger.isEnabledFor(logging.INFO):
+            logger.info("request_completed", **self._log_fields(scope, elapsed_ns), status_code=status_code)
+
+    @staticmethod
+    def _log_fields(scope: Scope, elapsed_ns: int) -> dict:
+        query_string = scope.get("query_string", b"")
+        return {
+            "method": scope["method"],
+            "path": scope["path"],
+            "query_params": query_string.decode("latin-1") if query_string else None,
+            "process_time": round(elapsed_ns / 1_000_000_000, 3),
+        }
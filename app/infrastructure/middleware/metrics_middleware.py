@@ -0,0 +1,74 @@
+import time
+
+from starlette.routing import Mount
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.infrastructure.metrics import (
+    DB_QUERIES_PER_REQUEST,
+    DB_TIME_PER_REQUEST,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_PROGRESS,
+    RequestDBStats,
+    request_db_stats,
+)
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Шаблон маршрута (`/api/v1/product/{slug}`) вместо фактического пути.
+
+    Так число временных рядов не растёт с числом товаров; запросы мимо
+    маршрутов собираются под одной меткой.
+    """
+    route = scope.get("route")
+    if isinstance(route, Mount):
+        return f"{route.path}/{{path}}"
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        # Смонтированные приложения (статика, админка) выставляют root_path
+        root_path = scope.get("root_path")
+        return f"{root_path}/{{path}}" if root_path else "unmatched"
+
+    # У маршрутов из include_router шаблон может быть без префиксов роутеров:
+    # ищем самый длинный суффикс пути, который совпадает с маршрутом
+    path = scope["path"]
+    for index, char in enumerate(path):
+        if char == "/" and route.path_regex.match(path[index:]):
+            return path[:index] + path_format
+    return path_format
+
+
+class MetricsMiddleware:
+    """Гистограммы времени ответа и SQL по маршрутам для /metrics."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestDBStats()
+        token = request_db_stats.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            request_db_stats.reset(token)
+
+            route = route_template(scope)
+            HTTP_REQUEST_DURATION.labels(scope["method"], route, str(status_code)).observe(elapsed)
+            DB_QUERIES_PER_REQUEST.labels(route).observe(stats.queries)
+            DB_TIME_PER_REQUEST.labels(route).observe(stats.seconds)
@@ -0,0 +1,59 @@
+import time
+import uuid
+
+import structlog
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.infrastructure.profiling import CPUProfiler, ProfileStore, RequestProfile, current_profile
+
+
+class ProfilingMiddleware:
+    """
+    Профиль SQL (и по желанию CPU) для каждого запроса — только для отладки.
+
+    Итоги добавляются в заголовки ответа (X-SQL-Count, X-SQL-Time-Ms,
+    X-SQL-Cache-Hits), полный список выражений доступен по ссылке
+    из X-Debug-Profile. CPU-профиль сохраняется только для запросов
+    дольше cpu_threshold_ms.
+    """
+
+    def __init__(self, app: ASGIApp, store: ProfileStore, cpu: bool = False, cpu_threshold_ms: float = 200.0):
+        self.app = app
+        self.store = store
+        self.cpu = cpu
+        self.cpu_threshold_ms = cpu_threshold_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith("/debug/"):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = structlog.contextvars.get_contextvars().get("request_id") or str(uuid.uuid4())
+        profile = RequestProfile(request_id=request_id, method=scope["method"], path=scope["path"])
+        token = current_profile.set(profile)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-sql-count", str(len(profile.statements)).encode()))
+                headers.append((b"x-sql-time-ms", f"{profile.sql_time_ms:.2f}".encode()))
+                headers.append((b"x-sql-cache-hits", str(profile.cache_hits).encode()))
+                headers.append((b"x-debug-profile", f"/debug/profiles/{request_id}".encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        cpu_profiler = CPUProfiler() if self.cpu else None
+        cpu_started = cpu_profiler.start() if cpu_profiler else False
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.duration_ms = (time.perf_counter() - start) * 1000
+            current_profile.reset(token)
+            if cpu_started:
+                cpu_profiler.stop()
+                if profile.duration_ms >= self.cpu_threshold_ms:
+                    profile.cpu_profile = cpu_profiler.render()
+                    profile.cpu_profile_type = cpu_profiler.kind
+            self.store.add(profile)
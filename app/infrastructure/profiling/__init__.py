@@ -0,0 +1,18 @@
+from app.infrastructure.profiling.cpu import CPUProfiler
+from app.infrastructure.profiling.sql import (
+    RequestProfile,
+    StatementProfile,
+    current_profile,
+    instrument_engine_profiling,
+)
+from app.infrastructure.profiling.store import ProfileStore
+
+
+__all__ = [
+    "CPUProfiler",
+    "ProfileStore",
+    "RequestProfile",
+    "StatementProfile",
+    "current_profile",
+    "instrument_engine_profiling",
+]
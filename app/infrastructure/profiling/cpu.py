@@ -0,0 +1,58 @@
+"""
+CPU-профиль запроса: pyinstrument (если установлен) или cProfile.
+
+Профилировщик в процессе может быть только один, поэтому одновременно
+профилируется один запрос, остальные в это время идут без CPU-профиля.
+cProfile видит весь поток, то есть и чужие корутины на том же event loop —
+для отладки на локальной машине этого достаточно.
+"""
+import cProfile
+import io
+import pstats
+from threading import Lock
+
+_busy = Lock()
+
+
+class CPUProfiler:
+    def __init__(self):
+        self.kind: str | None = None
+        self._profiler = None
+
+    def start(self) -> bool:
+        if not _busy.acquire(blocking=False):
+            return False
+        try:
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                self.kind, self._profiler = "cprofile", cProfile.Profile()
+                self._profiler.enable()
+            else:
+                self.kind, self._profiler = "pyinstrument", Profiler(async_mode="enabled")
+                self._profiler.start()
+        except Exception:
+            # Например, уже активен внешний профилировщик
+            self._profiler = None
+            _busy.release()
+            return False
+        return True
+
+    def stop(self) -> None:
+        if self._profiler is None:
+            return
+        try:
+            if self.kind == "pyinstrument":
+                self._profiler.stop()
+            else:
+                self._profiler.disable()
+        finally:
+            _busy.release()
+
+    def render(self) -> str:
+        """HTML pyinstrument или текстовый отчёт pstats по суммарному времени."""
+        if self.kind == "pyinstrument":
+            return self._profiler.output_html()
+        output = io.StringIO()
+        pstats.Stats(self._profiler, stream=output).sort_stats("cumulative").print_stats(60)
+        return output.getvalue()
@@ -0,0 +1,98 @@
+"""
+Профилирование SQL в рамках одного HTTP-запроса (режим отладки).
+
+ProfilingMiddleware кладёт в контекст запроса RequestProfile, а обработчики
+before/after_cursor_execute записывают в него каждое выражение: текст,
+параметры, длительность и попадание в кэш компиляции SQLAlchemy. Видны
+все выражения, в том числе от selectinload, ленивых загрузок и событий ORM.
+"""
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_QUERY_START_KEY = "profiling_query_start"
+MAX_PARAMETERS_LENGTH = 300
+
+
+@dataclass(slots=True)
+class StatementProfile:
+    sql: str
+    parameters: str
+    duration_ms: float
+    cache: str
+
+
+@dataclass(slots=True)
+class RequestProfile:
+    request_id: str
+    method: str
+    path: str
+    status_code: int | None = None
+    duration_ms: float = 0.0
+    statements: list[StatementProfile] = field(default_factory=list)
+    cpu_profile: str | None = None
+    cpu_profile_type: str | None = None
+
+    @property
+    def sql_time_ms(self) -> float:
+        return sum(statement.duration_ms for statement in self.statements)
+
+    @property
+    def cache_hits(self) -> int:
+        return sum(statement.cache == "cache_hit" for statement in self.statements)
+
+    def summary(self) -> dict:
+        return {
+            "request_id": self.request_id,
+            "method": self.method,
+            "path": self.path,
+            "status_code": self.status_code,
+            "duration_ms": round(self.duration_ms, 2),
+            "sql_count": len(self.statements),
+            "sql_time_ms": round(self.sql_time_ms, 2),
+            "sql_cache_hits": self.cache_hits,
+            "has_cpu_profile": self.cpu_profile is not None,
+        }
+
+
+current_profile: ContextVar[RequestProfile | None] = ContextVar("current_profile", default=None)
+
+
+def _cache_status(context) -> str:
+    cache_hit = getattr(context, "cache_hit", None)
+    return cache_hit.name.lower() if cache_hit is not None else "unknown"
+
+
+def instrument_engine_profiling(engine: Engine) -> None:
+    """Подписать синхронный движок (для async — engine.sync_engine) на профилирование."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if current_profile.get() is not None:
+            conn.info.setdefault(_QUERY_START_KEY, []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = current_profile.get()
+        starts = conn.info.get(_QUERY_START_KEY)
+        if profile is None or not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        parameters_repr = repr(parameters)
+        if len(parameters_repr) > MAX_PARAMETERS_LENGTH:
+            parameters_repr = parameters_repr[:MAX_PARAMETERS_LENGTH] + "…"
+        profile.statements.append(StatementProfile(
+            sql=statement,
+            parameters=parameters_repr,
+            duration_ms=round(elapsed * 1000, 3),
+            cache=_cache_status(context),
+        ))
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get(_QUERY_START_KEY):
+            conn.info[_QUERY_START_KEY].pop()
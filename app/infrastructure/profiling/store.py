@@ -0,0 +1,27 @@
+from collections import OrderedDict
+from threading import Lock
+
+from app.infrastructure.profiling.sql import RequestProfile
+
+
+class ProfileStore:
+    """Последние N профилей запросов в памяти процесса (по request_id)."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._profiles: OrderedDict[str, RequestProfile] = OrderedDict()
+        self._lock = Lock()
+
+    def add(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._profiles[profile.request_id] = profile
+            while len(self._profiles) > self.capacity:
+                self._profiles.popitem(last=False)
+
+    def get(self, request_id: str) -> RequestProfile | None:
+        with self._lock:
+            return self._profiles.get(request_id)
+
+    def recent(self, limit: int) -> list[RequestProfile]:
+        with self._lock:
+            return list(reversed(self._profiles.values()))[:limit]
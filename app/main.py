@@ -1,43 +1,91 @@
+import os
+import secrets
+import time
 from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.sessions import SessionMiddleware
 
+from app.api.responses import ORJSONResponse
 from app.api.v1.routers import api_v1_routers
+from app.api.v1.routers.product import HOME_RAILS_WARMUP, create_home_rails
 from app.infrastructure.database.adapters.pg_connection import DatabaseConnection
 from app.infrastructure.logging.logger import configure_logging, get_logger
-from app.infrastructure.middleware import LoggingMiddleware
+from app.infrastructure.metrics import mark_process_dead, render_metrics
+from app.infrastructure.middleware import LazyASGIApp, LoggingMiddleware, MetricsMiddleware, ProfilingMiddleware
 from app.infrastructure.config.config import APP_CONFIG
 
-from admin.admin import create_admin, sync_engine
-
 configure_logging()
 logger = get_logger(__name__)
 
 
+@asynccontextmanager
+async def lifespan_phase(name: str):
+    """Логирует длительность фазы старта/остановки приложения."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        logger.info("lifespan_phase", phase=name, duration_ms=round((time.perf_counter() - started) * 1000, 1))
+
+
+async def prepare_schema(db_connection: DatabaseConnection) -> None:
+    mode = APP_CONFIG.DB_SCHEMA_CHECK
+    if mode == "create_all":
+        # Только для локальной разработки: в production схему ведут миграции
+        await db_connection.init_test_db()
+    elif mode == "revision":
+        revision = await db_connection.check_schema_revision()
+        logger.info("schema_revision_ok", revision=revision)
+    else:
+        logger.info("schema_check_skipped")
+
+
 @asynccontextmanager
 async def lifespan(app):
+    started = time.perf_counter()
     logger.info("application_startup", app_name=APP_CONFIG.APP_NAME, debug=APP_CONFIG.DEBUG)
     
-    db_connection = DatabaseConnection()
-    await db_connection.init_test_db()
-    app.state.db_connection = db_connection
+    async with lifespan_phase("database_connect"):
+        db_connection = DatabaseConnection()
+        app.state.db_connection = db_connection
+
+    async with lifespan_phase(f"schema_{APP_CONFIG.DB_SCHEMA_CHECK}"):
+        await prepare_schema(db_connection)
     
-    logger.info("database_connected")
+    logger.info("database_connected", startup_ms=round((time.perf_counter() - started) * 1000, 1))
+
+    home_rails = None
+    if APP_CONFIG.HOME_RAILS_CACHE_ENABLED:
+        # Подборки собираются в фоне: воркер готов принимать запросы сразу,
+        # а первый запрос к /home дождётся уже идущей сборки
+        home_rails = create_home_rails(db_connection, APP_CONFIG.HOME_RAILS_REFRESH_INTERVAL)
+        home_rails.start()
+        home_rails.prefetch(HOME_RAILS_WARMUP)
+        app.state.home_rails = home_rails
     
     yield
     
+    if home_rails is not None:
+        await home_rails.stop()
+    if admin_app is not None:
+        async with lifespan_phase("admin_shutdown"):
+            admin_app.close()
+    async with lifespan_phase("database_dispose"):
+        await db_connection.close()
+    mark_process_dead(os.getpid())
     logger.info("application_shutdown")
 
 
 app = FastAPI(
     title=APP_CONFIG.APP_NAME,
     debug=APP_CONFIG.DEBUG,
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 
@@ -47,8 +95,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+if APP_CONFIG.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+if APP_CONFIG.PROFILING_ENABLED:
+    from app.api.debug import router as debug_router
+    from app.infrastructure.profiling import ProfileStore
+
+    app.state.profile_store = ProfileStore(APP_CONFIG.PROFILING_HISTORY)
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=app.state.profile_store,
+        cpu=APP_CONFIG.PROFILING_CPU,
+        cpu_threshold_ms=APP_CONFIG.PROFILING_CPU_THRESHOLD_MS,
+    )
+    app.include_router(debug_router)
+    logger.warning("profiling_enabled", cpu=APP_CONFIG.PROFILING_CPU)
+
 app.add_middleware(LoggingMiddleware)
 
 # SessionMiddleware для работы авторизации в админ-панели
@@ -68,5 +134,30 @@ logger.info("static_files_mounted", directory=APP_CONFIG.STATIC_DIR)
 
 app.include_router(api_v1_routers)
 
-admin = create_admin(engine=sync_engine)
-admin.mount_to(app)
+
+if APP_CONFIG.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics(request: Request) -> Response:
+        if APP_CONFIG.METRICS_TOKEN:
+            expected = f"Bearer {APP_CONFIG.METRICS_TOKEN}".encode()
+            if not secrets.compare_digest(request.headers.get("authorization", "").encode(), expected):
+                return Response(status_code=status.HTTP_404_NOT_FOUND)
+        content, media_type = render_metrics()
+        return Response(content=content, media_type=media_type)
+
+# Админка тянет starlette-admin, шаблоны и синхронный движок БД — процессам,
+# обслуживающим только витрину, это не нужно (см. ADMIN_MOUNT)
+admin_app = None
+if APP_CONFIG.ADMIN_MOUNT == "eager":
+    from admin.admin import create_admin, mount_admin, sync_engine
+
+    admin_app = mount_admin(app, create_admin(engine=sync_engine))
+elif APP_CONFIG.ADMIN_MOUNT == "lazy":
+    def build_admin_app():
+        from admin.admin import load_admin_app
+
+        return load_admin_app()
+
+    # Путь и имя маршрута совпадают с base_url/route_name из create_admin
+    admin_app = LazyASGIApp(build_admin_app, name="admin")
+    app.mount("/admin", app=admin_app, name="admin")
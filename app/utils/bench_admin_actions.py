@@ -0,0 +1,112 @@
+"""
+Замер массовых действий админки на большом числе товаров.
+
+Создаёт временную категорию с N товарами (по умолчанию 10 000) в настроенной
+БД, сравнивает старый подход (загрузить строки, поменять в Python, commit —
+по UPDATE на строку) с одним UPDATE ... WHERE id = ANY(:pks) и удаляет
+временные данные. Запускать на тестовой базе:
+
+    python3 -m app.utils.bench_admin_actions --products 10000
+
+Замер 2026-10-19 (локальный PostgreSQL 16, 10 000 товаров; set-based
+включает триггеры счётчиков категорий):
+
+    action                 legacy  set-based  speedup
+    discount               3970ms      442ms     9.0x
+    remove discount        2900ms      524ms     5.5x
+    deactivate             6043ms      656ms     9.2x
+    activate               6061ms      856ms     7.1x
+    move to category       9020ms      357ms    25.3x
+"""
+import argparse
+import time
+import uuid
+from collections.abc import Callable
+
+from sqlalchemy import delete, insert
+
+from admin.admin import Session, bulk_update_products, ids_condition
+from app.infrastructure.database.models.category import Category
+from app.infrastructure.database.models.product import Product
+
+
+def seed(count: int) -> tuple[uuid.UUID, uuid.UUID, list[uuid.UUID]]:
+    """Создать две временные категории и count товаров в первой."""
+    marker = uuid.uuid4().hex[:8]
+    source_id, target_id = uuid.uuid4(), uuid.uuid4()
+    ids = [uuid.uuid4() for _ in range(count)]
+    with Session() as session:
+        session.execute(insert(Category), [
+            {"id": source_id, "name": f"bench-{marker}-a", "slug": f"bench-{marker}-a"},
+            {"id": target_id, "name": f"bench-{marker}-b", "slug": f"bench-{marker}-b"},
+        ])
+        session.execute(insert(Product), [
+            {
+                "id": product_id,
+                "name": f"bench {idx}",
+                "slug": f"bench-{marker}-{idx}",
+                "price": 1000 + idx,
+                "category_id": source_id,
+            }
+            for idx, product_id in enumerate(ids)
+        ])
+        session.commit()
+    return source_id, target_id, ids
+
+
+def cleanup(category_ids: list[uuid.UUID]) -> None:
+    with Session() as session:
+        session.execute(delete(Product).where(Product.category_id.in_(category_ids)))
+        session.execute(delete(Category).where(Category.id.in_(category_ids)))
+        session.commit()
+
+
+def legacy_update(pks: list[uuid.UUID], values: dict) -> int:
+    """Старая реализация: загрузка строк и по UPDATE на каждый товар."""
+    with Session() as session:
+        products = session.query(Product).filter(Product.id.in_(pks)).all()
+        for product in products:
+            for key, value in values.items():
+                setattr(product, key, value)
+        session.commit()
+        return len(products)
+
+
+def set_based_update(pks: list[uuid.UUID], values: dict) -> int:
+    return bulk_update_products(ids_condition(Product.id, pks), values, reason="bench_admin_actions")
+
+
+def measure(func: Callable[[list[uuid.UUID], dict], int], pks: list[uuid.UUID], values: dict) -> tuple[float, int]:
+    started = time.perf_counter()
+    updated = func(pks, values)
+    return time.perf_counter() - started, updated
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark bulk admin actions")
+    parser.add_argument("--products", type=int, default=10_000, help="Number of temporary products")
+    args = parser.parse_args()
+
+    print(f"Seeding {args.products} products...")
+    source_id, target_id, pks = seed(args.products)
+    try:
+        cases = [
+            ("discount", {"discount_percent": 15}),
+            ("remove discount", {"discount_percent": None}),
+            ("deactivate", {"is_active": False}),
+            ("activate", {"is_active": True}),
+            ("move to category", {"category_id": target_id}),
+        ]
+        print(f"{'action':<18} {'legacy':>10} {'set-based':>10} {'speedup':>8}")
+        for name, values in cases:
+            legacy, legacy_rows = measure(legacy_update, pks, values)
+            bulk, bulk_rows = measure(set_based_update, pks, values)
+            if legacy_rows != bulk_rows:
+                print(f"  ✗ {name}: legacy updated {legacy_rows}, set-based {bulk_rows}")
+            print(f"{name:<18} {legacy * 1000:8.0f}ms {bulk * 1000:8.0f}ms {legacy / bulk:7.1f}x")
+    finally:
+        cleanup([source_id, target_id])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Нагрузочная проверка: не влияет ли админка на задержки витрины.
+
+Против запущенного сервера сначала гоняет только запросы витрины, затем те же
+запросы одновременно с клиентами админки, листающими большие списки.
+Печатает p50/p95/p99 витрины для обеих фаз:
+
+    uvicorn app.main:app --port 8000
+    python3 -m app.utils.bench_admin_isolation --base-url http://localhost:8000
+
+    # админка отдельным процессом
+    ADMIN_MOUNT=disabled uvicorn app.main:app --port 8000
+    uvicorn admin.main:app --port 8001
+    python3 -m app.utils.bench_admin_isolation --admin-url http://localhost:8001
+
+Замер 2026-10-19 (одноядерный хост, локальный PostgreSQL 16, 5000 товаров,
+параметры по умолчанию; прогоны одной сборки, разброс между ними велик):
+
+    админка                         p99 витрины  + админка  рост      страниц админки
+    в общем loop (до 31cc683)       297-312ms    803-951ms  x2.7-3.1  256
+    в своём loop (IsolatedASGIApp)  324-340ms    471-487ms  x1.4-1.5  84-85
+      повторный замер, 3 прогона    337-436ms    658-821ms  x1.6-2.4  68-73
+    отдельный процесс admin.main    347-494ms    638-795ms  x1.5-1.8  107-112
+
+Цель «витрина не замечает админку» достигнута лишь частично: на одном ядре
+процессы делят процессор. Отдельный процесс при той же задержке витрины
+отдаёт админке в полтора раза больше страниц, поэтому в docker-compose
+админка вынесена в свой сервис.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from app.infrastructure.config.config import APP_CONFIG
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+async def storefront_load(client: httpx.AsyncClient, paths: list[str], requests: int, concurrency: int) -> list[float]:
+    latencies: list[float] = []
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    for idx in range(requests):
+        queue.put_nowait(paths[idx % len(paths)])
+
+    async def worker() -> None:
+        while not queue.empty():
+            path = queue.get_nowait()
+            started = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+async def admin_load(base_url: str, identity: str, page_size: int, stop: asyncio.Event) -> int:
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        await client.post(
+            "/admin/login",
+            data={"username": APP_CONFIG.ADMIN_USERNAME, "password": APP_CONFIG.ADMIN_PASSWORD},
+        )
+        pages = 0
+        while not stop.is_set():
+            response = await client.get(
+                f"/admin/api/{identity}", params={"skip": 0, "limit": page_size}
+            )
+            response.raise_for_status()
+            pages += 1
+        return pages
+
+
+def report(name: str, latencies: list[float]) -> None:
+    ms = [value * 1000 for value in latencies]
+    print(
+        f"{name:<14} n={len(ms):<5} p50={statistics.median(ms):7.1f}ms "
+        f"p95={percentile(ms, 95):7.1f}ms p99={percentile(ms, 99):7.1f}ms max={max(ms):7.1f}ms"
+    )
+
+
+async def run(args) -> None:
+    paths = args.paths or ["/api/v1/faq/", "/api/v1/category/all", "/api/v1/product/home"]
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        baseline = await storefront_load(client, paths, args.requests, args.concurrency)
+        report("storefront", baseline)
+
+        stop = asyncio.Event()
+        admins = [
+            asyncio.create_task(admin_load(args.admin_url or args.base_url, args.identity, args.page_size, stop))
+            for _ in range(args.admin_clients)
+        ]
+        await asyncio.sleep(1)
+        loaded = await storefront_load(client, paths, args.requests, args.concurrency)
+        stop.set()
+        admin_pages = sum(await asyncio.gather(*admins))
+        report("+ admin load", loaded)
+        print(f"admin pages served: {admin_pages}")
+
+        ratio = percentile(loaded, 99) / percentile(baseline, 99)
+        print(f"p99 ratio under admin load: x{ratio:.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure storefront latency while the admin panel is under load")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--admin-url", help="Admin server when it runs as a separate process (default: --base-url)")
+    parser.add_argument("--paths", nargs="*", help="Storefront paths to request")
+    parser.add_argument("--requests", type=int, default=2000, help="Storefront requests per phase")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--admin-clients", type=int, default=4)
+    parser.add_argument("--identity", default="products", help="Admin view to list")
+    parser.add_argument("--page-size", type=int, default=100)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Замер накладных расходов LoggingMiddleware.
+
+Гоняет запросы в процессе (httpx.ASGITransport, без сети) к маленькому
+FastAPI-приложению с JSON- и стриминговым эндпоинтом: без middleware,
+со старой реализацией на BaseHTTPMiddleware и с текущей ASGI-реализацией.
+Логи пишутся в NullHandler, поэтому в замер входят подготовка и
+форматирование строк лога, но не вывод:
+
+    python3 -m app.utils.bench_logging_middleware --requests 5000
+    python3 -m app.utils.bench_logging_middleware --log-level WARNING
+"""
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+from collections.abc import Callable
+
+import httpx
+import structlog
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.infrastructure.config.config import APP_CONFIG
+from app.infrastructure.logging.logger import configure_logging, get_logger
+from app.infrastructure.middleware import LoggingMiddleware
+
+logger = get_logger("bench")
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    """Прежняя реализация LoggingMiddleware (для сравнения)."""
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        request_id = str(uuid.uuid4())
+        structlog.contextvars.clear_contextvars()
+        structlog.contextvars.bind_contextvars(request_id=request_id)
+        start_time = time.time()
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        response.headers["X-Request-ID"] = request_id
+        response.headers["X-Process-Time"] = str(process_time)
+        log_data = {
+            "method": request.method,
+            "path": request.url.path,
+            "query_params": str(request.query_params) if request.query_params else None,
+            "status_code": response.status_code,
+            "process_time": round(process_time, 3),
+        }
+        if process_time > APP_CONFIG.SLOW_REQUEST_THRESHOLD:
+            logger.warning("slow_request", **log_data)
+        else:
+            logger.info("request_completed", **log_data)
+        return response
+
+
+def build_app(middleware) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/json")
+    async def json_endpoint(page: int = 1):
+        return JSONResponse({"page": page, "items": list(range(20))})
+
+    @app.get("/stream")
+    async def stream_endpoint():
+        async def chunks():
+            for idx in range(10):
+                yield f"chunk {idx}\n".encode()
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    if middleware is not None:
+        app.add_middleware(middleware)
+    return app
+
+
+async def measure(app: FastAPI, path: str, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get(path)  # прогрев
+
+        async def worker(count: int) -> None:
+            for _ in range(count):
+                response = await client.get(path)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(requests // concurrency) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return (requests // concurrency) * concurrency / elapsed
+
+
+async def run(args) -> None:
+    variants = [
+        ("no middleware", None),
+        ("BaseHTTPMiddleware", LegacyLoggingMiddleware),
+        ("ASGI middleware", LoggingMiddleware),
+    ]
+    for path in ("/json?page=2", "/stream"):
+        print(f"{path}")
+        baseline = None
+        for name, middleware in variants:
+            rps = await measure(build_app(middleware), path, args.requests, args.concurrency)
+            baseline = baseline or rps
+            print(f"  {name:<20} {rps:9.0f} req/s  ({rps / baseline:.2f}x of no middleware)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare LoggingMiddleware implementations by requests/sec")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--log-level", default="INFO", help="Root log level (WARNING skips request_completed)")
+    args = parser.parse_args()
+
+    configure_logging()
+    root = logging.getLogger()
+    root.handlers = [logging.NullHandler()]
+    root.setLevel(args.log_level)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Сверка и замер скорости движков парсинга карточек товаров.
+
+Берёт сохранённые HTML-страницы товаров (*.html, имя файла = slug товара),
+проверяет, что parse_product_page на каждом доступном движке отдаёт тот же
+словарь, что и html.parser, и печатает пропускную способность (страниц/сек).
+Код возврата 1 — если хотя бы одна страница разобрана по-разному.
+
+По умолчанию берёт страницы из app/utils/ingestion/fixtures/product
+(полный разбор по полям — app.utils.check_parser_backends). Свои страницы:
+    curl -s https://4roads.su/product/<slug> -o fixtures/<slug>.html
+    python3 -m app.utils.bench_parse fixtures
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from app.utils.ingestion.parsing import lxml_etree, parse_product_page
+
+DEFAULT_FIXTURES_DIR = Path(__file__).parent / "ingestion" / "fixtures" / "product"
+
+
+def load_fixtures(fixtures_dir: Path) -> list[tuple[str, str]]:
+    pages = []
+    for path in sorted(fixtures_dir.glob("*.html")):
+        url = f"https://4roads.su/product/{path.stem}"
+        pages.append((url, path.read_text(encoding="utf-8")))
+    return pages
+
+
+def verify(pages: list[tuple[str, str]], backend: str) -> int:
+    mismatches = 0
+    for url, html in pages:
+        expected = parse_product_page(html, url, backend="html.parser")
+        actual = parse_product_page(html, url, backend=backend)
+        if actual != expected:
+            mismatches += 1
+            keys = sorted(k for k in expected if expected[k] != actual.get(k))
+            print(f"  ✗ {url}: differs in {', '.join(keys)}")
+    return mismatches
+
+
+def measure(pages: list[tuple[str, str]], backend: str, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for url, html in pages:
+            parse_product_page(html, url, backend=backend)
+    elapsed = time.perf_counter() - started
+    return len(pages) * repeat / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Verify and benchmark product page parser backends")
+    parser.add_argument("fixtures_dir", nargs="?", type=Path, default=DEFAULT_FIXTURES_DIR,
+                        help="Directory with saved product pages (*.html)")
+    parser.add_argument("--repeat", type=int, default=20, help="Parse each page N times")
+    args = parser.parse_args()
+
+    pages = load_fixtures(args.fixtures_dir)
+    if not pages:
+        print(f"No *.html fixtures in {args.fixtures_dir}")
+        sys.exit(1)
+
+    backends = ["html.parser"]
+    if lxml_etree is not None:
+        backends.append("lxml")
+    else:
+        print("lxml is not installed, only html.parser is measured")
+
+    failed = False
+    baseline = None
+    for backend in backends:
+        if backend != "html.parser":
+            mismatches = verify(pages, backend)
+            if mismatches:
+                failed = True
+                print(f"{backend}: {mismatches}/{len(pages)} page(s) differ from html.parser")
+        rate = measure(pages, backend, args.repeat)
+        baseline = baseline or rate
+        print(f"{backend:<12} {rate:8.1f} pages/s  x{rate / baseline:.2f}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Замер сериализации списка товаров для эндпоинтов каталога.
+
+Строит N товаров (по умолчанию 100) с изображениями и характеристиками
+в виде ORM-подобных объектов и сравнивает прежний путь (model_validate
+каждого изображения, сортировка, model_validator, повторная валидация
+по response_model в FastAPI) с текущим (словари из ProductService
+и готовый JSON из PRODUCT_LIST_ADAPTER). Проверяет, что JSON совпадает:
+
+    python3 -m app.utils.bench_product_serialization --products 100 --images 8
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.v1.routers.product import products_response
+from app.core.dto.product import ProductCharacteristicModel, ProductImageModel, ProductModel, calculate_old_price
+from app.core.services.product_service import ProductService
+
+
+def build_products(count: int, images: int, characteristics: int) -> list[SimpleNamespace]:
+    types = [SimpleNamespace(name=f"Характеристика {idx}") for idx in range(characteristics)]
+    products = []
+    for idx in range(count):
+        discount_percent = 15 if idx % 3 == 0 else None
+        products.append(SimpleNamespace(
+            id=uuid.uuid4(),
+            name=f"Товар {idx}",
+            slug=f"product-{idx}",
+            description="Описание товара " * 10,
+            price=1000 + idx,
+            discount_percent=discount_percent,
+            # В БД — вычисляемая колонка
+            old_price=calculate_old_price(1000 + idx, discount_percent),
+            is_active=True,
+            is_featured=idx % 5 == 0,
+            category_id=uuid.uuid4(),
+            images=[
+                SimpleNamespace(id=uuid.uuid4(), image_path=f"products/{idx}-{order}.webp", order=order)
+                for order in range(images)
+            ],
+            characteristics=[
+                SimpleNamespace(characteristic_type=char_type, value=f"value {idx}")
+                for char_type in types
+            ],
+        ))
+    return products
+
+
+def legacy_convert(product) -> ProductModel:
+    """Прежний ProductService._convert_to_dto (с валидацией)."""
+    return ProductModel(
+        id=product.id,
+        name=product.name,
+        slug=product.slug,
+        description=product.description,
+        price=product.price,
+        discount_percent=product.discount_percent,
+        is_active=product.is_active,
+        is_featured=product.is_featured,
+        category_id=product.category_id,
+        images=[
+            ProductImageModel.model_validate(img, from_attributes=True)
+            for img in sorted(product.images, key=lambda x: x.order)
+        ],
+        characteristics=[
+            ProductCharacteristicModel(name=char.characteristic_type.name, value=char.value)
+            for char in product.characteristics
+        ],
+    )
+
+
+def build_app(products: list) -> FastAPI:
+    app = FastAPI()
+    service = ProductService(repository=None)
+
+    @app.get("/legacy", response_model=list[ProductModel])
+    async def legacy() -> list[ProductModel]:
+        return [legacy_convert(product) for product in products]
+
+    @app.get("/fast", response_model=list[ProductModel])
+    async def fast():
+        return products_response([service._convert_to_dto(product) for product in products])
+
+    return app
+
+
+def timeit(func, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+async def time_endpoint(client: httpx.AsyncClient, path: str, repeat: int) -> tuple[float, bytes]:
+    samples = []
+    body = b""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = await client.get(path)
+        samples.append(time.perf_counter() - started)
+        body = response.content
+    return statistics.median(samples) * 1000, body
+
+
+async def run(args) -> None:
+    products = build_products(args.products, args.images, args.characteristics)
+    service = ProductService(repository=None)
+
+    convert_legacy = timeit(lambda: [legacy_convert(p) for p in products], args.repeat)
+    convert_fast = timeit(lambda: [service._convert_to_dto(p) for p in products], args.repeat)
+    print(f"{args.products} products x {args.images} images, median of {args.repeat}")
+    print(f"  convert legacy:  {convert_legacy:7.2f} ms")
+    print(f"  convert fast:    {convert_fast:7.2f} ms  (x{convert_legacy / convert_fast:.1f})")
+
+    transport = httpx.ASGITransport(app=build_app(products))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        legacy_ms, legacy_body = await time_endpoint(client, "/legacy", args.repeat)
+        fast_ms, fast_body = await time_endpoint(client, "/fast", args.repeat)
+    print(f"  endpoint legacy: {legacy_ms:7.2f} ms")
+    print(f"  endpoint fast:   {fast_ms:7.2f} ms  (x{legacy_ms / fast_ms:.1f})")
+
+    same = json.loads(legacy_body) == json.loads(fast_body)
+    print(f"  identical JSON:  {'✅' if same else '❌'}")
+    if not same:
+        raise SystemExit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare product list serialization paths")
+    parser.add_argument("--products", type=int, default=100)
+    parser.add_argument("--images", type=int, default=8)
+    parser.add_argument("--characteristics", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=50)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Замер холодного старта API.
+
+В свежих процессах импортирует сначала фреймворки (FRAMEWORK_MODULES), затем
+app.main, и проходит lifespan приложения; печатает медианы, а по отдельному
+прогону с `python -X importtime` (он сам замедляет импорт) — самые дорогие
+модули. С --history дописывает результат в JSONL-файл (startup_history.jsonl
+в корне репозитория — замеры по коммитам).
+
+Импорт фреймворков от кода проекта почти не зависит, но сильно зависит от
+машины: на одноядерной ВМ он один занимает 0,8-0,95 с. Поэтому по умолчанию
+бюджет (--budget-ms, 300 мс) ставится на собственный старт приложения —
+импорт app.main поверх фреймворков плюс lifespan — и ловит регрессии вроде
+eager-админки или импорта alembic при старте. Полная готовность проверяется
+отдельно, --ready-budget-ms (цель — меньше секунды на сервере):
+
+    python3 -m app.utils.bench_startup --runs 5 --history startup_history.jsonl
+    python3 -m app.utils.bench_startup --ready-budget-ms 1000
+    ADMIN_MOUNT=eager python3 -m app.utils.bench_startup --budget-ms 0
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+DEFAULT_BUDGET_MS = 300.0
+
+# Зависимости из requirements.txt, которые app.main импортирует в любом режиме
+FRAMEWORK_MODULES = (
+    "fastapi", "fastapi.security", "fastapi.staticfiles", "starlette.middleware.sessions",
+    "sqlalchemy.orm", "sqlalchemy.ext.asyncio", "sqlalchemy.dialects.postgresql", "asyncpg",
+    "pydantic_settings", "structlog", "orjson",
+)
+
+CHILD_CODE = """
+import asyncio, importlib, json, time
+started = time.perf_counter()
+for name in %r:
+    importlib.import_module(name)
+frameworks = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+async def run_lifespan():
+    async with app.main.lifespan(app.main.app):
+        return time.perf_counter()
+
+ready = asyncio.run(run_lifespan())
+print(json.dumps({
+    "framework_ms": (frameworks - started) * 1000,
+    "import_ms": (imported - started) * 1000,
+    "lifespan_ms": (ready - imported) * 1000,
+}))
+""" % (FRAMEWORK_MODULES,)
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int, int]]:
+    """Строки `import time: self | cumulative | name` -> (модуль, self_us, cumulative_us, глубина)."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+
+def run_once(importtime: bool = False) -> tuple[dict, list[tuple[str, int, int, int]]]:
+    flags = ["-X", "importtime"] if importtime else []
+    result = subprocess.run(
+        [sys.executable, *flags, "-c", CHILD_CODE],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.getcwd()},
+    )
+    if result.returncode != 0:
+        raise SystemExit(result.stderr[-2000:])
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    return timings, parse_importtime(result.stderr)
+
+
+def git_revision() -> str | None:
+    """Короткий хеш HEAD; -dirty, если в app/ есть незакоммиченные правки."""
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    revision = result.stdout.strip() or None
+    status = subprocess.run(["git", "status", "--porcelain", "--", "app"], capture_output=True, text=True)
+    if revision and status.stdout.strip():
+        revision += "-dirty"
+    return revision
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure API cold start (imports + lifespan)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="How many heaviest imports to show")
+    parser.add_argument("--history", help="Append the result to this JSONL file")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="Fail when app startup beyond framework imports exceeds this (0 disables)")
+    parser.add_argument("--ready-budget-ms", type=float,
+                        help="Fail when full readiness (all imports + lifespan) exceeds this")
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    framework_ms = statistics.median(timings["framework_ms"] for timings, _ in runs)
+    import_ms = statistics.median(timings["import_ms"] for timings, _ in runs)
+    lifespan_ms = statistics.median(timings["lifespan_ms"] for timings, _ in runs)
+    ready_ms = statistics.median(timings["import_ms"] + timings["lifespan_ms"] for timings, _ in runs)
+    app_ms = statistics.median(
+        timings["import_ms"] - timings["framework_ms"] + timings["lifespan_ms"] for timings, _ in runs
+    )
+    _, modules = run_once(importtime=True)
+
+    print(f"frameworks:      {framework_ms:8.1f} ms")
+    print(f"import app.main: {import_ms:8.1f} ms  (frameworks included)")
+    print(f"lifespan:        {lifespan_ms:8.1f} ms")
+    print(f"ready:           {ready_ms:8.1f} ms  (median of {args.runs})")
+    print(f"app startup:     {app_ms:8.1f} ms  (ready minus frameworks)")
+    print(f"modules imported: {len(modules)}")
+
+    print("\nTop-level imports by cumulative time:")
+    top_level = sorted((m for m in modules if m[3] == 0), key=lambda m: m[2], reverse=True)
+    for name, _, cumulative_us, _ in top_level[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    print("\nHeaviest modules by self time:")
+    for name, self_us, _, _ in sorted(modules, key=lambda m: m[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    if args.history:
+        record = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "admin_mount": os.environ.get("ADMIN_MOUNT", "lazy"),
+            "schema_check": os.environ.get("DB_SCHEMA_CHECK", "revision"),
+            "modules": len(modules),
+            "framework_ms": round(framework_ms, 1),
+            "import_ms": round(import_ms, 1),
+            "lifespan_ms": round(lifespan_ms, 1),
+            "ready_ms": round(ready_ms, 1),
+            "app_ms": round(app_ms, 1),
+        }
+        with open(args.history, "a", encoding="utf-8") as history:
+            history.write(json.dumps(record) + "\n")
+        print(f"\nappended to {args.history}")
+
+    checks = []
+    if args.budget_ms:
+        checks.append(("app startup", app_ms, args.budget_ms))
+    if args.ready_budget_ms:
+        checks.append(("ready", ready_ms, args.ready_budget_ms))
+    failed = False
+    for name, value, budget in checks:
+        ok = value <= budget
+        failed |= not ok
+        print(f"{'✅' if ok else '❌'} {name} {value:.1f} ms {'<=' if ok else '>'} budget {budget:.1f} ms")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Проверка числа SQL-запросов на страницах списков админки.
+
+Для каждого раздела админки запрашивает данные страницы списка
+(`/admin/api/<identity>?limit=N`), считает SQL-выражения, отправленные
+в БД, и завершается с кодом 1, если хоть одна страница превысила лимит.
+Так ловятся N+1: ленивые загрузки связей при отрисовке строк.
+
+    # на настроенной БД
+    python3 -m app.utils.check_admin_queries --limit 100
+
+    # на временной SQLite с тестовыми данными
+    python3 -m app.utils.check_admin_queries --database-url sqlite:// --seed 200
+"""
+import argparse
+import sys
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from starlette.applications import Starlette
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.testclient import TestClient
+
+from admin.admin import create_admin
+from app.infrastructure.config.config import APP_CONFIG
+from app.infrastructure.database.models import (
+    Base,
+    Category,
+    CharacteristicType,
+    Order,
+    OrderItem,
+    Product,
+    ProductCharacteristic,
+    ProductImage,
+    Review,
+)
+from app.utils.enums import CharacteristicTypeEnum
+
+# Страница списка: выборка строк + COUNT(*) + один запрос про запас (selectin)
+DEFAULT_BUDGET = 3
+
+
+class QueryCounter:
+    """Считает SQL-выражения, выполненные через движок."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.statements: list[str] = []
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @contextmanager
+    def count(self):
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        try:
+            yield self
+        finally:
+            event.remove(self.engine, "before_cursor_execute", self._before_cursor_execute)
+
+
+def seed(engine: Engine, products: int) -> None:
+    """Заполнить пустую БД тестовыми данными для всех разделов админки."""
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        categories = [
+            Category(name=f"Категория {idx}", slug=f"category-{idx}", image=f"products/c{idx}.webp")
+            for idx in range(10)
+        ]
+        types = [
+            CharacteristicType(name=name, slug=name.name.lower())
+            for name in CharacteristicTypeEnum
+        ]
+        session.add_all(categories + types)
+        for idx in range(products):
+            product = Product(
+                name=f"Товар {idx}",
+                slug=f"product-{idx}-{uuid.uuid4().hex[:6]}",
+                price=1000 + idx,
+                category=categories[idx % len(categories)],
+                images=[ProductImage(image_path=f"products/{idx}-{order}.webp", order=order) for order in range(3)],
+                characteristics=[
+                    ProductCharacteristic(characteristic_type=char_type, value=f"value {idx}")
+                    for char_type in types[:2]
+                ],
+            )
+            session.add(product)
+            session.add(Review(product=product, author_name="Покупатель", content="Отлично", rating=5))
+            order = Order(name="Покупатель", phone="+70000000000", total_amount=product.price)
+            order.items.append(OrderItem(
+                product=product, product_name=product.name, unit_price=product.price,
+                quantity=1, total_price=product.price,
+            ))
+            session.add(order)
+        session.commit()
+
+
+def report(name: str, status_code: int, queries: int, budget: int, counter: QueryCounter, rows: int | None = None) -> bool:
+    ok = status_code == 200 and queries <= budget
+    rows_info = f"rows={rows:<4} " if rows is not None else " " * 10
+    print(f"{'✅' if ok else '❌'} {name:<32} {rows_info}queries={queries}")
+    if not ok:
+        if status_code != 200:
+            print(f"   HTTP {status_code}")
+        for statement, times in Counter(counter.statements).most_common(3):
+            print(f"   x{times}: {' '.join(statement.split())[:150]}")
+    return ok
+
+
+def check(engine: Engine, limit: int, budget: int) -> bool:
+    admin = create_admin(engine=engine)
+    app = Starlette()
+    app.add_middleware(SessionMiddleware, secret_key=APP_CONFIG.ADMIN_PASSWORD)
+    admin.mount_to(app)
+    counter = QueryCounter(engine)
+
+    ok = True
+    with TestClient(app, raise_server_exceptions=False) as client:
+        client.post(
+            "/admin/login",
+            data={"username": APP_CONFIG.ADMIN_USERNAME, "password": APP_CONFIG.ADMIN_PASSWORD},
+        )
+        for view in admin._views:
+            identity = getattr(view, "identity", None)
+            if identity is None:
+                continue
+            with counter.count():
+                response = client.get(f"/admin/api/{identity}", params={"skip": 0, "limit": limit})
+            items = response.json().get("items", []) if response.status_code == 200 else []
+            ok &= report(f"{identity} list", response.status_code, len(counter.statements), budget, counter, len(items))
+
+            if items:
+                pk = items[0][view.pk_attr]
+                with counter.count():
+                    response = client.get(f"/admin/{identity}/detail/{pk}")
+                ok &= report(f"{identity} detail", response.status_code, len(counter.statements), budget, counter)
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fail when an admin list page exceeds a SQL statement budget")
+    parser.add_argument("--database-url", help="Database URL (default: configured sync database)")
+    parser.add_argument("--seed", type=int, default=0, help="Create schema and N demo products first")
+    parser.add_argument("--limit", type=int, default=100, help="Rows per list page")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET, help="Max SQL statements per list page")
+    args = parser.parse_args()
+
+    if args.database_url and args.database_url.startswith("sqlite"):
+        # Одно соединение на все потоки: запросы админки идут из пула потоков
+        engine = create_engine(
+            args.database_url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+    elif args.database_url:
+        engine = create_engine(args.database_url)
+    else:
+        from app.infrastructure.database.adapters.sync_connection import sync_engine as engine
+
+    if args.seed:
+        seed(engine, args.seed)
+
+    sys.exit(0 if check(engine, args.limit, args.budget) else 1)
+
+
+if __name__ == "__main__":
+    main()
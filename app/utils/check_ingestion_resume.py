@@ -0,0 +1,182 @@
+"""
+Проверка продолжения импорта (--resume) после падения.
+
+Гоняет настоящий конвейер app.utils.ingestion без сети и БД: страницы
+товаров берутся из app/utils/ingestion/fixtures/product, запись в БД
+заменена записью в память. Сценарии:
+
+- парсинг с экспортом снимка и записью в БД, процесс «убит» после того,
+  как товар попал в снимок, но до записи в БД; --resume должен дописать
+  его в БД и не продублировать в снимке;
+- импорт снимка с несколькими media-воркерами (запись не по порядку)
+  и упавшей записью; --resume должен дописать только её.
+
+Код возврата 1 — если хоть один сценарий не прошёл:
+
+    python3 -m app.utils.check_ingestion_resume
+"""
+import asyncio
+import json
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+from app.utils.ingestion.pipeline import IngestionConfig, IngestionPipeline, PipelineItem
+from app.utils.ingestion.snapshot import read_products_json
+
+FIXTURES_DIR = Path(__file__).parent / "ingestion" / "fixtures" / "product"
+BASE_URL = "https://4roads.su"
+
+
+class SimulatedCrash(BaseException):
+    """Падение процесса: не Exception, чтобы воркер стадии его не поймал."""
+
+
+class MemoryWriter:
+    """CatalogWriter в памяти: запоминает source_url записанных товаров."""
+
+    def __init__(self, fail_urls: set[str] | None = None) -> None:
+        self.written: list[str] = []
+        self.fail_urls = fail_urls or set()
+
+    def write(self, data: dict, images: list) -> str:
+        url = data.get("source_url")
+        if url in self.fail_urls:
+            raise RuntimeError("simulated write failure")
+        self.written.append(url)
+        return "created"
+
+    def close(self) -> None:
+        pass
+
+
+class CheckPipeline(IngestionPipeline):
+    """Конвейер на фикстурах: без сети, с записью в MemoryWriter."""
+
+    def __init__(self, config: IngestionConfig, writer: MemoryWriter, pages: dict[str, str] | None = None,
+                 crash_url: str | None = None) -> None:
+        super().__init__(config)
+        self.writer = writer
+        self.pages = pages or {}
+        self.crash_url = crash_url
+
+    async def _discover_links(self) -> set[str]:
+        return set(self.pages)
+
+    async def _fetch(self, item: PipelineItem) -> PipelineItem:
+        item.html = self.pages[item.url]
+        return item
+
+    async def _media(self, item: PipelineItem) -> PipelineItem:
+        # Случайная задержка перемешивает порядок записи при нескольких воркерах
+        await asyncio.sleep(random.random() * 0.01)
+        if item.url == self.crash_url:
+            raise SimulatedCrash(item.url)
+        return item
+
+    def _create_writer(self) -> MemoryWriter:
+        return self.writer
+
+    def _load_existing_slugs(self) -> set[str]:
+        return set()
+
+
+def run_pipeline(pipeline: CheckPipeline) -> bool:
+    """Прогнать конвейер; False — если он «упал»."""
+    try:
+        asyncio.run(pipeline.run())
+    except BaseExceptionGroup as group:
+        if not group.subgroup(SimulatedCrash):
+            raise
+        return False
+    return True
+
+
+def check_export_crash(tmp: Path) -> list[str]:
+    pages = {
+        f"{BASE_URL}/product/{path.stem}": path.read_text(encoding="utf-8")
+        for path in sorted(FIXTURES_DIR.glob("*.html"))
+    }
+    crash_url = sorted(pages)[1]
+    config = IngestionConfig(
+        collection_url=f"{BASE_URL}/collection/vse-kollektsii",
+        delay=0,
+        snapshot_path=tmp / "export.ndjson",
+        export_snapshot=True,
+        checkpoint_path=tmp / "export_state.ndjson",
+    )
+    writer = MemoryWriter()
+    problems = []
+    if run_pipeline(CheckPipeline(config, writer, pages, crash_url=crash_url)):
+        problems.append("first run did not crash")
+    exported = [data["source_url"] for data in read_products_json(config.snapshot_path)]
+    if crash_url not in exported:
+        problems.append("crashed product was not exported before the crash")
+    if crash_url in writer.written:
+        problems.append("crashed product was written before the crash")
+
+    config.resume = True
+    run_pipeline(CheckPipeline(config, writer, pages))
+    missing = sorted(set(pages) - set(writer.written))
+    if missing:
+        problems.append(f"never written after --resume: {missing}")
+    exported = [data["source_url"] for data in read_products_json(config.snapshot_path)]
+    if sorted(exported) != sorted(set(exported)):
+        problems.append("snapshot has duplicate products after --resume")
+    if config.checkpoint_path.exists():
+        problems.append("checkpoint left after a successful --resume")
+    return problems
+
+
+def check_snapshot_watermark(tmp: Path) -> list[str]:
+    snapshot = tmp / "import.ndjson"
+    urls = [f"{BASE_URL}/product/p{index}" for index in range(1, 31)]
+    with snapshot.open("w", encoding="utf-8") as fh:
+        for url in urls:
+            fh.write(json.dumps({"slug": url.rsplit("/", 1)[-1], "name": "P", "price": 100, "source_url": url}) + "\n")
+    config = IngestionConfig(
+        collection_url=f"{BASE_URL}/collection/vse-kollektsii",
+        delay=0,
+        snapshot_path=snapshot,
+        import_snapshot=True,
+        checkpoint_path=tmp / "import_state.ndjson",
+        media_workers=4,
+    )
+    failed_url = urls[6]
+    writer = MemoryWriter(fail_urls={failed_url})
+    problems = []
+    run_pipeline(CheckPipeline(config, writer))
+    if failed_url in writer.written:
+        problems.append("failing record was written")
+
+    first_run = list(writer.written)
+    writer.written.clear()
+    writer.fail_urls.clear()
+    config.resume = True
+    run_pipeline(CheckPipeline(config, writer))
+    if writer.written != [failed_url]:
+        problems.append(f"--resume wrote {writer.written}, expected only {failed_url}")
+    if sorted(first_run + writer.written) != sorted(urls):
+        problems.append("records lost or duplicated across runs")
+    return problems
+
+
+def main() -> None:
+    scenarios = [
+        ("export + persist, crash before persist", check_export_crash),
+        ("snapshot import, out-of-order persist", check_snapshot_watermark),
+    ]
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, check in scenarios:
+            problems = check(Path(tmp))
+            failed |= bool(problems)
+            print(f"{'❌' if problems else '✅'} {name}")
+            for problem in problems:
+                print(f"   {problem}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
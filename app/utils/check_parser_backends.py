@@ -0,0 +1,158 @@
+"""
+Сверка движков HTML-парсинга (html.parser и lxml) на сохранённых страницах.
+
+Для каждой карточки товара из fixtures/product сравнивает всё, что собрал
+ProductPageParser (тексты, токены, ссылки, изображения, цены), и итоговый
+словарь parse_product_page; для страниц коллекций из fixtures/collection —
+ссылки на товары. Кроме того, результат обоих движков сверяется с эталоном
+рядом со страницей (<имя>.expected.json): так ловятся изменения разбора,
+одинаковые в обоих движках. Завершается с кодом 1 при любом расхождении:
+по умолчанию импорт выбирает lxml, если он установлен, и разбор не должен
+зависеть от этого.
+
+После намеренного изменения разбора эталоны пересобираются (html.parser)
+и проверяются глазами в диффе:
+
+    python3 -m app.utils.check_parser_backends
+    python3 -m app.utils.check_parser_backends --fixtures-dir saved_pages
+    python3 -m app.utils.check_parser_backends --write-expected
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from app.utils.ingestion.parsing import (
+    ProductPageParser,
+    extract_product_links,
+    feed_html,
+    lxml_etree,
+    parse_product_page,
+)
+
+DEFAULT_FIXTURES_DIR = Path(__file__).parent / "ingestion" / "fixtures"
+BASE_URL = "https://4roads.su"
+
+# Результат ProductPageParser; служебные поля HTMLParser (lineno, lasttag...) не сравниваются
+PARSER_FIELDS = (
+    "h1_text", "h1_index", "tokens", "anchors", "images", "description_parts",
+    "characteristics_parts", "introtext_parts", "price_text", "old_price_text",
+    "size_value", "color_value", "sku",
+)
+
+
+def parser_state(html: str, backend: str) -> dict:
+    parser = ProductPageParser()
+    feed_html(parser, html, backend)
+    return {field: getattr(parser, field) for field in PARSER_FIELDS}
+
+
+def diff_keys(expected: dict, actual: dict) -> list[str]:
+    return sorted(key for key in expected if expected[key] != actual.get(key))
+
+
+def expected_path(path: Path) -> Path:
+    return path.with_suffix(".expected.json")
+
+
+def load_expected(path: Path):
+    golden = expected_path(path)
+    if not golden.exists():
+        return None
+    return json.loads(golden.read_text(encoding="utf-8"))
+
+
+def write_expected(path: Path, result) -> None:
+    expected_path(path).write_text(
+        json.dumps(result, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+    )
+
+
+def product_result(path: Path, backend: str) -> dict:
+    return parse_product_page(path.read_text(encoding="utf-8"), f"{BASE_URL}/product/{path.stem}", backend=backend)
+
+
+def collection_result(path: Path, backend: str) -> list[str]:
+    return sorted(extract_product_links(path.read_text(encoding="utf-8"), BASE_URL, backend=backend))
+
+
+def check_expected(path: Path, results: dict[str, object]) -> list[str]:
+    expected = load_expected(path)
+    if expected is None:
+        return [f"no {expected_path(path).name}, run with --write-expected"]
+    problems = []
+    for backend, result in results.items():
+        if isinstance(expected, dict):
+            changed = diff_keys(expected, result) + sorted(set(result) - set(expected))
+        else:
+            changed = ["product links"] if expected != result else []
+        if changed:
+            problems.append(f"{backend} differs from {expected_path(path).name}: {', '.join(changed)}")
+    return problems
+
+
+def check_product(path: Path) -> list[str]:
+    html = path.read_text(encoding="utf-8")
+    problems = []
+    state_diff = diff_keys(parser_state(html, "html.parser"), parser_state(html, "lxml"))
+    if state_diff:
+        problems.append(f"ProductPageParser: {', '.join(state_diff)}")
+    results = {backend: product_result(path, backend) for backend in ("html.parser", "lxml")}
+    page_diff = diff_keys(results["html.parser"], results["lxml"])
+    if page_diff:
+        problems.append(f"parse_product_page: {', '.join(page_diff)}")
+    return problems + check_expected(path, results)
+
+
+def check_collection(path: Path) -> list[str]:
+    results = {backend: collection_result(path, backend) for backend in ("html.parser", "lxml")}
+    expected, actual = set(results["html.parser"]), set(results["lxml"])
+    problems = []
+    if expected != actual:
+        problems.append(f"extract_product_links: only html.parser {sorted(expected - actual)}, "
+                        f"only lxml {sorted(actual - expected)}")
+    return problems + check_expected(path, results)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fail when html.parser and lxml parse saved pages differently")
+    parser.add_argument("--fixtures-dir", type=Path, default=DEFAULT_FIXTURES_DIR,
+                        help="Directory with product/*.html and collection/*.html")
+    parser.add_argument("--write-expected", action="store_true",
+                        help="Rewrite <page>.expected.json from the html.parser backend and exit")
+    args = parser.parse_args()
+
+    products = sorted((args.fixtures_dir / "product").glob("*.html"))
+    collections = sorted((args.fixtures_dir / "collection").glob("*.html"))
+    if not products and not collections:
+        print(f"No fixtures in {args.fixtures_dir}")
+        sys.exit(1)
+
+    if args.write_expected:
+        for path in products:
+            write_expected(path, product_result(path, "html.parser"))
+        for path in collections:
+            write_expected(path, collection_result(path, "html.parser"))
+        print(f"Wrote {len(products) + len(collections)} expected files")
+        return
+
+    if lxml_etree is None:
+        print("lxml is not installed, nothing to compare")
+        sys.exit(1)
+
+    pages = [(path, check_product) for path in products]
+    pages += [(path, check_collection) for path in collections]
+
+    failed = False
+    for path, check in pages:
+        problems = check(path)
+        failed |= bool(problems)
+        print(f"{'❌' if problems else '✅'} {path.parent.name}/{path.name}")
+        for problem in problems:
+            print(f"   {problem}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Проверка планов запросов ProductRepository на реалистичном объёме данных.
+
+В одной транзакции, которая в конце откатывается, наполняет БД тестовым
+каталогом (по умолчанию 20 000 товаров с изображениями и характеристиками),
+выполняет ANALYZE, вызывает методы ProductRepository, перехватывает их SQL
+и прогоняет каждый запрос через EXPLAIN ANALYZE. Завершается с кодом 1, если
+в плане есть Seq Scan по большой таблице, прочитавший больше --max-seq-rows
+строк (последовательное чтение, остановленное LIMIT через пару сотен строк,
+не считается). Фасеты фильтров (категории, значения характеристик,
+гистограмма цен) — агрегат по всему каталогу и читают таблицы целиком по
+определению — для них только печатается план. Запускать на тестовой БД с применёнными миграциями:
+
+    alembic upgrade head
+    python3 -m app.utils.check_query_plans --products 20000
+"""
+import argparse
+import asyncio
+import json
+import sys
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
+
+from app.core.repositories.product_repository import ProductRepository
+from app.infrastructure.config.config import DB_CONFIG
+from app.utils.enums import CharacteristicTypeEnum
+
+BIG_TABLES = {"products", "product_images", "product_characteristics"}
+
+SEED_SQL = [
+    """
+    INSERT INTO categories (id, name, slug, "order")
+    SELECT gen_random_uuid(), 'plan-check ' || i, 'plan-check-' || i, i
+    FROM generate_series(1, :categories) AS i
+    """,
+    """
+    INSERT INTO characteristic_types (id, name, slug)
+    SELECT gen_random_uuid(), name, 'plan-check-' || lower(name)
+    FROM unnest(CAST(:type_names AS varchar[])) AS name
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO products (id, name, slug, price, discount_percent, is_active, is_featured, category_id, created_at)
+    SELECT
+        gen_random_uuid(),
+        'Товар ' || i,
+        'plan-check-product-' || i,
+        500 + (i * 37) % 50000,
+        CASE WHEN i % 10 = 0 THEN 15 END,
+        i % 10 <> 1,
+        i % 20 = 0,
+        (SELECT id FROM categories WHERE slug = 'plan-check-' || (1 + i % :categories)),
+        now() - i * interval '1 minute'
+    FROM generate_series(1, :products) AS i
+    """,
+    """
+    INSERT INTO product_images (id, image_path, "order", product_id)
+    SELECT gen_random_uuid(), 'products/' || p.slug || '-' || n || '.webp', n, p.id
+    FROM products p, generate_series(0, 2) AS n
+    WHERE p.slug LIKE 'plan-check-product-%'
+    """,
+    """
+    INSERT INTO product_characteristics (id, value, product_id, characteristic_type_id)
+    SELECT gen_random_uuid(), 'value ' || (abs(hashtext(p.slug || t.slug)) % 40), p.id, t.id
+    FROM products p, characteristic_types t
+    WHERE p.slug LIKE 'plan-check-product-%'
+    """,
+]
+
+
+class StatementRecorder:
+    """Запоминает SQL и параметры, отправленные драйверу."""
+
+    def __init__(self):
+        self.statements: list[tuple[str, object]] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            self.statements.append((statement, parameters))
+
+
+def find_seq_scans(plan: dict, max_rows: int) -> list[tuple[str, int]]:
+    """Seq Scan по большим таблицам, прочитавшие больше max_rows строк."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in BIG_TABLES:
+        rows_read = (plan.get("Actual Rows", 0) + plan.get("Rows Removed by Filter", 0)) * plan.get("Actual Loops", 1)
+        if rows_read > max_rows:
+            found.append((plan["Relation Name"], rows_read))
+    for child in plan.get("Plans", []):
+        found.extend(find_seq_scans(child, max_rows))
+    return found
+
+
+async def seed(conn: AsyncConnection, products: int, categories: int) -> None:
+    params = {
+        "products": products,
+        "categories": categories,
+        "type_names": [item.name for item in CharacteristicTypeEnum],
+    }
+    for statement in SEED_SQL:
+        await conn.execute(text(statement), params)
+    for table in ("categories", "characteristic_types", *sorted(BIG_TABLES)):
+        await conn.exec_driver_sql(f"ANALYZE {table}")
+
+
+async def sample_params(conn: AsyncConnection) -> dict:
+    row = (await conn.execute(text("""
+        SELECT c.id, c.slug, t.slug, pc.value
+        FROM categories c, characteristic_types t
+        JOIN product_characteristics pc ON pc.characteristic_type_id = t.id
+        WHERE c.slug = 'plan-check-1'
+        LIMIT 1
+    """))).one()
+    # Две характеристики одного товара: фильтр по обеим должен что-то находить
+    pair = (await conn.execute(text("""
+        SELECT t1.slug, pc1.value, t2.slug, pc2.value
+        FROM product_characteristics pc1
+        JOIN product_characteristics pc2
+            ON pc2.product_id = pc1.product_id AND pc2.characteristic_type_id <> pc1.characteristic_type_id
+        JOIN characteristic_types t1 ON t1.id = pc1.characteristic_type_id
+        JOIN characteristic_types t2 ON t2.id = pc2.characteristic_type_id
+        JOIN products p ON p.id = pc1.product_id
+        WHERE p.slug = 'plan-check-product-42'
+        LIMIT 1
+    """))).one()
+    anchor = (await conn.execute(text("""
+        SELECT id, price, created_at, coalesce(discount_percent, 0)
+        FROM products WHERE slug = 'plan-check-product-42'
+    """))).one()
+    return {
+        "category_id": row[0], "category_slug": row[1], "char_slug": row[2], "char_value": row[3],
+        "char_pair": {pair[0]: pair[1], pair[2]: pair[3]},
+        # Последний товар «предыдущей страницы» для keyset-пагинации
+        "after_price": (anchor[1], anchor[0]),
+        "after_created_at": (anchor[2], anchor[0]),
+        "after_discount": (anchor[3], anchor[0]),
+    }
+
+
+def build_cases(p: dict) -> list[tuple[str, Callable[[ProductRepository], Awaitable], bool]]:
+    """(название, вызов репозитория, агрегат по всему каталогу)."""
+    return [
+        ("filtered: category + price", lambda r: r.get_filtered_products(
+            category_ids=[p["category_id"]], price_min=1000, price_max=5000, limit=20), False),
+        ("filtered: price range", lambda r: r.get_filtered_products(price_min=1000, price_max=1500, limit=20), False),
+        ("filtered: category slug", lambda r: r.get_filtered_products(slug=p["category_slug"], limit=20), False),
+        ("filtered: characteristic", lambda r: r.get_filtered_products(
+            characteristics={p["char_slug"]: p["char_value"]}, limit=20), False),
+        # id = ANY(ARRAY(...)): на сортированных списках IN (...) планировщик
+        # по оценке значения переключал на hash join по всей таблице products
+        ("filtered: two characteristics", lambda r: r.get_filtered_products(
+            characteristics=p["char_pair"], limit=20), False),
+        ("keyset: characteristic + price", lambda r: r.get_filtered_products(
+            characteristics={p["char_slug"]: p["char_value"]}, sort="price_desc", after=p["after_price"], limit=20),
+         False),
+        ("sort: price asc", lambda r: r.get_filtered_products(sort="price_asc", limit=20), False),
+        ("sort: category + price desc", lambda r: r.get_filtered_products(
+            category_ids=[p["category_id"]], sort="price_desc", limit=20), False),
+        ("sort: discount", lambda r: r.get_filtered_products(sort="discount", limit=20), False),
+        ("keyset: newest", lambda r: r.get_filtered_products(after=p["after_created_at"], limit=20), False),
+        ("keyset: category + newest", lambda r: r.get_filtered_products(
+            category_ids=[p["category_id"]], after=p["after_created_at"], limit=20), False),
+        ("keyset: price desc", lambda r: r.get_filtered_cards(
+            sort="price_desc", after=p["after_price"], limit=20), False),
+        ("keyset: discount", lambda r: r.get_filtered_cards(
+            sort="discount", after=p["after_discount"], limit=20), False),
+        ("by slug", lambda r: r.get_by_slug("plan-check-product-42"), False),
+        ("detail by slug (json_agg)", lambda r: r.get_detail_by_slug("plan-check-product-42"), False),
+        ("home: new", lambda r: r.get_for_home(is_new=True), False),
+        ("home: featured", lambda r: r.get_for_home(is_featured=True), False),
+        ("home: sales", lambda r: r.get_for_home(is_sales=True), False),
+        ("search by name", lambda r: r.search_by_name("Товар 1"), False),
+        ("cards: category + price", lambda r: r.get_filtered_cards(
+            category_ids=[p["category_id"]], price_min=1000, price_max=5000, limit=20), False),
+        ("cards: characteristic", lambda r: r.get_filtered_cards(
+            characteristics={p["char_slug"]: p["char_value"]}, limit=20), False),
+        ("cards: home new", lambda r: r.get_home_cards(is_new=True), False),
+        ("cards: search", lambda r: r.search_cards("Товар 1"), False),
+        ("filter facets", lambda r: r.get_filter_facets(20), True),
+        ("filter facets: category", lambda r: r.get_filter_facets(20, p["category_slug"]), True),
+    ]
+
+
+async def run(args) -> bool:
+    engine = create_async_engine(DB_CONFIG.get_url(is_async=True))
+    recorder = StatementRecorder()
+    ok = True
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            print(f"Seeding {args.products} products...")
+            await seed(conn, args.products, args.categories)
+            params = await sample_params(conn)
+
+            session = AsyncSession(bind=conn)
+            repository = ProductRepository(session)
+            event.listen(engine.sync_engine, "before_cursor_execute", recorder)
+            for name, call, full_scan in build_cases(params):
+                recorder.statements = []
+                await call(repository)
+                statements = list(recorder.statements)
+
+                problems = []
+                for statement, parameters in statements:
+                    result = await conn.exec_driver_sql(
+                        f"EXPLAIN (ANALYZE, FORMAT JSON) {statement}", parameters
+                    )
+                    plan = result.scalar()
+                    plan = json.loads(plan) if isinstance(plan, str) else plan
+                    for table, rows_read in find_seq_scans(plan[0]["Plan"], args.max_seq_rows):
+                        problems.append(
+                            f"Seq Scan on {table} ({rows_read} rows): {' '.join(statement.split())[:100]}"
+                        )
+
+                mark = "ℹ️ " if full_scan and problems else ("❌" if problems else "✅")
+                print(f"{mark} {name:<28} statements={len(statements)}")
+                for problem in problems:
+                    print(f"   {problem}")
+                ok &= full_scan or not problems
+            event.remove(engine.sync_engine, "before_cursor_execute", recorder)
+            await session.close()
+        finally:
+            await transaction.rollback()
+    await engine.dispose()
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fail when ProductRepository queries use sequential scans")
+    parser.add_argument("--products", type=int, default=20_000)
+    parser.add_argument("--categories", type=int, default=40)
+    parser.add_argument("--max-seq-rows", type=int, default=1000, help="Seq Scan reading more rows fails the check")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(run(args)) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,74 +2,159 @@
 Утилита для очистки неиспользуемых файлов изображений.
 
 Удаляет файлы изображений, которые есть на диске, но отсутствуют в базе данных.
-Это может произойти после многократных запусков импорта с флагом --refresh-images.
+Это может произойти после многократных запусков импорта с флагом --refresh-images
+или после замены изображений категорий и отзывов в админке.
+
+Пути читаются из всех колонок с изображениями (`Category.image`, `Review.image`,
+`ProductImage.image_path`) потоково, без загрузки ORM-объектов. Каталог
+изображений обходится через `os.scandir`, удаление идёт в пуле потоков.
+Файлы моложе `--min-age` минут не трогаются: это могут быть загрузки,
+которые ещё не закоммичены в БД.
 """
 import argparse
+import os
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from sqlalchemy import select
 
 from app.infrastructure.config.config import APP_CONFIG
 from app.infrastructure.database.adapters.sync_connection import sync_session_maker
+from app.infrastructure.database.models.category import Category
 from app.infrastructure.database.models.product import ProductImage
+from app.infrastructure.database.models.review import Review
+
+IMAGE_COLUMNS = (Category.image, Review.image, ProductImage.image_path)
+IMAGE_EXTENSIONS = {".webp", ".jpg", ".jpeg", ".png", ".gif", ".bmp"}
+
 
+def iter_used_image_paths(session, batch_size: int = 1000) -> Iterator[str]:
+    """Потоково отдать пути изображений из всех колонок, где они хранятся."""
+    for column in IMAGE_COLUMNS:
+        stmt = (
+            select(column)
+            .where(column.is_not(None))
+            .execution_options(yield_per=batch_size)
+        )
+        for path in session.scalars(stmt):
+            if path:
+                yield path.strip("/")
 
-def get_used_image_paths(session) -> set[str]:
+
+def get_used_image_paths(session, batch_size: int = 1000) -> set[str]:
     """Получить все пути к изображениям, используемым в БД."""
-    images = session.scalars(select(ProductImage)).all()
-    return {img.image_path for img in images}
+    return set(iter_used_image_paths(session, batch_size))
+
 
+def iter_image_files(images_dir: Path) -> Iterator[tuple[str, os.DirEntry]]:
+    """Обойти каталог изображений, отдавая (относительный путь, DirEntry)."""
+    stack = [(str(images_dir), "")]
+    while stack:
+        directory, prefix = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    relative_path = f"{prefix}{entry.name}"
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, f"{relative_path}/"))
+                    elif entry.is_file(follow_symlinks=False):
+                        if os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS:
+                            yield relative_path, entry
+        except FileNotFoundError:
+            continue
 
-def find_orphaned_images(images_dir: Path, used_paths: set[str]) -> list[Path]:
-    """Найти файлы изображений, которых нет в БД."""
+
+def find_orphaned_images(
+    images_dir: Path,
+    used_paths: set[str],
+    min_age_seconds: float = 0,
+) -> tuple[list[tuple[Path, int]], int]:
+    """
+    Найти файлы изображений, которых нет в БД.
+
+    Возвращает список (путь, размер) и число пропущенных свежих файлов.
+    Для каждого кандидата делается один stat.
+    """
     orphaned = []
-    products_dir = images_dir / "products"
-    
-    if not products_dir.exists():
-        return orphaned
-    
-    for image_file in products_dir.glob("*.webp"):
-        relative_path = f"products/{image_file.name}"
-        if relative_path not in used_paths:
-            orphaned.append(image_file)
-    
-    return orphaned
-
-
-def cleanup_orphaned_images(dry_run: bool = True) -> None:
+    skipped_recent = 0
+    threshold = time.time() - min_age_seconds
+
+    for relative_path, entry in iter_image_files(images_dir):
+        if relative_path in used_paths:
+            continue
+        try:
+            stat = entry.stat(follow_symlinks=False)
+        except FileNotFoundError:
+            continue
+        if stat.st_mtime > threshold:
+            skipped_recent += 1
+            continue
+        orphaned.append((Path(entry.path), stat.st_size))
+
+    return orphaned, skipped_recent
+
+
+def _unlink(file_path: Path) -> Exception | None:
+    try:
+        file_path.unlink(missing_ok=True)
+    except Exception as exc:
+        return exc
+    return None
+
+
+def delete_files(files: list[Path], workers: int = 8) -> tuple[int, int]:
+    """Удалить файлы параллельно, вернуть (удалено, ошибок)."""
+    deleted = 0
+    errors = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for file_path, exc in zip(files, pool.map(_unlink, files)):
+            if exc is None:
+                deleted += 1
+            else:
+                print(f"❌ Ошибка при удалении {file_path.name}: {exc}")
+                errors += 1
+    return deleted, errors
+
+
+def cleanup_orphaned_images(
+    dry_run: bool = True,
+    min_age_minutes: float = 60,
+    workers: int = 8,
+    batch_size: int = 1000,
+) -> None:
     """Удалить неиспользуемые файлы изображений."""
     images_dir = Path(APP_CONFIG.IMAGES_DIR)
-    
+
     with sync_session_maker() as session:
-        used_paths = get_used_image_paths(session)
-    
-    orphaned = find_orphaned_images(images_dir, used_paths)
-    
+        used_paths = get_used_image_paths(session, batch_size)
+    print(f"📦 Изображений в БД: {len(used_paths)}")
+
+    orphaned, skipped_recent = find_orphaned_images(
+        images_dir, used_paths, min_age_seconds=min_age_minutes * 60
+    )
+    if skipped_recent:
+        print(f"⏳ Пропущено свежих файлов (моложе {min_age_minutes:g} мин): {skipped_recent}")
+
     if not orphaned:
         print("✅ Неиспользуемых изображений не найдено")
         return
-    
-    total_size = sum(f.stat().st_size for f in orphaned)
+
+    total_size = sum(size for _, size in orphaned)
     print(f"🗑️  Найдено {len(orphaned)} неиспользуемых файлов ({total_size / 1024 / 1024:.2f} MB)")
-    
+
     if dry_run:
         print("\n🔍 Режим dry-run, файлы не будут удалены:")
-        for idx, file_path in enumerate(orphaned[:10], 1):
-            print(f"  [{idx}] {file_path.name} ({file_path.stat().st_size / 1024:.1f} KB)")
+        for idx, (file_path, size) in enumerate(orphaned[:10], 1):
+            print(f"  [{idx}] {file_path.relative_to(images_dir)} ({size / 1024:.1f} KB)")
         if len(orphaned) > 10:
             print(f"  ... и ещё {len(orphaned) - 10} файлов")
         print("\n💡 Запустите с флагом --execute для удаления")
     else:
-        deleted = 0
-        errors = 0
-        for file_path in orphaned:
-            try:
-                file_path.unlink()
-                deleted += 1
-            except Exception as exc:
-                print(f"❌ Ошибка при удалении {file_path.name}: {exc}")
-                errors += 1
-        
+        deleted, errors = delete_files([file_path for file_path, _ in orphaned], workers)
         print(f"✅ Удалено: {deleted} файлов")
         if errors:
             print(f"❌ Ошибок: {errors}")
@@ -84,11 +169,33 @@ def main() -> None:
         action="store_true",
         help="Выполнить удаление (по умолчанию только показать список)",
     )
+    parser.add_argument(
+        "--min-age",
+        type=float,
+        default=60,
+        help="Не трогать файлы моложе N минут (незавершённые загрузки)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Число потоков для удаления файлов",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Размер пачки при потоковом чтении путей из БД",
+    )
     args = parser.parse_args()
-    
-    cleanup_orphaned_images(dry_run=not args.execute)
+
+    cleanup_orphaned_images(
+        dry_run=not args.execute,
+        min_age_minutes=args.min_age,
+        workers=args.workers,
+        batch_size=args.batch_size,
+    )
 
 
 if __name__ == "__main__":
     main()
-
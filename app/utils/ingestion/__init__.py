@@ -0,0 +1,4 @@
+from app.utils.ingestion.pipeline import IngestionConfig, IngestionPipeline, run_ingestion
+
+
+__all__ = ["IngestionConfig", "IngestionPipeline", "run_ingestion"]
@@ -0,0 +1,85 @@
+"""
+Журнал найденных и обработанных URL импорта.
+"""
+import json
+from pathlib import Path
+
+from app.utils.ingestion.snapshot import truncate_partial_line
+
+
+class ImportCheckpoint:
+    """
+    Журнал импорта для продолжения после падения (--resume).
+
+    Файл в формате NDJSON, только дозапись: сначала список найденных
+    ссылок на товары, затем по строке на каждый обработанный URL.
+    При импорте снимка ещё пишется watermark — номер записи, до которого
+    включительно обработаны все записи подряд. Недописанная последняя
+    строка при чтении игнорируется.
+    """
+
+    def __init__(self, path: Path, collection_url: str) -> None:
+        self.path = path
+        self.collection_url = collection_url
+        self.links: list[str] | None = None
+        self.processed: set[str] = set()
+        self.watermark = 0
+        self._fh = None
+
+    @classmethod
+    def open(cls, path: Path, collection_url: str, resume: bool) -> "ImportCheckpoint":
+        checkpoint = cls(path, collection_url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if resume and path.exists():
+            checkpoint._load()
+            checkpoint._fh = path.open("a", encoding="utf-8")
+        else:
+            checkpoint._fh = path.open("w", encoding="utf-8")
+            checkpoint._append({"event": "start", "collection_url": collection_url})
+        return checkpoint
+
+    def _load(self) -> None:
+        truncate_partial_line(self.path)
+        with self.path.open("r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                kind = event.get("event")
+                if kind == "start" and event.get("collection_url") != self.collection_url:
+                    raise SystemExit(
+                        f"Checkpoint {self.path} belongs to {event.get('collection_url')}, "
+                        f"not {self.collection_url}. Run without --resume to start over."
+                    )
+                if kind == "discovered":
+                    self.links = event["links"]
+                elif kind == "processed":
+                    self.processed.add(event["url"])
+                elif kind == "watermark":
+                    self.watermark = event["record"]
+
+    def _append(self, event: dict) -> None:
+        self._fh.write(json.dumps(event, ensure_ascii=False))
+        self._fh.write("\n")
+        self._fh.flush()
+
+    def record_links(self, links: list[str]) -> None:
+        self.links = links
+        self._append({"event": "discovered", "links": links})
+
+    def mark_processed(self, url: str, status: str) -> None:
+        self.processed.add(url)
+        self._append({"event": "processed", "url": url, "status": status})
+
+    def record_watermark(self, record: int) -> None:
+        self.watermark = record
+        self._append({"event": "watermark", "record": record})
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def finish(self) -> None:
+        """Импорт завершён целиком — журнал больше не нужен."""
+        self.close()
+        self.path.unlink(missing_ok=True)
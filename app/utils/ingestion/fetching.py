@@ -0,0 +1,64 @@
+"""
+Сетевой слой импорта: загрузка HTML и изображений (с конвертацией в WebP).
+Функции блокирующие — конвейер вызывает их в пуле потоков.
+"""
+import io
+import uuid
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit, quote
+from urllib.request import Request, urlopen
+
+from PIL import Image
+
+from app.infrastructure.config.config import APP_CONFIG
+
+
+def fetch_html(url: str, timeout: int = 30) -> str:
+    request = Request(
+        url,
+        headers={
+            "User-Agent": "Mozilla/5.0 (compatible; 4roads-scraper/1.0)",
+            "Accept-Language": "ru-RU,ru;q=0.9,en;q=0.8",
+        },
+    )
+    with urlopen(request, timeout=timeout) as response:
+        charset = response.headers.get_content_charset() or "utf-8"
+        return response.read().decode(charset, errors="replace")
+
+
+def download_image(url: str, target_dir: Path) -> str:
+    target_dir.mkdir(parents=True, exist_ok=True)
+    split = urlsplit(url)
+    safe_path = quote(split.path)
+    safe_url = urlunsplit((split.scheme, split.netloc, safe_path, split.query, split.fragment))
+    request = Request(safe_url, headers={"User-Agent": "Mozilla/5.0"})
+    with urlopen(request, timeout=30) as response:
+        content = response.read()
+    max_bytes = APP_CONFIG.MAX_IMAGE_SIZE_MB * 1024 * 1024
+    if len(content) > max_bytes:
+        raise ValueError(f"image too large: {len(content)} bytes")
+    image = Image.open(io.BytesIO(content))
+    if image.mode in ("RGBA", "LA", "P"):
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        if image.mode == "P":
+            image = image.convert("RGBA")
+        if image.mode in ("RGBA", "LA"):
+            background.paste(image, mask=image.split()[-1])
+        else:
+            background.paste(image)
+        image = background
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+
+    filename = f"{uuid.uuid4()}.webp"
+    filepath = target_dir / filename
+    image.save(
+        filepath,
+        "WEBP",
+        quality=APP_CONFIG.WEBP_QUALITY,
+        method=6,
+        optimize=True,
+    )
+    return filename
+
+
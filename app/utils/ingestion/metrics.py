@@ -0,0 +1,47 @@
+"""
+Счётчики и время работы стадий конвейера импорта.
+"""
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator
+
+
+STAGES = ("discover", "fetch", "parse", "enrich", "export", "media", "persist")
+
+
+class PipelineMetrics:
+    """Счётчики событий и суммарное время обработки по каждой стадии."""
+
+    def __init__(self) -> None:
+        self.counters: dict[str, Counter] = {stage: Counter() for stage in STAGES}
+        self.busy: dict[str, float] = dict.fromkeys(STAGES, 0.0)
+        self.calls: dict[str, int] = dict.fromkeys(STAGES, 0)
+
+    def incr(self, stage: str, key: str, amount: int = 1) -> None:
+        self.counters[stage][key] += amount
+
+    @contextmanager
+    def timed(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.busy[stage] += time.perf_counter() - started
+            self.calls[stage] += 1
+
+    @property
+    def failed(self) -> int:
+        return sum(counter["failed"] for counter in self.counters.values())
+
+    def format(self) -> str:
+        parts = []
+        for stage in STAGES:
+            counter = self.counters[stage]
+            if not counter and not self.calls[stage]:
+                continue
+            values = [f"{key}={value}" for key, value in sorted(counter.items())]
+            if self.calls[stage]:
+                values.append(f"avg={self.busy[stage] / self.calls[stage] * 1000:.0f}ms")
+            parts.append(f"{stage}: {', '.join(values)}")
+        return " | ".join(parts)
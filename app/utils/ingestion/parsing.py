@@ -0,0 +1,685 @@
+"""
+Разбор HTML-страниц каталога 4roads.su: ссылки на товары, карточка товара
+и извлечение характеристик. Движок парсинга выбирается через feed_html().
+"""
+import re
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Iterable
+from urllib.parse import urljoin, urlparse
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # lxml не установлен — остаётся только html.parser
+    lxml_etree = None
+
+
+PAGE_RE = re.compile(r'page=(\d+)')
+PRICE_RE = re.compile(r'(\d[\d\s\xa0]+)\s*руб', re.IGNORECASE)
+DIMENSION_RE = re.compile(
+    r"(\d+(?:[.,]\d+)?)\s*см?\s*[xх×]\s*(\d+(?:[.,]\d+)?)\s*см?"
+    r"(?:\s*[xх×]\s*(\d+(?:[.,]\d+)?)\s*см?)?",
+    re.IGNORECASE,
+)
+
+PARSER_BACKENDS = ("auto", "lxml", "html.parser")
+# Закрывающие события void-элементов (<img>, <br>...) у движков разные:
+# html.parser присылает их только для <br/>, lxml — всегда. Глубину такие
+# теги не меняют, и ProductPageParser их не учитывает.
+VOID_ELEMENTS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+})
+
+COLOR_TOKENS = {
+    "белый", "белый жемчужный", "бежевый", "бордовый", "васильковый",
+    "вишневый", "вишня", "голубой", "желтый", "коричневый",
+    "королевский синий", "красный", "оранж", "оранжевый", "петролеум",
+    "пурпурный", "розовый", "салатовый", "светло-синий", "серо-голубой",
+    "серо-оливковый", "серый", "синий", "темно-зеленый", "темно-пурпурный",
+    "темно-серый", "темно-синий", "черный", "хаки", "зеленый",
+}
+
+
+class ProductLinkParser(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__()
+        self.links: set[str] = set()
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag != "a":
+            return
+        attrs_dict = dict(attrs)
+        href = attrs_dict.get("href")
+        class_attr = (attrs_dict.get("class") or "").lower()
+        if href and href.startswith("/product/") and "inner" in class_attr:
+            self.links.add(href)
+
+
+class ProductPageParser(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__()
+        self._index = 0
+        self._depth = 0
+        self._in_h1 = False
+        self._current_anchor_href = None
+        self._current_anchor_text: list[str] = []
+        self._in_description = False
+        self._desc_depth: int | None = None
+        self._in_characteristics = False
+        self._char_depth: int | None = None
+        self._in_gallery = False
+        self._gallery_depth: int | None = None
+        self._in_introtext = False
+        self._intro_depth: int | None = None
+        self._current_option: str | None = None
+        self._option_depth: int | None = None
+        self._in_price = False
+        self._price_depth: int | None = None
+        self._in_old_price = False
+        self._old_price_depth: int | None = None
+
+        self.h1_text: list[str] = []
+        self.h1_index: int | None = None
+        self.tokens: list[tuple[int, str]] = []
+        self.anchors: list[tuple[int, str, str | None]] = []
+        self.images: list[str] = []
+        self.description_parts: list[str] = []
+        self.characteristics_parts: list[str] = []
+        self.introtext_parts: list[str] = []
+        self.price_text: str | None = None
+        self.old_price_text: str | None = None
+        self.size_value: str | None = None
+        self.color_value: str | None = None
+        self.sku: str | None = None
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self._index += 1
+        attrs_dict = dict(attrs)
+        if tag in VOID_ELEMENTS:
+            self._collect_images(attrs_dict)
+            return
+
+        self._depth += 1
+        class_attr = (attrs_dict.get("class") or "").lower()
+
+        if tag == "h1":
+            self._in_h1 = True
+
+        if attrs_dict.get("id") == "product-description":
+            self._in_description = True
+            self._desc_depth = self._depth
+
+        if attrs_dict.get("id") == "product-characteristics":
+            self._in_characteristics = True
+            self._char_depth = self._depth
+
+        if "product-gallery" in class_attr:
+            self._in_gallery = True
+            self._gallery_depth = self._depth
+
+        if "product-introtext" in class_attr:
+            self._in_introtext = True
+            self._intro_depth = self._depth
+
+        if "option-razmer" in class_attr:
+            self._current_option = "size"
+            self._option_depth = self._depth
+        elif "option-cvet" in class_attr:
+            self._current_option = "color"
+            self._option_depth = self._depth
+
+        if "js-product-price" in class_attr:
+            self._in_price = True
+            self._price_depth = self._depth
+
+        if "js-product-old-price" in class_attr:
+            self._in_old_price = True
+            self._old_price_depth = self._depth
+
+        if tag == "a":
+            self._current_anchor_href = attrs_dict.get("href")
+
+        self._collect_images(attrs_dict)
+
+    def _collect_images(self, attrs_dict: dict[str, str | None]) -> None:
+        if self._in_gallery:
+            for key in ("src", "data-src", "href"):
+                value = attrs_dict.get(key)
+                if value and "static.insales-cdn.com/images/products" in value:
+                    self.images.append(value)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in VOID_ELEMENTS:
+            return
+        self._index += 1
+        if tag == "h1":
+            self._in_h1 = False
+            self.h1_index = self._index
+
+        if tag == "a" and self._current_anchor_href is not None:
+            text = "".join(self._current_anchor_text).strip()
+            self.anchors.append((self._index, text, self._current_anchor_href))
+            self._current_anchor_href = None
+            self._current_anchor_text = []
+
+        if self._desc_depth is not None and self._depth == self._desc_depth:
+            self._in_description = False
+            self._desc_depth = None
+
+        if self._char_depth is not None and self._depth == self._char_depth:
+            self._in_characteristics = False
+            self._char_depth = None
+
+        if self._gallery_depth is not None and self._depth == self._gallery_depth:
+            self._in_gallery = False
+            self._gallery_depth = None
+
+        if self._intro_depth is not None and self._depth == self._intro_depth:
+            self._in_introtext = False
+            self._intro_depth = None
+
+        if self._option_depth is not None and self._depth == self._option_depth:
+            self._current_option = None
+            self._option_depth = None
+
+        if self._price_depth is not None and self._depth == self._price_depth:
+            self._in_price = False
+            self._price_depth = None
+
+        if self._old_price_depth is not None and self._depth == self._old_price_depth:
+            self._in_old_price = False
+            self._old_price_depth = None
+
+        self._depth -= 1
+
+    def handle_data(self, data: str) -> None:
+        text = data.strip()
+        if not text:
+            return
+        self._index += 1
+        if self._in_h1:
+            self.h1_text.append(text)
+        if self._current_anchor_href is not None:
+            self._current_anchor_text.append(text)
+        if self._in_description:
+            self.description_parts.append(text)
+        if self._in_characteristics:
+            self.characteristics_parts.append(text)
+        if self._in_introtext:
+            self.introtext_parts.append(text)
+        if self._in_price and self.price_text is None:
+            match = PRICE_RE.search(text)
+            if match:
+                self.price_text = match.group(1)
+        if self._in_old_price and self.old_price_text is None:
+            match = PRICE_RE.search(text)
+            if match:
+                self.old_price_text = match.group(1)
+        if self._current_option == "size" and self.size_value is None:
+            if text.lower() != "размер":
+                self.size_value = text
+        if self._current_option == "color" and self.color_value is None:
+            if text.lower() != "цвет":
+                self.color_value = text
+        if self.sku is None and "Артикул" in text:
+            match = re.search(r"Артикул[:\s]*([A-Za-zА-Яа-я0-9-]+)", text)
+            if match:
+                self.sku = match.group(1)
+        self.tokens.append((self._index, text))
+
+
+class LxmlEventTarget:
+    """
+    Target для lxml.etree.HTMLParser, переводящий события libxml2
+    в вызовы handle_* парсеров, написанных под html.parser.
+
+    Текст буферизуется до следующего тега: libxml2 может дробить его
+    на сущностях, а html.parser отдаёт цельный кусок.
+    """
+
+    def __init__(self, handler: HTMLParser) -> None:
+        self.handler = handler
+        self._text: list[str] = []
+
+    def _flush(self) -> None:
+        if self._text:
+            self.handler.handle_data("".join(self._text))
+            self._text = []
+
+    def start(self, tag: str, attrib) -> None:
+        self._flush()
+        self.handler.handle_starttag(tag, list(attrib.items()))
+
+    def end(self, tag: str) -> None:
+        self._flush()
+        self.handler.handle_endtag(tag)
+
+    def data(self, data: str) -> None:
+        self._text.append(data)
+
+    def comment(self, text: str) -> None:
+        self._flush()
+
+    def close(self) -> None:
+        self._flush()
+
+
+_parser_backend = "auto"
+
+
+def set_parser_backend(name: str) -> None:
+    global _parser_backend
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"unknown parser backend: {name}")
+    if name == "lxml" and lxml_etree is None:
+        raise ValueError("lxml is not installed")
+    _parser_backend = name
+
+
+def resolve_parser_backend(name: str | None = None) -> str:
+    name = name or _parser_backend
+    if name == "auto":
+        return "lxml" if lxml_etree is not None else "html.parser"
+    return name
+
+
+def feed_html(handler: HTMLParser, html: str, backend: str | None = None) -> None:
+    """Прогнать html через handler выбранным движком (по умолчанию — самым быстрым доступным)."""
+    if resolve_parser_backend(backend) == "lxml":
+        parser = lxml_etree.HTMLParser(target=LxmlEventTarget(handler))
+        parser.feed(html)
+        parser.close()
+    else:
+        handler.feed(html)
+
+
+def extract_product_links(html: str, base_url: str, backend: str | None = None) -> set[str]:
+    parser = ProductLinkParser()
+    feed_html(parser, html, backend)
+    return {urljoin(base_url, href) for href in parser.links}
+
+
+def extract_max_page(html: str) -> int:
+    pages = [int(num) for num in PAGE_RE.findall(html)]
+    return max(pages) if pages else 1
+
+
+def normalize_whitespace(text: str) -> str:
+    text = text.replace("\xa0", " ")
+    text = re.sub(r"[ \t\r\f\v]+", " ", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+def normalize_color_token(token: str) -> str | None:
+    cleaned = normalize_whitespace(token).strip(",;").lower()
+    if not cleaned:
+        return None
+    if cleaned in {"в ассортименте", "ассорти", "ассортимент"}:
+        return None
+    if cleaned in COLOR_TOKENS:
+        return cleaned.capitalize()
+    return cleaned.capitalize()
+
+
+def extract_color_from_text(text: str) -> str | None:
+    match = re.search(
+        r"(?:доступные\s+цвета|цвета|цвет)\s*[:\-]\s*([^.\n]+)",
+        text,
+        re.IGNORECASE,
+    )
+    if not match:
+        return None
+    raw = match.group(1)
+    tokens = [t for t in re.split(r"[,/]", raw) if t.strip()]
+    colors = []
+    for token in tokens:
+        normalized = normalize_color_token(token)
+        if normalized:
+            colors.append(normalized)
+    if len(colors) == 1:
+        return colors[0]
+    return None
+
+
+def extract_material_from_text(text: str) -> str | None:
+    lowered = text.lower()
+    key_pos = lowered.find("материал")
+    if key_pos == -1:
+        return None
+    tail = text[key_pos + len("материал"):]
+    tail = tail.lstrip(" :.-")
+    if not tail:
+        return None
+    keywords = ["объём", "объем", "цвета", "цвет", "размеры", "размер", "доступные"]
+    end_positions = []
+    tail_lower = tail.lower()
+    for keyword in keywords:
+        pos = tail_lower.find(keyword)
+        if pos != -1:
+            end_positions.append(pos)
+    for sep in [".", "\n"]:
+        pos = tail.find(sep)
+        if pos != -1:
+            end_positions.append(pos)
+    end = min(end_positions) if end_positions else len(tail)
+    material = tail[:end].strip(" ,.-")
+    return material or None
+
+
+def extract_introtext_characteristics(text: str) -> dict[str, str]:
+    if not text:
+        return {}
+    text_norm = normalize_whitespace(text)
+    result: dict[str, str] = {}
+
+    size_match = re.search(r"Размер[:\s]*([0-9]+)\s*\"", text_norm, re.IGNORECASE)
+    if size_match:
+        result["Размер"] = f"{size_match.group(1)}\""
+
+    dim_match = DIMENSION_RE.search(text_norm)
+    if dim_match:
+        parts = [p for p in dim_match.groups() if p]
+        if parts:
+            size_value = "x".join(parts) + " см"
+            result.setdefault("Размер", size_value)
+
+    width = re.search(r"Ширина[:\s]*([0-9]+(?:[.,][0-9]+)?)\s*см", text_norm, re.IGNORECASE)
+    height = re.search(r"Высота[:\s]*([0-9]+(?:[.,][0-9]+)?)\s*см", text_norm, re.IGNORECASE)
+    depth = re.search(r"Глубина[:\s]*([0-9]+(?:[.,][0-9]+)?)\s*см", text_norm, re.IGNORECASE)
+    if width:
+        result["Ширина"] = f"{width.group(1)} см"
+    if height:
+        result["Высота"] = f"{height.group(1)} см"
+    if depth:
+        result["Глубина"] = f"{depth.group(1)} см"
+
+    if "Размер" not in result and width and height and depth:
+        result["Размер"] = f"{width.group(1)}x{height.group(1)}x{depth.group(1)} см"
+
+    weight = re.search(r"Вес[:\s]*([0-9]+(?:[.,][0-9]+)?)\s*(кг|г)?", text_norm, re.IGNORECASE)
+    if weight:
+        unit = weight.group(2) or "г"
+        result["Вес"] = f"{weight.group(1)} {unit}"
+
+    volume = re.search(r"Объ[её]м[:\s]*([0-9]+(?:[.,][0-9]+)?)\s*(мл|л)?", text_norm, re.IGNORECASE)
+    if volume:
+        unit = volume.group(2) or "мл"
+        result["Объём"] = f"{volume.group(1)} {unit}"
+
+    diameter = re.search(r"диаметр[^0-9]*([0-9]+(?:[.,][0-9]+)?)\s*см", text_norm, re.IGNORECASE)
+    if diameter:
+        result["Диаметр"] = f"{diameter.group(1)} см"
+
+    length = re.search(r"длина[:\s]*([0-9]+(?:[.,][0-9]+)?)\s*см", text_norm, re.IGNORECASE)
+    if length:
+        result["Длина"] = f"{length.group(1)} см"
+
+    material = extract_material_from_text(text_norm)
+    if material:
+        result.setdefault("Материал", material)
+
+    color = extract_color_from_text(text_norm)
+    if color:
+        result.setdefault("Цвет", color)
+
+    return result
+
+
+def extract_description(text: str) -> str | None:
+    if not text:
+        return None
+    markers = ["· Артикул", "Артикул:", "Артикул"]
+    start = -1
+    for marker in markers:
+        pos = text.find(marker)
+        if pos != -1:
+            start = pos
+            break
+    if start != -1:
+        end_markers = ["Имя", "E-mail", "Оценка", "Отправить", "Отзывы"]
+        end_positions = [text.find(m, start) for m in end_markers]
+        end_positions = [pos for pos in end_positions if pos != -1]
+        end = min(end_positions) if end_positions else len(text)
+        return normalize_whitespace(text[start:end])
+
+    desc_marker = "Описание"
+    pos = text.find(desc_marker)
+    if pos != -1:
+        tail = text[pos + len(desc_marker):]
+        end = tail.find("Отзывы")
+        if end != -1:
+            tail = tail[:end]
+        return normalize_whitespace(tail)
+    return None
+
+
+def extract_prices(tokens: Iterable[tuple[int, str]], h1_index: int | None) -> tuple[int | None, int | None]:
+    matches: list[int] = []
+    for idx, text in tokens:
+        if h1_index is not None and idx < h1_index:
+            continue
+        for match in PRICE_RE.findall(text):
+            price = int(match.replace(" ", "").replace("\xa0", ""))
+            matches.append(price)
+    if not matches:
+        return None, None
+    if len(matches) == 1:
+        return matches[0], None
+    price = matches[0]
+    old_price = None
+    if matches[1] > price:
+        old_price = matches[1]
+    return price, old_price
+
+
+def extract_category(anchors: list[tuple[int, str, str | None]], h1_index: int | None) -> tuple[str | None, str | None]:
+    if h1_index is None:
+        return None, None
+    main_anchor_idx = None
+    for idx, text, _href in anchors:
+        if idx < h1_index and text.strip().lower() == "главная":
+            if main_anchor_idx is None or idx > main_anchor_idx:
+                main_anchor_idx = idx
+    if main_anchor_idx is None:
+        return None, None
+    for idx, text, href in anchors:
+        if idx > main_anchor_idx and idx < h1_index and href and "/collection/" in href:
+            name = text.strip() or None
+            slug = parse_collection_slug(href)
+            return name, slug
+    return None, None
+
+
+def parse_collection_slug(href: str) -> str | None:
+    path = urlparse(href).path
+    if "/collection/" not in path:
+        return None
+    slug = path.split("/collection/")[-1].strip("/")
+    return slug or None
+
+
+def find_label_value(tokens: list[str], label: str) -> str | None:
+    label_lower = label.lower()
+    for idx, text in enumerate(tokens):
+        if text.lower() == label_lower:
+            for j in range(idx + 1, min(idx + 6, len(tokens))):
+                candidate = tokens[j].strip()
+                if not candidate:
+                    continue
+                if candidate.lower() in {"количество", "в наличии"}:
+                    continue
+                return candidate
+    return None
+
+
+def extract_size_from_name(name: str | None) -> str | None:
+    if not name:
+        return None
+    match = re.search(r"\(([^)]+)\)", name)
+    if match:
+        raw = match.group(1).strip()
+        if re.search(r"\d", raw) or re.fullmatch(r"[SML]", raw, re.IGNORECASE):
+            return raw
+        return None
+    return None
+
+
+def normalize_size(value: str | None) -> str | None:
+    if not value:
+        return None
+    value = value.strip()
+    if re.search(r"[xх×]|см|мм|\"", value, re.IGNORECASE):
+        return normalize_whitespace(value)
+    match = re.search(r"\b([SML])\b", value, re.IGNORECASE)
+    if match:
+        return match.group(1).upper()
+    match = re.fullmatch(r"(\d{2})\s*\"?", value)
+    if match:
+        return match.group(1)
+    return value
+
+
+def normalize_material(value: str | None) -> str | None:
+    if not value:
+        return None
+    lower = value.lower()
+    if "поликарбонат" in lower:
+        return "Поликарбонат"
+    if "полипропилен" in lower:
+        return "Полипропилен"
+    if "abs" in lower:
+        return "ABS-пластик"
+    if "полиэстер" in lower:
+        return "Полиэстер"
+    if "нейлон" in lower:
+        return "Нейлон"
+    if "спандекс" in lower:
+        return "Спандекс"
+    if "кожзам" in lower:
+        return "Кожзам"
+    return value.strip()
+
+
+def extract_color_from_name(name: str | None) -> str | None:
+    if not name:
+        return None
+    lower = name.lower()
+    for color in sorted(COLOR_TOKENS, key=len, reverse=True):
+        if lower.endswith(color):
+            return color.capitalize()
+    return None
+
+
+def extract_characteristics(
+    tokens: list[str],
+    text: str,
+    name: str | None,
+    introtext: str | None,
+) -> dict[str, str]:
+    text_norm = normalize_whitespace(text)
+    intro_data = extract_introtext_characteristics(introtext or "")
+    size = find_label_value(tokens, "Размер")
+    color = find_label_value(tokens, "Цвет")
+    material = None
+
+    material_match = re.search(r"Материал[:\s]+([^\n]+)", text_norm, re.IGNORECASE)
+    if material_match:
+        material = material_match.group(1).strip()
+    if not material:
+        material = intro_data.get("Материал") or extract_material_from_text(text_norm)
+
+    if not size:
+        size = intro_data.get("Размер") or extract_size_from_name(name)
+    size = normalize_size(size)
+
+    if not color:
+        color = intro_data.get("Цвет") or extract_color_from_name(name) or extract_color_from_text(text_norm)
+    if color:
+        color = color.strip().capitalize()
+
+    material = normalize_material(material)
+
+    result: dict[str, str] = {}
+    for key, value in intro_data.items():
+        if key in {"Размер", "Материал", "Цвет"}:
+            continue
+        result[key] = value
+    if size:
+        result["Размер"] = size
+    if material:
+        result["Материал"] = material
+    if color:
+        result["Цвет"] = color
+    return result
+
+
+def parse_product_page(html: str, url: str, backend: str | None = None) -> dict:
+    parser = ProductPageParser()
+    feed_html(parser, html, backend)
+
+    name = " ".join(parser.h1_text).strip() or None
+    h1_index = parser.h1_index
+    price, old_price = extract_prices(parser.tokens, h1_index)
+    if parser.price_text:
+        price = int(parser.price_text.replace(" ", "").replace("\xa0", ""))
+    if parser.old_price_text:
+        old_price = int(parser.old_price_text.replace(" ", "").replace("\xa0", ""))
+
+    text_after_h1 = "\n".join(
+        text for idx, text in parser.tokens
+        if h1_index is None or idx >= h1_index
+    )
+    description = None
+    if parser.description_parts:
+        description = normalize_whitespace(" ".join(parser.description_parts))
+    if not description:
+        description = extract_description(text_after_h1)
+
+    category_name, category_slug = extract_category(parser.anchors, h1_index)
+
+    # Таблица характеристик идёт после вводного текста: при совпадении
+    # меток (Размер, Вес...) побеждает значение из introtext
+    introtext = None
+    if parser.introtext_parts or parser.characteristics_parts:
+        introtext = normalize_whitespace(" ".join(parser.introtext_parts + parser.characteristics_parts))
+
+    images = []
+    seen = set()
+    large_links: list[str] = []
+    fallback_links: list[str] = []
+    for link in parser.images:
+        path = urlparse(link).path
+        filename = Path(path).name.lower()
+        if filename.startswith("large_"):
+            large_links.append(link)
+        else:
+            fallback_links.append(link)
+
+    selected_links = large_links or fallback_links
+    for link in selected_links:
+        if link not in seen:
+            seen.add(link)
+            images.append(link)
+
+    slug = urlparse(url).path.rstrip("/").split("/")[-1]
+    tokens = [text for _idx, text in parser.tokens]
+    characteristics = extract_characteristics(tokens, text_after_h1, name, introtext)
+    if parser.size_value and "Размер" not in characteristics:
+        characteristics["Размер"] = normalize_size(parser.size_value)
+    if parser.color_value:
+        characteristics["Цвет"] = parser.color_value.strip().capitalize()
+
+    return {
+        "slug": slug,
+        "name": name,
+        "description": description,
+        "price": price,
+        "old_price": old_price,
+        "category_name": category_name,
+        "category_slug": category_slug,
+        "images": images,
+        "characteristics": characteristics,
+        "sku": parser.sku,
+    }
@@ -0,0 +1,266 @@
+"""
+Запись товаров в БД: категории, товары, характеристики и изображения.
+Работает на синхронной сессии; CatalogWriter рассчитан на вызовы из одного потока.
+"""
+from pathlib import Path
+
+from slugify import slugify
+from sqlalchemy import select, delete
+
+from app.infrastructure.config.config import APP_CONFIG
+from app.infrastructure.database.adapters.sync_connection import sync_session_maker
+from app.infrastructure.database.models.category import Category
+from app.infrastructure.database.models.product import (
+    Product,
+    ProductImage,
+    ProductCharacteristic,
+    CharacteristicType,
+)
+from app.infrastructure.database.models.review import Review
+from app.utils.enums import CharacteristicTypeEnum
+
+
+def compute_discount_percent(price: int | None, old_price: int | None) -> int | None:
+    if not price or not old_price or old_price <= price:
+        return None
+    return int(round((1 - (price / old_price)) * 100))
+
+
+def get_or_create_category(session, name: str | None, slug: str | None) -> Category | None:
+    if not slug:
+        return None
+    category = session.scalars(select(Category).where(Category.slug == slug)).first()
+    if category:
+        if name and category.name != name:
+            category.name = name
+        return category
+    if not name:
+        name = slug.replace("-", " ").title()
+    category = Category(name=name, slug=slug)
+    session.add(category)
+    session.flush()
+    return category
+
+
+def get_or_create_characteristic_type(session, enum_value: CharacteristicTypeEnum) -> CharacteristicType:
+    characteristic = session.scalars(
+        select(CharacteristicType).where(CharacteristicType.name == enum_value)
+    ).first()
+    if characteristic:
+        return characteristic
+    characteristic = CharacteristicType(
+        name=enum_value,
+        slug=slugify(enum_value.value),
+    )
+    session.add(characteristic)
+    session.flush()
+    return characteristic
+
+
+def get_existing_product(session, slug: str) -> Product | None:
+    return session.scalars(select(Product).where(Product.slug == slug)).first()
+
+
+def create_or_update_product(
+    session,
+    data: dict,
+    category: Category | None,
+    update_existing: bool,
+) -> tuple[Product, str]:
+    existing = get_existing_product(session, data["slug"])
+    if existing and not update_existing:
+        return existing, "skipped"
+    if existing:
+        product = existing
+    else:
+        product = Product(
+            slug=data["slug"],
+            name=data["name"] or data["slug"],
+            description=data["description"],
+            price=data["price"] or 0,
+            discount_percent=compute_discount_percent(data["price"], data["old_price"]),
+            is_active=True,
+            is_featured=False,
+            category_id=category.id if category else None,
+        )
+        session.add(product)
+        session.flush()
+        return product, "created"
+
+    product.name = data["name"] or product.name
+    product.description = data["description"] or product.description
+    if data["price"]:
+        product.price = data["price"]
+    product.discount_percent = compute_discount_percent(data["price"], data["old_price"])
+    if category:
+        product.category_id = category.id
+    return product, "updated"
+
+
+def upsert_characteristics(session, product: Product, characteristics: dict[str, str]) -> None:
+    if not characteristics:
+        return
+    mapping = {
+        "Размер": CharacteristicTypeEnum.SIZE,
+        "Ширина": CharacteristicTypeEnum.WIDTH,
+        "Высота": CharacteristicTypeEnum.HEIGHT,
+        "Глубина": CharacteristicTypeEnum.DEPTH,
+        "Вес": CharacteristicTypeEnum.WEIGHT,
+        "Диаметр": CharacteristicTypeEnum.DIAMETER,
+        "Длина": CharacteristicTypeEnum.LENGTH,
+        "Объём": CharacteristicTypeEnum.VOLUME,
+        "Материал": CharacteristicTypeEnum.MATERIAL,
+        "Цвет": CharacteristicTypeEnum.COLOR,
+    }
+    for key, value in characteristics.items():
+        enum_value = mapping.get(key)
+        if not enum_value or not value:
+            continue
+        char_type = get_or_create_characteristic_type(session, enum_value)
+        existing = session.scalars(
+            select(ProductCharacteristic).where(
+                ProductCharacteristic.product_id == product.id,
+                ProductCharacteristic.characteristic_type_id == char_type.id,
+            )
+        ).first()
+        if existing:
+            existing.value = value
+        else:
+            session.add(
+                ProductCharacteristic(
+                    value=value,
+                    product_id=product.id,
+                    characteristic_type_id=char_type.id,
+                )
+            )
+
+
+def reset_catalog(session) -> None:
+    session.execute(delete(ProductImage))
+    session.execute(delete(ProductCharacteristic))
+    session.execute(delete(Review))
+    session.execute(delete(Product))
+    session.execute(delete(Category))
+    session.execute(delete(CharacteristicType))
+    session.commit()
+
+
+def load_existing_slugs() -> set[str]:
+    with sync_session_maker() as session:
+        return set(session.scalars(select(Product.slug)).all())
+
+
+def delete_image_files(paths: list[str]) -> int:
+    images_dir = Path(APP_CONFIG.IMAGES_DIR)
+    deleted = 0
+    for image_path in paths:
+        file_path = images_dir / image_path
+        try:
+            file_path.unlink()
+            deleted += 1
+        except FileNotFoundError:
+            continue
+        except OSError as exc:
+            print(f"failed to delete image file {file_path}: {exc}")
+    return deleted
+
+
+class CatalogWriter:
+    """
+    Стадия persist: пишет товар в БД одной транзакцией.
+
+    Сессия одна на весь импорт, поэтому все вызовы должны идти
+    из одного потока (конвейер использует для этого отдельный executor).
+    """
+
+    def __init__(
+        self,
+        fallback_slug: str,
+        fallback_name: str | None,
+        update_existing: bool,
+        dry_run: bool,
+        refresh_images: bool,
+        reset_catalog: bool,
+    ) -> None:
+        self.fallback_slug = fallback_slug
+        self.fallback_name = fallback_name
+        self.update_existing = update_existing
+        self.dry_run = dry_run
+        self.refresh_images = refresh_images
+        self.reset_catalog = reset_catalog
+        self._session = None
+
+    def _open(self):
+        self._session = sync_session_maker()
+        # Каталог очищается только когда пришёл первый товар — если обход
+        # коллекции упал раньше, текущие данные остаются на месте.
+        if self.reset_catalog:
+            if self.dry_run:
+                print("[reset] dry-run: skip catalog reset")
+            else:
+                reset_catalog(self._session)
+                print("[reset] catalog cleared")
+        return self._session
+
+    def write(self, data: dict, images: list[tuple[int, str]] | None) -> str:
+        """
+        Сохранить товар. images — заранее скачанные (order, "products/<file>.webp");
+        если они не понадобились, файлы удаляются.
+        """
+        session = self._session or self._open()
+        try:
+            status = self._write(session, data, images or [])
+        except Exception:
+            session.rollback()
+            delete_image_files([path for _order, path in images or []])
+            raise
+        if self.dry_run:
+            session.rollback()
+        else:
+            session.commit()
+        return status
+
+    def _write(self, session, data: dict, images: list[tuple[int, str]]) -> str:
+        category = get_or_create_category(session, data.get("category_name"), data.get("category_slug"))
+        if category is None:
+            category = get_or_create_category(session, self.fallback_name, self.fallback_slug)
+
+        product, status = create_or_update_product(
+            session,
+            data,
+            category,
+            self.update_existing,
+        )
+
+        if status != "skipped":
+            upsert_characteristics(session, product, data.get("characteristics", {}))
+
+        # Удаляем старые изображения и файлы при обновлении с refresh_images
+        if self.refresh_images and status != "skipped":
+            old_images = session.scalars(
+                select(ProductImage.image_path).where(ProductImage.product_id == product.id)
+            ).all()
+            deleted_files = delete_image_files(list(old_images))
+            if deleted_files > 0:
+                print(f"deleted {deleted_files} old image file(s): {data.get('source_url')}")
+            session.execute(delete(ProductImage).where(ProductImage.product_id == product.id))
+            session.flush()
+
+        # Изображения нужны только новым товарам или при явном refresh_images
+        if status == "created" or (self.refresh_images and status != "skipped"):
+            for order, image_path in images:
+                session.add(
+                    ProductImage(
+                        image_path=image_path,
+                        order=order,
+                        product_id=product.id,
+                    )
+                )
+        else:
+            delete_image_files([path for _order, path in images])
+        return status
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
@@ -0,0 +1,408 @@
+"""
+Конвейер импорта каталога 4roads.su.
+
+    discover → fetch → parse → enrich → [export] → media → persist
+
+Стадии связаны ограниченными asyncio.Queue и работают одновременно;
+число воркеров каждой стадии задаётся в IngestionConfig. Блокирующая
+работа (HTTP, WebP, БД) выполняется в пулах потоков, парсинг — в пуле
+процессов, если parse_workers > 1.
+"""
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable
+from urllib.parse import urlparse
+
+from app.infrastructure.config.config import APP_CONFIG
+from app.utils.ingestion.checkpoint import ImportCheckpoint
+from app.utils.ingestion.fetching import download_image, fetch_html
+from app.utils.ingestion.metrics import PipelineMetrics
+from app.utils.ingestion.parsing import (
+    extract_max_page,
+    extract_product_links,
+    parse_collection_slug,
+    parse_product_page,
+    resolve_parser_backend,
+)
+from app.utils.ingestion.persistence import CatalogWriter, load_existing_slugs
+from app.utils.ingestion.snapshot import SnapshotWriter, read_exported_urls, read_products_json
+
+
+PROGRESS_EVERY = 25
+
+_DONE = object()
+
+
+@dataclass
+class IngestionConfig:
+    collection_url: str
+    max_pages: int | None = None
+    delay: float = 0.5
+    update_existing: bool = True
+    dry_run: bool = False
+    refresh_images: bool = False
+    reset_catalog: bool = False
+    with_characteristics: bool = True
+    parser_backend: str = "auto"
+
+    # Снимок каталога (NDJSON): чтение вместо парсинга и/или запись по ходу
+    snapshot_path: Path | None = None
+    import_snapshot: bool = False
+    export_snapshot: bool = False
+    append_snapshot: bool = False
+    snapshot_offset: int = 0
+    persist: bool = True
+
+    # Контрольная точка для --resume (не ведётся в dry-run)
+    checkpoint_path: Path | None = None
+    resume: bool = False
+
+    # Параллелизм стадий
+    fetch_workers: int = 1
+    parse_workers: int = 1
+    media_workers: int = 2
+    queue_size: int = 64
+
+
+@dataclass
+class Stage:
+    name: str
+    handler: Callable[["PipelineItem"], Awaitable["PipelineItem | None"]]
+    workers: int = 1
+
+
+@dataclass
+class PipelineItem:
+    url: str
+    record: int
+    html: str | None = None
+    data: dict | None = None
+    images: list[tuple[int, str]] = field(default_factory=list)
+
+
+class IngestionPipeline:
+
+    def __init__(self, config: IngestionConfig) -> None:
+        self.config = config
+        self.metrics = PipelineMetrics()
+        self._backend = resolve_parser_backend(config.parser_backend)
+        self._base_url = "{0.scheme}://{0.netloc}".format(urlparse(config.collection_url))
+        self._checkpoint: ImportCheckpoint | None = None
+        self._snapshot: SnapshotWriter | None = None
+        self._writer: CatalogWriter | None = None
+        self._skip_urls: set[str] = set()
+        self._exported_urls: set[str] = set()
+        self._existing_slugs: set[str] = set()
+        self._io_pool: Executor | None = None
+        self._parse_pool: Executor | None = None
+        self._db_pool: Executor | None = None
+        self._persisted = 0
+        # Импорт снимка: записи, завершённые после watermark не по порядку
+        # (media-воркеров несколько, persist получает их вперемешку)
+        self._snapshot_offset = config.snapshot_offset
+        self._watermark = config.snapshot_offset
+        self._finished_records: set[int] = set()
+
+    async def _run_in(self, pool: Executor, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+
+    # -----------------------------------------------------------
+    # SOURCES
+    # -----------------------------------------------------------
+    async def _discover(self, outbox: asyncio.Queue) -> None:
+        checkpoint = self._checkpoint
+        if checkpoint and checkpoint.links is not None:
+            links = checkpoint.links
+            print(f"[resume] {len(checkpoint.processed)}/{len(links)} product(s) already processed")
+        else:
+            with self.metrics.timed("discover"):
+                links = sorted(await self._discover_links())
+            self.metrics.incr("discover", "links", len(links))
+            if checkpoint:
+                checkpoint.record_links(links)
+
+        skip_urls = set(self._skip_urls)
+        if checkpoint:
+            skip_urls |= checkpoint.processed
+        for record, url in enumerate(links, start=1):
+            if url in skip_urls:
+                self.metrics.incr("discover", "skipped")
+                continue
+            await outbox.put(PipelineItem(url=url, record=record))
+        await outbox.put(_DONE)
+
+    async def _discover_links(self) -> set[str]:
+        config = self.config
+        first_html = await self._run_in(self._io_pool, fetch_html, config.collection_url)
+        self.metrics.incr("discover", "pages")
+        max_page = extract_max_page(first_html)
+        if config.max_pages:
+            max_page = min(max_page, config.max_pages)
+
+        links = extract_product_links(first_html, self._base_url, self._backend)
+        semaphore = asyncio.Semaphore(config.fetch_workers)
+
+        async def fetch_page(page: int) -> set[str]:
+            async with semaphore:
+                html = await self._run_in(self._io_pool, fetch_html, f"{config.collection_url}?page={page}")
+                self.metrics.incr("discover", "pages")
+                await asyncio.sleep(config.delay)
+            return extract_product_links(html, self._base_url, self._backend)
+
+        for found in await asyncio.gather(*(fetch_page(page) for page in range(2, max_page + 1))):
+            links |= found
+        return links
+
+    async def _read_snapshot(self, outbox: asyncio.Queue) -> None:
+        checkpoint = self._checkpoint
+        if checkpoint and checkpoint.watermark:
+            print(f"[resume] records 1..{checkpoint.watermark} already processed")
+        record = self._snapshot_offset
+        for data in read_products_json(self.config.snapshot_path, offset=self._snapshot_offset):
+            record += 1
+            url = data.get("source_url") or data.get("slug") or ""
+            if checkpoint and url in checkpoint.processed:
+                # Сохранена в прошлый раз после watermark
+                self.metrics.incr("discover", "skipped")
+                self._advance_watermark(record)
+                continue
+            await outbox.put(PipelineItem(url=url, record=record, data=data))
+        await outbox.put(_DONE)
+
+    # -----------------------------------------------------------
+    # STAGES
+    # -----------------------------------------------------------
+    async def _fetch(self, item: PipelineItem) -> PipelineItem:
+        try:
+            item.html = await self._run_in(self._io_pool, fetch_html, item.url)
+        finally:
+            await asyncio.sleep(self.config.delay)
+        return item
+
+    async def _parse(self, item: PipelineItem) -> PipelineItem:
+        item.data = await self._run_in(self._parse_pool, parse_product_page, item.html, item.url, self._backend)
+        item.data["source_url"] = item.url
+        item.html = None
+        return item
+
+    async def _enrich(self, item: PipelineItem) -> PipelineItem | None:
+        data = item.data
+        if not data.get("name") or not data.get("price"):
+            self.metrics.incr("enrich", "skipped")
+            print(f"[{item.record}] skipped (missing name/price): {item.url}")
+            self._mark_processed(item, "skipped")
+            return None
+        if not self.config.with_characteristics:
+            data["characteristics"] = {}
+        return item
+
+    async def _export(self, item: PipelineItem) -> PipelineItem:
+        # При --resume с записью в БД товар мог попасть в снимок, но не в БД
+        if item.url not in self._exported_urls:
+            self._snapshot.write(item.data)
+        if not self.config.persist:
+            self._mark_processed(item, "exported")
+        return item
+
+    async def _media(self, item: PipelineItem) -> PipelineItem:
+        if not self._needs_images(item.data):
+            return item
+
+        images_dir = Path(APP_CONFIG.IMAGES_DIR) / "products"
+
+        async def download(order: int, image_url: str) -> tuple[int, str] | None:
+            try:
+                filename = await self._run_in(self._io_pool, download_image, image_url, images_dir)
+            except Exception as exc:
+                self.metrics.incr("media", "image_failed")
+                print(f"[{item.record}] image download failed: {image_url} ({exc})")
+                return None
+            self.metrics.incr("media", "images")
+            return order, f"products/{filename}"
+
+        results = await asyncio.gather(
+            *(download(order, image_url) for order, image_url in enumerate(item.data.get("images", [])))
+        )
+        item.images = [result for result in results if result]
+        return item
+
+    def _needs_images(self, data: dict) -> bool:
+        # Изображения качаются заранее только для товаров, которые их получат:
+        # новых или обновляемых с refresh_images (в dry-run — никогда).
+        if self.config.dry_run:
+            return False
+        if data["slug"] not in self._existing_slugs:
+            return True
+        return self.config.update_existing and self.config.refresh_images
+
+    async def _persist(self, item: PipelineItem) -> PipelineItem:
+        status = await self._run_in(self._db_pool, self._writer.write, item.data, item.images)
+        self.metrics.incr("persist", status)
+        self._persisted += 1
+        print(f"[{item.record}] {'dry-run' if self.config.dry_run else status}: {item.url}")
+        self._mark_processed(item, status)
+        if self._persisted % PROGRESS_EVERY == 0:
+            print(f"[progress] {self.metrics.format()}")
+        return item
+
+    def _mark_processed(self, item: PipelineItem, status: str) -> None:
+        if self._checkpoint and item.url:
+            self._checkpoint.mark_processed(item.url, status)
+        if self.config.import_snapshot:
+            self._advance_watermark(item.record)
+
+    def _advance_watermark(self, record: int) -> None:
+        """
+        Сдвинуть watermark по непрерывному префиксу завершённых записей.
+
+        Упавшая запись префикс обрывает: продолжение с watermark (--resume
+        или --offset) повторит её, а не пропустит.
+        """
+        self._finished_records.add(record)
+        watermark = self._watermark
+        while watermark + 1 in self._finished_records:
+            watermark += 1
+            self._finished_records.discard(watermark)
+        if watermark != self._watermark:
+            self._watermark = watermark
+            if self._checkpoint:
+                self._checkpoint.record_watermark(watermark)
+
+    async def _run_stage(self, stage: Stage, inbox: asyncio.Queue, outbox: asyncio.Queue | None) -> None:
+        async def worker() -> None:
+            while True:
+                item = await inbox.get()
+                if item is _DONE:
+                    # Возвращаем маркер, чтобы его увидели остальные воркеры стадии
+                    await inbox.put(_DONE)
+                    return
+                try:
+                    with self.metrics.timed(stage.name):
+                        result = await stage.handler(item)
+                except Exception as exc:
+                    # URL не отмечается обработанным — повторим его при --resume
+                    self.metrics.incr(stage.name, "failed")
+                    print(f"[{item.record}] {stage.name} failed: {item.url} ({exc})")
+                    continue
+                if result is None:
+                    continue
+                self.metrics.incr(stage.name, "ok")
+                if outbox is not None:
+                    await outbox.put(result)
+
+        await asyncio.gather(*(worker() for _ in range(max(stage.workers, 1))))
+        if outbox is not None:
+            await outbox.put(_DONE)
+
+    def _build_stages(self) -> tuple[Callable, list[Stage]]:
+        config = self.config
+        if config.import_snapshot:
+            source = self._read_snapshot
+            stages = []
+        else:
+            source = self._discover
+            stages = [
+                Stage("fetch", self._fetch, config.fetch_workers),
+                Stage("parse", self._parse, config.parse_workers),
+            ]
+        stages.append(Stage("enrich", self._enrich))
+        if config.export_snapshot:
+            stages.append(Stage("export", self._export))
+        if config.persist:
+            stages.append(Stage("media", self._media, config.media_workers))
+            # Одна сессия БД — один воркер
+            stages.append(Stage("persist", self._persist))
+        return source, stages
+
+    # -----------------------------------------------------------
+    # RUN
+    # -----------------------------------------------------------
+    def _open(self) -> None:
+        config = self.config
+        self._io_pool = ThreadPoolExecutor(max_workers=config.fetch_workers + config.media_workers)
+        if config.parse_workers > 1:
+            self._parse_pool = ProcessPoolExecutor(max_workers=config.parse_workers)
+        else:
+            self._parse_pool = ThreadPoolExecutor(max_workers=1)
+        self._db_pool = ThreadPoolExecutor(max_workers=1)
+
+        if config.checkpoint_path and not config.dry_run:
+            # Журнал импорта снимка привязан к файлу снимка, а не к коллекции
+            source = str(config.snapshot_path) if config.import_snapshot else config.collection_url
+            self._checkpoint = ImportCheckpoint.open(config.checkpoint_path, source, config.resume)
+            if config.import_snapshot:
+                self._snapshot_offset = max(config.snapshot_offset, self._checkpoint.watermark)
+                self._watermark = self._snapshot_offset
+        if config.export_snapshot:
+            append = config.append_snapshot or config.resume
+            if append:
+                exported = read_exported_urls(config.snapshot_path)
+                if config.persist:
+                    # Снимок пишется до media/persist: попавший в него товар ещё
+                    # мог не дойти до БД. Пропуск — только по checkpoint.processed
+                    self._exported_urls = exported
+                else:
+                    self._skip_urls = exported
+            self._snapshot = SnapshotWriter(config.snapshot_path, append=append)
+        if config.persist:
+            self._writer = self._create_writer()
+
+    def _create_writer(self) -> CatalogWriter:
+        config = self.config
+        fallback_slug = parse_collection_slug(config.collection_url) or "vse-kollektsii"
+        return CatalogWriter(
+            fallback_slug=fallback_slug,
+            fallback_name="Все товары" if fallback_slug == "vse-kollektsii" else None,
+            update_existing=config.update_existing,
+            dry_run=config.dry_run,
+            refresh_images=config.refresh_images,
+            reset_catalog=config.reset_catalog,
+        )
+
+    def _load_existing_slugs(self) -> set[str]:
+        return load_existing_slugs()
+
+    async def run(self) -> PipelineMetrics:
+        config = self.config
+        self._open()
+        completed = False
+        try:
+            if config.persist and not config.dry_run and not config.reset_catalog:
+                self._existing_slugs = await self._run_in(self._db_pool, self._load_existing_slugs)
+
+            source, stages = self._build_stages()
+            queues = [asyncio.Queue(maxsize=config.queue_size) for _ in stages]
+            async with asyncio.TaskGroup() as group:
+                group.create_task(source(queues[0]))
+                for index, stage in enumerate(stages):
+                    outbox = queues[index + 1] if index + 1 < len(stages) else None
+                    group.create_task(self._run_stage(stage, queues[index], outbox))
+            completed = True
+        finally:
+            self._close(completed)
+        return self.metrics
+
+    def _close(self, completed: bool) -> None:
+        if self._writer is not None:
+            self._db_pool.submit(self._writer.close).result()
+        if self._snapshot is not None:
+            self._snapshot.close()
+        if self._checkpoint is not None:
+            if not completed or self.metrics.failed:
+                self._checkpoint.close()
+                if completed:
+                    print(f"[resume] {self.metrics.failed} item(s) failed, rerun with --resume to retry them")
+            else:
+                self._checkpoint.finish()
+        if self.config.import_snapshot and self._watermark and (not completed or self.metrics.failed):
+            print(f"[resume] records 1..{self._watermark} are done, continue with --resume (or --offset {self._watermark})")
+        for pool in (self._io_pool, self._parse_pool, self._db_pool):
+            pool.shutdown(wait=True)
+
+
+def run_ingestion(config: IngestionConfig) -> PipelineMetrics:
+    metrics = asyncio.run(IngestionPipeline(config).run())
+    print(f"[progress] {metrics.format()}")
+    return metrics
@@ -0,0 +1,145 @@
+"""
+Снимок каталога в формате NDJSON: одна запись о товаре на строку.
+"""
+import json
+from pathlib import Path
+from typing import Iterator
+
+LEGACY_CHUNK_SIZE = 64 * 1024
+
+
+def read_products_json(path: Path, offset: int = 0) -> Iterator[dict]:
+    """
+    Лениво читает снимок каталога.
+
+    NDJSON (одна запись на строку) читается построчно, offset пропускает
+    первые N записей — для продолжения импорта после падения. Старый формат
+    (JSON-массив) тоже читается потоково, по элементу за раз.
+    """
+    with path.open("r", encoding="utf-8") as fh:
+        head = fh.read(1)
+        while head and head.isspace():
+            head = fh.read(1)
+        if head == "[":
+            for index, data in enumerate(iter_json_array(fh), start=1):
+                if index > offset:
+                    yield data
+            return
+        fh.seek(0)
+
+        index = 0
+        for line_no, line in enumerate(fh, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                # Обрезанная последняя строка после падения экспорта
+                print(f"[json] skipped broken line {line_no} in {path}")
+                continue
+            index += 1
+            if index <= offset:
+                continue
+            yield data
+
+
+def iter_json_array(fh, chunk_size: int = LEGACY_CHUNK_SIZE) -> Iterator:
+    """
+    Элементы JSON-массива по одному, без загрузки файла в память.
+
+    fh уже прочитан до открывающей «[». В памяти держится только текущий
+    кусок файла и недоразобранный элемент.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    expect_value = True
+    while True:
+        while pos < len(buffer) and (buffer[pos].isspace() or (buffer[pos] == "," and not expect_value)):
+            if buffer[pos] == ",":
+                expect_value = True
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        if pos < len(buffer):
+            if not expect_value:
+                raise ValueError("Broken JSON array in snapshot")
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                end = None
+            # Значение у самого края куска может быть обрезано (число 12|3)
+            if end is not None and (end < len(buffer) or eof):
+                yield value
+                pos = end
+                expect_value = False
+                continue
+            if eof:
+                raise ValueError("Broken JSON array in snapshot")
+        chunk = fh.read(chunk_size)
+        if not chunk:
+            if eof or pos >= len(buffer):
+                raise ValueError("Unterminated JSON array in snapshot")
+            eof = True
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+
+def read_exported_urls(path: Path) -> set[str]:
+    urls: set[str] = set()
+    if not path.exists():
+        return urls
+    for data in read_products_json(path):
+        if data.get("source_url"):
+            urls.add(data["source_url"])
+    return urls
+
+
+class SnapshotWriter:
+    """
+    Пишет товары в NDJSON по мере поступления.
+
+    Каждая строка сбрасывается на диск сразу, поэтому после падения файл
+    содержит всё, что успели спарсить (append=True продолжает его).
+    """
+
+    def __init__(self, path: Path, append: bool = False) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if append and path.exists():
+            truncate_partial_line(path)
+        self.path = path
+        self._fh = path.open("a" if append else "w", encoding="utf-8")
+
+    def write(self, data: dict) -> None:
+        self._fh.write(json.dumps(data, ensure_ascii=False))
+        self._fh.write("\n")
+        self._fh.flush()
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+def truncate_partial_line(path: Path) -> None:
+    with path.open("rb+") as fh:
+        fh.seek(0, 2)
+        size = fh.tell()
+        if size == 0:
+            return
+        fh.seek(size - 1)
+        if fh.read(1) == b"\n":
+            return
+        # Ищем последний перевод строки и отрезаем недописанную запись
+        pos = size - 1
+        chunk = 4096
+        while pos > 0:
+            start = max(0, pos - chunk)
+            fh.seek(start)
+            block = fh.read(pos - start)
+            nl = block.rfind(b"\n")
+            if nl != -1:
+                fh.truncate(start + nl + 1)
+                return
+            pos = start
+        fh.truncate(0)
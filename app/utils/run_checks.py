@@ -0,0 +1,56 @@
+"""
+Общий запуск проверок перед коммитом и выкладкой.
+
+По умолчанию гоняет проверки, которым не нужен PostgreSQL: бюджет SQL-запросов
+страниц админки (на временной SQLite), сверку движков HTML-парсинга с эталонами
+и продолжение импорта после падения. --with-db добавляет проверку планов
+запросов витрины на настроенной БД. Каждая проверка идёт отдельным процессом;
+код возврата 1 — если хоть одна не прошла:
+
+    python3 -m app.utils.run_checks
+    python3 -m app.utils.run_checks --with-db
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+CHECKS = [
+    ("admin list queries", ["app.utils.check_admin_queries", "--database-url", "sqlite://", "--seed", "30"]),
+    ("parser backends", ["app.utils.check_parser_backends"]),
+    ("ingestion resume", ["app.utils.check_ingestion_resume"]),
+]
+DB_CHECKS = [
+    ("query plans", ["app.utils.check_query_plans"]),
+]
+
+
+def run_check(name: str, module_args: list[str], verbose: bool) -> bool:
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-m", *module_args],
+        stdout=None if verbose else subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    elapsed = time.perf_counter() - started
+    ok = result.returncode == 0
+    print(f"{'✅' if ok else '❌'} {name} ({elapsed:.1f}s)")
+    if not ok and not verbose:
+        print(result.stdout)
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the project checks, exit 1 if any fails")
+    parser.add_argument("--with-db", action="store_true", help="Also run checks that need the configured PostgreSQL")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show output of passing checks too")
+    args = parser.parse_args()
+
+    checks = CHECKS + (DB_CHECKS if args.with_db else [])
+    results = [run_check(name, module_args, args.verbose) for name, module_args in checks]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
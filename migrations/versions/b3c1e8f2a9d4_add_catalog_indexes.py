@@ -0,0 +1,62 @@
+"""add catalog indexes
+
+Revision ID: b3c1e8f2a9d4
+Revises: 7a2b9d1c3f4e
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3c1e8f2a9d4'
+down_revision: Union[str, Sequence[str], None] = '7a2b9d1c3f4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_products_category_id_price', 'products', ['category_id', 'price'], unique=False)
+    op.create_index('ix_products_price', 'products', ['price'], unique=False)
+    op.create_index(
+        'ix_products_active_created_at', 'products', [sa.text('created_at DESC')],
+        unique=False, postgresql_where=sa.text('is_active'),
+    )
+    op.create_index(
+        'ix_products_featured_created_at', 'products', [sa.text('created_at DESC')],
+        unique=False, postgresql_where=sa.text('is_active AND is_featured'),
+    )
+    op.create_index(
+        'ix_products_sale_created_at', 'products', [sa.text('created_at DESC')],
+        unique=False, postgresql_where=sa.text('is_active AND discount_percent IS NOT NULL'),
+    )
+
+    op.create_index(
+        'ix_product_characteristics_type_value', 'product_characteristics',
+        ['characteristic_type_id', 'value', 'product_id'], unique=False,
+    )
+    op.create_index(op.f('ix_product_characteristics_product_id'), 'product_characteristics', ['product_id'], unique=False)
+    op.create_index(op.f('ix_product_images_product_id'), 'product_images', ['product_id'], unique=False)
+    op.create_index(op.f('ix_reviews_product_id'), 'reviews', ['product_id'], unique=False)
+    op.create_index(op.f('ix_order_items_order_id'), 'order_items', ['order_id'], unique=False)
+    op.create_index(op.f('ix_order_items_product_id'), 'order_items', ['product_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_order_items_product_id'), table_name='order_items')
+    op.drop_index(op.f('ix_order_items_order_id'), table_name='order_items')
+    op.drop_index(op.f('ix_reviews_product_id'), table_name='reviews')
+    op.drop_index(op.f('ix_product_images_product_id'), table_name='product_images')
+    op.drop_index(op.f('ix_product_characteristics_product_id'), table_name='product_characteristics')
+    op.drop_index('ix_product_characteristics_type_value', table_name='product_characteristics')
+
+    op.drop_index('ix_products_sale_created_at', table_name='products')
+    op.drop_index('ix_products_featured_created_at', table_name='products')
+    op.drop_index('ix_products_active_created_at', table_name='products')
+    op.drop_index('ix_products_price', table_name='products')
+    op.drop_index('ix_products_category_id_price', table_name='products')
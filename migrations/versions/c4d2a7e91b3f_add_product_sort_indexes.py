@@ -0,0 +1,45 @@
+"""add product sort indexes
+
+Revision ID: c4d2a7e91b3f
+Revises: b3c1e8f2a9d4
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d2a7e91b3f'
+down_revision: Union[str, Sequence[str], None] = 'b3c1e8f2a9d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Индексы (ключ, id) покрывают и фильтр, и сортировку с keyset-пагинацией
+    op.drop_index('ix_products_category_id_price', table_name='products')
+    op.drop_index('ix_products_price', table_name='products')
+    op.create_index('ix_products_category_id_price_id', 'products', ['category_id', 'price', 'id'], unique=False)
+    op.create_index('ix_products_price_id', 'products', ['price', 'id'], unique=False)
+    op.create_index(
+        'ix_products_category_id_created_at_id', 'products', ['category_id', 'created_at', 'id'], unique=False,
+    )
+    op.create_index('ix_products_created_at_id', 'products', ['created_at', 'id'], unique=False)
+    op.create_index(
+        'ix_products_discount_id', 'products', [sa.text('coalesce(discount_percent, 0)'), 'id'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_discount_id', table_name='products')
+    op.drop_index('ix_products_created_at_id', table_name='products')
+    op.drop_index('ix_products_category_id_created_at_id', table_name='products')
+    op.drop_index('ix_products_price_id', table_name='products')
+    op.drop_index('ix_products_category_id_price_id', table_name='products')
+    op.create_index('ix_products_price', 'products', ['price'], unique=False)
+    op.create_index('ix_products_category_id_price', 'products', ['category_id', 'price'], unique=False)
@@ -0,0 +1,40 @@
+"""add product old_price
+
+Revision ID: d7e5b1c3a8f0
+Revises: c4d2a7e91b3f
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7e5b1c3a8f0'
+down_revision: Union[str, Sequence[str], None] = 'c4d2a7e91b3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'products',
+        sa.Column(
+            'old_price',
+            sa.Integer(),
+            sa.Computed(
+                "CASE WHEN discount_percent > 0 AND discount_percent < 100 "
+                "THEN price * 100 / (100 - discount_percent) END",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('products', 'old_price')
@@ -0,0 +1,106 @@
+"""add category product counters
+
+Revision ID: e2a9c6d4b8f1
+Revises: d7e5b1c3a8f0
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a9c6d4b8f1'
+down_revision: Union[str, Sequence[str], None] = 'd7e5b1c3a8f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Копия app.infrastructure.database.models.category.PRODUCT_COUNT_TRIGGERS
+PRODUCT_COUNT_TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION products_category_counts() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE categories c
+            SET products_count = c.products_count + d.total,
+                active_products_count = c.active_products_count + d.active
+            FROM (
+                SELECT category_id, count(*) AS total, count(*) FILTER (WHERE is_active) AS active
+                FROM new_rows GROUP BY category_id
+            ) d
+            WHERE c.id = d.category_id;
+        ELSIF TG_OP = 'DELETE' THEN
+            UPDATE categories c
+            SET products_count = c.products_count - d.total,
+                active_products_count = c.active_products_count - d.active
+            FROM (
+                SELECT category_id, count(*) AS total, count(*) FILTER (WHERE is_active) AS active
+                FROM old_rows GROUP BY category_id
+            ) d
+            WHERE c.id = d.category_id;
+        ELSE
+            UPDATE categories c
+            SET products_count = c.products_count + d.total,
+                active_products_count = c.active_products_count + d.active
+            FROM (
+                SELECT category_id, sum(total) AS total, sum(active) AS active
+                FROM (
+                    SELECT category_id, 1 AS total, is_active::int AS active FROM new_rows
+                    UNION ALL
+                    SELECT category_id, -1, -is_active::int FROM old_rows
+                ) changes
+                GROUP BY category_id
+            ) d
+            WHERE c.id = d.category_id AND (d.total <> 0 OR d.active <> 0);
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER products_category_counts_insert AFTER INSERT ON products
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION products_category_counts()
+    """,
+    """
+    CREATE TRIGGER products_category_counts_update AFTER UPDATE ON products
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION products_category_counts()
+    """,
+    """
+    CREATE TRIGGER products_category_counts_delete AFTER DELETE ON products
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION products_category_counts()
+    """,
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('categories', sa.Column('products_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('categories', sa.Column('active_products_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute("""
+        UPDATE categories c
+        SET products_count = d.total, active_products_count = d.active
+        FROM (
+            SELECT category_id, count(*) AS total, count(*) FILTER (WHERE is_active) AS active
+            FROM products GROUP BY category_id
+        ) d
+        WHERE c.id = d.category_id
+    """)
+    for statement in PRODUCT_COUNT_TRIGGERS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER products_category_counts_delete ON products")
+    op.execute("DROP TRIGGER products_category_counts_update ON products")
+    op.execute("DROP TRIGGER products_category_counts_insert ON products")
+    op.execute("DROP FUNCTION products_category_counts()")
+    op.drop_column('categories', 'active_products_count')
+    op.drop_column('categories', 'products_count')
@@ -0,0 +1,39 @@
+"""make product created_at not null
+
+Revision ID: f3b8d1e6c2a7
+Revises: e2a9c6d4b8f1
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8d1e6c2a7'
+down_revision: Union[str, Sequence[str], None] = 'e2a9c6d4b8f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("UPDATE products SET created_at = coalesce(updated_at, now()) WHERE created_at IS NULL")
+    op.alter_column(
+        'products', 'created_at',
+        existing_type=sa.DateTime(timezone=True),
+        existing_server_default=sa.text('now()'),
+        nullable=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column(
+        'products', 'created_at',
+        existing_type=sa.DateTime(timezone=True),
+        existing_server_default=sa.text('now()'),
+        nullable=True,
+    )